@@ -6,30 +6,63 @@ Flask application factory for the Book Alchemy project. Configures the applicati
 initializes extensions, registers Blueprints, and sets up the database.
 
 Features:
-- Loads environment variables via `dotenv`
+- Loads environment variables via `dotenv` (once, in app.config)
 - Configures Flask app using environment-specific settings
 - Initializes SQLAlchemy and ensures foreign key constraints (SQLite)
+- Applies the configured SQLite PRAGMA profile and logs the effective values
 - Registers all application Blueprints
 - Automatically creates database tables at startup
+- Applies pending schema migrations (indexes etc.) to existing databases
+- Fast start: schema setup is skipped when the database is already current
+- Times each startup phase (app.startup, `flask bench-startup`)
+- Creates the full-text search index (SQLite FTS5) if missing
+- Indexes existing books for similar-book lookups after migration 6
 
 Required Modules:
 - flask.Flask: Core Flask framework
-- dotenv.load_dotenv: For loading .env files
 - app.config.config_by_name: Configuration mappings
 - app.models.db: SQLAlchemy DB instance
 - app.events._enable_sqlite_fk: Import to register the event listener
-- Various Blueprint modules
+- app.migrations: Versioned schema migrations and the `upgrade-db` CLI command
+- app.search.ensure_search_index: Creates the FTS5 index and registers sync listeners
+- app.similar.backfill_similar_index: Fills the similar-books index after its migration
+- app.services.importer.import_books_command: `flask import-books` bulk loader
+- app.services.fake_ai.fake_ai_command: `flask fake-ai` local AI endpoint
+- app.fragment_cache.init_fragment_cache: `{% cache %}` tag and LRU for book card fragments
+- app.conditional.init_conditional: deploy fingerprint for ETags of library views
+- app.compression.init_compression: gzip/brotli response compression
+- app.assets: `flask build-assets` bundler, asset_url() and precompressed bundle serving
+- app.services.recommendation_jobs.init_job_resume: Restarts unfinished AI jobs
+  on the first request of each serving process
+- app.logging_config.init_logging: queued JSON logging with request ids
+- app.startup: StartupTimer and the `bench-startup` CLI command
+- Various Blueprint modules (including covers: local cover thumbnails)
 
 Author: Martin Haferanke
 Date: 2025-07-11
 """
 
 from flask import Flask
-from dotenv import load_dotenv
 
 from .config import config_by_name
 from app.models import db
-from .events import _enable_sqlite_fk
+from .events import (
+    _enable_sqlite_fk,
+    register_sqlite_pragmas,
+    effective_sqlite_pragmas,
+)
+from .migrations import is_current, upgrade, upgrade_db_command
+from .search import ensure_search_index
+from .similar import backfill_similar_index
+from .services.importer import import_books_command
+from .services.fake_ai import fake_ai_command
+from .assets import assets_bp, build_assets_command
+from .compression import init_compression
+from .fragment_cache import init_fragment_cache
+from .conditional import init_conditional
+from .startup import StartupTimer, bench_startup_command
+from .logging_config import init_logging
+from .services.recommendation_jobs import init_job_resume
 
 from app.extentions import limiter
 
@@ -37,10 +70,9 @@ from .blueprints.home import home_bp
 from .blueprints.authors import authors_bp
 from .blueprints.books import books_bp
 from .blueprints.recommend import recommend_bp
+from .blueprints.covers import covers_bp
 
 import logging
-from logging.handlers import RotatingFileHandler
-import os
 
 
 def create_app(config_name: str = None) -> Flask:
@@ -53,50 +85,71 @@ def create_app(config_name: str = None) -> Flask:
     :return: Configured Flask application instance.
     :raises RuntimeError: If app configuration fails or DB initialization encounters errors.
     """
-    # Load .env file if present
-    load_dotenv()
+    # .env is loaded once, when app.config is imported
+    timer = StartupTimer()
 
-    app = Flask(__name__, instance_relative_config=False)
-    cfg = config_by_name.get(config_name or "default")
-    app.config.from_object(cfg)
+    with timer.phase("config"):
+        app = Flask(__name__, instance_relative_config=False)
+        cfg = config_by_name.get(config_name or "default")
+        app.config.from_object(cfg)
+
+    # Logging: JSON lines with request ids, written by a background thread
+    with timer.phase("logging"):
+        init_logging(app)
 
     # Initialize extensions
-    db.init_app(app)
+    with timer.phase("extensions"):
+        db.init_app(app)
+        init_fragment_cache(app)
+        init_conditional(app)
 
     # Register event listeners (enabling SQLite foreign keys)
     _enable_sqlite_fk
 
-    # Create DB tables in application context
-    with app.app_context():
-        db.create_all()
-
-    # Configure Flask limiter for AI recommendations
-    limiter.init_app(app)
-
-    # Register Blueprints
-    app.register_blueprint(home_bp)
-    app.register_blueprint(authors_bp, url_prefix="/authors")
-    app.register_blueprint(books_bp, url_prefix="/books")
-    app.register_blueprint(recommend_bp, url_prefix="/recommend")
-
-    # Logging to file
+    # Create DB tables and upgrade the schema in application context; with
+    # FAST_START both are skipped if the database is already at the newest version
+    with timer.phase("schema"), app.app_context():
+        register_sqlite_pragmas(db.engine, app.config.get("SQLITE_PRAGMAS", {}))
+        if not (app.config["FAST_START"] and is_current(db.engine)):
+            db.create_all()
+            upgrade(db.engine)
+        backfill_similar_index(db.engine)
+        ensure_search_index(db.engine)
 
-    log_dir = os.path.join(os.path.dirname(__file__), "..", "logs")
-    os.makedirs(log_dir, exist_ok=True)
+    with timer.phase("extensions"):
+        # Unfinished AI jobs are resumed by the serving process, not by CLI commands
+        init_job_resume(app)
 
-    log_file = os.path.join(log_dir, "bookalchemy.log")
+        app.cli.add_command(upgrade_db_command)
+        app.cli.add_command(import_books_command)
+        app.cli.add_command(fake_ai_command)
+        app.cli.add_command(build_assets_command)
+        app.cli.add_command(bench_startup_command)
 
-    # Set up rotating file handler
-    file_handler = RotatingFileHandler(log_file, maxBytes=10240, backupCount=3)
-    file_handler.setLevel(logging.INFO)
+        # Configure Flask limiter for AI recommendations
+        limiter.init_app(app)
 
-    # Define log format
-    formatter = logging.Formatter(
-        "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
-    )
-    file_handler.setFormatter(formatter)
+        # Compress pages, fragments and JSON for clients that accept it
+        init_compression(app)
 
-    # Attach handler to root logger
-    logging.getLogger().addHandler(file_handler)
-    logging.getLogger().setLevel(logging.INFO)
+    # Register Blueprints
+    with timer.phase("blueprints"):
+        app.register_blueprint(home_bp)
+        app.register_blueprint(authors_bp, url_prefix="/authors")
+        app.register_blueprint(books_bp, url_prefix="/books")
+        app.register_blueprint(recommend_bp, url_prefix="/recommend")
+        app.register_blueprint(covers_bp, url_prefix="/covers")
+        app.register_blueprint(assets_bp)
+
+    # Report the effective SQLite settings so each deployment can be tuned
+    with timer.phase("schema"), app.app_context():
+        pragmas = effective_sqlite_pragmas(db.engine)
+    if pragmas:
+        logging.getLogger(__name__).info(
+            "SQLite pragmas in effect: %s",
+            ", ".join(f"{name}={value}" for name, value in pragmas.items()),
+        )
+
+    app.extensions["startup_timings"] = timer.timings
+    logging.getLogger(__name__).info("Application started: %s", timer.report())
     return app
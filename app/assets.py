@@ -0,0 +1,433 @@
+"""
+app / assets.py
+
+Purpose:
+Build step and template helper for fingerprinted static bundles. Stylesheets and
+scripts are concatenated, minified and written to `static/dist` under names that
+contain a hash of their content (e.g. main.3f2a9c1e.css), together with gzip and
+(if available) brotli variants. A new deploy produces new file names, so
+browsers can cache every bundle forever and never see stale code.
+
+Features:
+- `flask build-assets`: builds all BUNDLES and writes `static/dist/manifest.json`
+- CSS: local @import rules are inlined recursively (remote ones are hoisted to
+  the top), relative url() references are rewritten for the dist directory,
+  comments and redundant whitespace are removed
+- JS: comments and redundant whitespace are removed; line breaks are kept, so
+  automatic semicolon insertion is unaffected
+- `asset_url()` template global: the fingerprinted bundle URL if a manifest
+  exists and ASSETS_USE_BUNDLES allows it, otherwise the source file URL
+- `/static/dist/<file>` is served with the precompressed variant the client
+  accepts and `Cache-Control: immutable`
+
+Required Modules:
+- gzip, hashlib, json, os, re: For compression, fingerprints and the manifest
+- brotli (optional): For .br variants
+- click, flask: For the CLI command, the route and the template global
+
+Exceptions:
+- OSError: Raised by the build if sources cannot be read or bundles written
+- NotFound: Returned for unknown bundle files
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Tuple
+
+import click
+from flask import Blueprint, abort, current_app, request, send_file, url_for
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only gzip variants are built then
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bundle name -> entry files (relative to the static folder)
+BUNDLES: Dict[str, List[str]] = {
+    "main.css": ["main.css"],
+    "main.js": ["main.js"],
+}
+
+DIST_DIR = "dist"
+MANIFEST = "manifest.json"
+
+# Bundles never change under a fingerprinted name
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+MIMETYPES = {".css": "text/css", ".js": "text/javascript"}
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+
+assets_bp = Blueprint("assets", __name__)
+
+
+# --- CSS -------------------------------------------------------------------
+
+_CSS_STRINGS_AND_COMMENTS = re.compile(
+    r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|/\*.*?\*/", re.S
+)
+_CSS_IMPORT = re.compile(
+    r"@import\s+(?:url\(\s*)?([\"']?)([^\"')\s]+)\1\s*\)?\s*([^;]*);"
+)
+_CSS_URL = re.compile(r"url\(\s*([\"']?)([^\"')]+)\1\s*\)")
+
+
+def _is_remote(url: str) -> bool:
+    return url.startswith(("http:", "https:", "//", "data:", "/"))
+
+
+def _squeeze_css(code: str) -> str:
+    """
+    Remove redundant whitespace from CSS outside of strings.
+
+    :param code: CSS fragment without strings or comments.
+    :return: Minified fragment.
+    """
+    code = re.sub(r"\s+", " ", code)
+    code = re.sub(r" ?([{};,>]) ?", r"\1", code)
+    # Only after colons: a space before one is a descendant selector (a :hover)
+    return code.replace(": ", ":").replace(";}", "}")
+
+
+def minify_css(css: str) -> str:
+    """
+    Minify a stylesheet: drop comments and redundant whitespace.
+
+    :param css: Stylesheet source.
+    :return: Minified stylesheet.
+    """
+    out = []
+    pos = 0
+    for match in _CSS_STRINGS_AND_COMMENTS.finditer(css):
+        out.append(_squeeze_css(css[pos:match.start()]))
+        if match.group(1):
+            out.append(match.group(1))
+        pos = match.end()
+    out.append(_squeeze_css(css[pos:]))
+    return "".join(out).strip()
+
+
+def _inline_css(path: str, dist_dir: str, remote: List[str], seen: set) -> str:
+    """
+    Read a stylesheet with its local @imports inlined.
+
+    :param path: Stylesheet path.
+    :param dist_dir: Directory the bundle is written to (for url() rewriting).
+    :param remote: Collects remote @import rules, which must stay at the top.
+    :param seen: Paths already inlined (guards against import cycles).
+    :return: Stylesheet text.
+    :raises OSError: if a stylesheet cannot be read.
+    """
+    path = os.path.abspath(path)
+    if path in seen:
+        return ""
+    seen.add(path)
+    with open(path, encoding="utf-8") as f:
+        css = f.read()
+    base = os.path.dirname(path)
+
+    def rewrite_url(match: re.Match) -> str:
+        quote, url = match.groups()
+        if _is_remote(url):
+            return match.group(0)
+        target = os.path.relpath(os.path.join(base, url), dist_dir).replace(os.sep, "/")
+        return f"url({quote}{target}{quote})"
+
+    def inline_import(match: re.Match) -> str:
+        url, media = match.group(2), match.group(3).strip()
+        if _is_remote(url):
+            remote.append(match.group(0))
+            return ""
+        imported = _inline_css(os.path.join(base, url), dist_dir, remote, seen)
+        return f"@media {media}{{{imported}}}" if media else imported
+
+    # Strip comments first so commented-out @imports are not followed
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = _CSS_URL.sub(rewrite_url, _CSS_IMPORT.sub(inline_import, css))
+    return css
+
+
+def build_css(entries: List[str], static_dir: str, dist_dir: str) -> str:
+    """
+    Bundle and minify stylesheets.
+
+    :param entries: Entry stylesheets relative to the static folder.
+    :param static_dir: Static folder.
+    :param dist_dir: Output directory.
+    :return: Minified bundle.
+    :raises OSError: if a stylesheet cannot be read.
+    """
+    remote: List[str] = []
+    seen: set = set()
+    body = "\n".join(
+        _inline_css(os.path.join(static_dir, entry), dist_dir, remote, seen)
+        for entry in entries
+    )
+    return minify_css("\n".join(remote) + "\n" + body)
+
+
+# --- JavaScript ------------------------------------------------------------
+
+_IDENT = re.compile(r"[\w$]")
+# Keywords after which a slash starts a regular expression, not a division
+_REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "delete", "void", "throw", "new", "yield", "await")
+
+
+def _skip_quoted(src: str, i: int, quote: str) -> int:
+    """Return the index after the string or regex literal starting at i."""
+    j = i + 1
+    in_class = False
+    while j < len(src):
+        char = src[j]
+        if char == "\\":
+            j += 2
+            continue
+        if quote == "/" and char == "[":
+            in_class = True
+        elif quote == "/" and char == "]":
+            in_class = False
+        elif char == quote and not in_class:
+            return j + 1
+        elif char == "\n" and quote != "`":
+            return j  # unterminated; leave the rest to the caller
+        j += 1
+    return j
+
+
+def _skip_template(src: str, i: int) -> int:
+    """Return the index after the template literal starting at i."""
+    j = i + 1
+    depth = 0
+    while j < len(src):
+        char = src[j]
+        if char == "\\":
+            j += 2
+            continue
+        if depth == 0 and char == "`":
+            return j + 1
+        if char == "$" and src.startswith("{", j + 1):
+            depth += 1
+            j += 2
+            continue
+        if depth and char in "\"'`":
+            j = _skip_template(src, j) if char == "`" else _skip_quoted(src, j, char)
+            continue
+        if depth and char == "{":
+            depth += 1
+        elif depth and char == "}":
+            depth -= 1
+        j += 1
+    return j
+
+
+def _regex_allowed(out: List[str]) -> bool:
+    """Whether a slash after the emitted code starts a regular expression."""
+    code = "".join(out[-20:]).rstrip()
+    if not code:
+        return True
+    if code[-1] in "(,=:[!&|?{};+-*%<>~^\n":
+        return True
+    return re.search(r"\b(" + "|".join(_REGEX_KEYWORDS) + r")$", code) is not None
+
+
+def minify_js(src: str) -> str:
+    """
+    Minify a script: drop comments and redundant whitespace.
+
+    Strings, template literals and regular expressions are copied verbatim;
+    line breaks between statements are kept.
+
+    :param src: Script source.
+    :return: Minified script.
+    """
+    out: List[str] = []
+    i, n = 0, len(src)
+    while i < n:
+        char = src[i]
+        if char in "\"'":
+            end = _skip_quoted(src, i, char)
+        elif char == "`":
+            end = _skip_template(src, i)
+        elif char == "/" and src.startswith("/", i + 1):
+            end = src.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        elif char == "/" and src.startswith("*", i + 1):
+            end = src.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            # A comment spanning lines still separates statements
+            src = src[:i] + ("\n" if "\n" in src[i:end] else " ") + src[end:]
+            n = len(src)
+            continue
+        elif char == "/" and _regex_allowed(out):
+            end = _skip_quoted(src, i, "/")
+            while end < n and _IDENT.match(src[end]):
+                end += 1  # flags
+        elif char.isspace():
+            end = i
+            while end < n and src[end].isspace():
+                end += 1
+            prev = out[-1][-1] if out else ""
+            nxt = src[end] if end < n else ""
+            if "\n" in src[i:end]:
+                if prev and prev != "\n":
+                    out.append("\n")
+            elif (_IDENT.match(prev) and _IDENT.match(nxt)) or (prev and prev == nxt and prev in "+-"):
+                out.append(" ")
+            i = end
+            continue
+        else:
+            end = i + 1
+        out.append(src[i:end])
+        i = end
+    return "".join(out).strip() + "\n"
+
+
+# --- Build -----------------------------------------------------------------
+
+
+def build_assets(static_dir: str) -> Dict[str, str]:
+    """
+    Build all bundles into `<static_dir>/dist` and write the manifest.
+
+    Old fingerprinted files are removed once the new manifest is in place.
+
+    :param static_dir: Static folder of the app.
+    :return: Manifest mapping bundle names to paths relative to the static folder.
+    :raises OSError: if sources cannot be read or bundles written.
+    """
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    os.makedirs(dist_dir, exist_ok=True)
+    manifest: Dict[str, str] = {}
+    written = {MANIFEST}
+
+    for name, entries in BUNDLES.items():
+        stem, ext = os.path.splitext(name)
+        if ext == ".css":
+            content = build_css(entries, static_dir, dist_dir)
+        else:
+            parts = []
+            for entry in entries:
+                with open(os.path.join(static_dir, entry), encoding="utf-8") as f:
+                    parts.append(minify_js(f.read()))
+            content = ";\n".join(parts)
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        filename = f"{stem}.{digest}{ext}"
+
+        variants = {filename: data, filename + ".gz": gzip.compress(data, 9, mtime=0)}
+        if brotli is not None:
+            variants[filename + ".br"] = brotli.compress(data, quality=11)
+        for variant, payload in variants.items():
+            with open(os.path.join(dist_dir, variant), "wb") as f:
+                f.write(payload)
+        written.update(variants)
+        manifest[name] = f"{DIST_DIR}/{filename}"
+        logger.info(
+            "Built %s: %s bytes, gzip %s",
+            filename,
+            len(data),
+            len(variants[filename + ".gz"]),
+        )
+
+    with open(os.path.join(dist_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    for stale in set(os.listdir(dist_dir)) - written:
+        os.unlink(os.path.join(dist_dir, stale))
+    return manifest
+
+
+@click.command("build-assets")
+def build_assets_command() -> None:
+    """Bundle, minify, fingerprint and precompress static CSS/JS."""
+    manifest = build_assets(current_app.static_folder)
+    for name, path in manifest.items():
+        click.echo(f"{name} -> {path}")
+
+
+# --- Serving ---------------------------------------------------------------
+
+
+def _manifest() -> Dict[str, str]:
+    """
+    Return the bundle manifest, reloading it when the file changes.
+
+    :return: Manifest, or an empty dict if no bundles were built.
+    """
+    path = os.path.join(current_app.static_folder, DIST_DIR, MANIFEST)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    cached = current_app.extensions.get("asset_manifest")
+    if cached is None or cached[0] != mtime:
+        with open(path, encoding="utf-8") as f:
+            cached = (mtime, json.load(f))
+        current_app.extensions["asset_manifest"] = cached
+    return cached[1]
+
+
+def bundle_fingerprint() -> str:
+    """
+    Identify the current build of the bundles (for cache validators of pages
+    that link them).
+
+    :return: Fingerprinted bundle paths joined, or "" if no bundles were built.
+    """
+    return ",".join(sorted(_manifest().values()))
+
+
+@assets_bp.app_template_global()
+def asset_url(name: str) -> str:
+    """
+    Return the URL of a static bundle.
+
+    :param name: Bundle name from BUNDLES (e.g. "main.css").
+    :return: Fingerprinted bundle URL, or the source file URL if bundles are
+        disabled or not built.
+    """
+    setting = str(current_app.config["ASSETS_USE_BUNDLES"]).lower()
+    use = not current_app.debug if setting == "auto" else setting in ("1", "true", "yes")
+    path = _manifest().get(name) if use else None
+    if path is None:
+        return url_for("static", filename=name)
+    return url_for("assets.bundle", filename=path.split("/", 1)[1])
+
+
+@assets_bp.route(f"/static/{DIST_DIR}/<filename>", methods=["GET"])
+def bundle(filename: str):
+    """
+    Serve a fingerprinted bundle, precompressed if the client accepts it.
+
+    :param filename: Bundle file name from the manifest.
+    :return: Bundle with an immutable Cache-Control header
+    :raises NotFound: for unknown files
+    """
+    mimetype = MIMETYPES.get(os.path.splitext(filename)[1])
+    path = os.path.join(current_app.static_folder, DIST_DIR, filename)
+    if mimetype is None or not os.path.isfile(path):
+        abort(404)
+
+    encoding = None
+    for candidate, suffix in ENCODINGS:
+        if request.accept_encodings[candidate] and os.path.isfile(path + suffix):
+            encoding, path = candidate, path + suffix
+            break
+
+    response = send_file(path, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
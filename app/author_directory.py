@@ -0,0 +1,166 @@
+"""
+app / author_directory.py
+
+Purpose:
+In-process cache of the author directory, a sorted list of (id, name) entries
+used to fill the author dropdowns on the home, add-book and edit-book pages.
+
+Background:
+Authors change far less often than these pages are viewed, so loading every
+Author row on each request is wasted work. The directory is cached per app in
+`app.extensions["author_directory"]` as lightweight named tuples. Two mechanisms keep it fresh:
+- Writes in this process: mapper events on Author drop the cache when a flush
+  touches an author, and again after the commit.
+- Writes in other worker processes: every Author write increments the
+  `authors_version` counter in the shared `app_metadata` table in the same
+  transaction. Before serving the cache, a process compares its cached version
+  with that row (at most once per `AUTHOR_DIRECTORY_CHECK_INTERVAL` seconds)
+  and reloads if they differ.
+
+Features:
+- `get_author_directory()` returns cached `AuthorEntry(id, name)` tuples
+- Write-driven invalidation via after_insert/after_update/after_delete events
+- Cross-process staleness detection through a shared version counter
+
+Required Modules:
+- threading, time: For the cache lock and check throttling
+- flask.current_app: For configuration access and per-app cache storage
+- sqlalchemy.event: For mapper and session events
+- app.models, app.utils: ORM models and shared counter helpers
+
+Exceptions:
+- SQLAlchemyError: Raised if loading the directory or the version fails
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import threading
+import time
+from typing import NamedTuple, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.models import db, Author
+from app.utils import read_counter, bump_counter
+
+VERSION_KEY = "authors_version"
+
+
+class AuthorEntry(NamedTuple):
+    """Lightweight author directory entry exposing `id` and `name` like Author."""
+
+    id: int
+    name: str
+
+
+class _DirectoryCache:
+    """Per-app cache state guarded by a lock."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.entries: Tuple[AuthorEntry, ...] | None = None
+        self.version: int | None = None
+        self.checked_at: float = 0.0
+
+    def invalidate(self) -> None:
+        """Drop the cached entries so the next read reloads them."""
+        with self.lock:
+            self.entries = None
+            self.version = None
+
+
+def _directory_cache() -> _DirectoryCache:
+    """
+    Return the current app's directory cache, creating it on first use.
+
+    :return: _DirectoryCache shared by all requests of the app.
+    """
+    extensions = current_app._get_current_object().extensions
+    return extensions.setdefault("author_directory", _DirectoryCache())
+
+
+def get_author_directory() -> Tuple[AuthorEntry, ...]:
+    """
+    Return all authors as (id, name) entries ordered by name.
+
+    Served from the app's cache unless it was invalidated locally or the shared
+    version counter shows that another process changed the authors.
+
+    :return: Tuple of AuthorEntry items sorted by name.
+    :raises SQLAlchemyError: If the database query fails.
+    """
+    interval = current_app.config.get("AUTHOR_DIRECTORY_CHECK_INTERVAL", 1.0)
+    now = time.monotonic()
+    cache = _directory_cache()
+
+    with cache.lock:
+        if cache.entries is not None and now - cache.checked_at < interval:
+            return cache.entries
+
+    version = read_counter(db.session, VERSION_KEY)
+
+    with cache.lock:
+        if cache.entries is not None and cache.version == version:
+            cache.checked_at = now
+            return cache.entries
+
+    rows = db.session.query(Author.id, Author.name).order_by(Author.name).all()
+    entries = tuple(AuthorEntry(row.id, row.name) for row in rows)
+
+    with cache.lock:
+        cache.entries = entries
+        cache.version = version
+        cache.checked_at = now
+    return entries
+
+
+def invalidate_author_directory() -> None:
+    """Drop the current app's author directory cache (no-op without an app context)."""
+    if has_app_context():
+        _directory_cache().invalidate()
+
+
+@event.listens_for(Author, "after_insert")
+@event.listens_for(Author, "after_update")
+@event.listens_for(Author, "after_delete")
+def _author_changed(mapper, connection, target: Author) -> None:
+    """
+    Bump the shared version and drop the local cache after an author write.
+
+    :param mapper: Author mapper (unused).
+    :param connection: Connection used by the current flush.
+    :param target: The Author instance that was written.
+    """
+    bump_counter(connection, VERSION_KEY)
+    session = object_session(target)
+    if session is not None:
+        session.info["author_directory_dirty"] = True
+    invalidate_author_directory()
+
+
+@event.listens_for(Session, "after_commit")
+def _author_commit(session: Session) -> None:
+    """
+    Drop the local cache again once author changes are committed.
+
+    A concurrent request may have reloaded the directory between the flush and
+    the commit and cached the pre-commit state under the old version.
+
+    :param session: The session that committed.
+    """
+    if session.info.pop("author_directory_dirty", False):
+        invalidate_author_directory()
+
+
+@event.listens_for(Session, "after_rollback")
+def _author_rollback(session: Session) -> None:
+    """
+    Drop the local cache if the rolled-back transaction had changed authors.
+
+    :param session: The session that rolled back.
+    """
+    if session.info.pop("author_directory_dirty", False):
+        invalidate_author_directory()
@@ -6,15 +6,17 @@ detail view, and deletion of author records. Supports both full-page
 views and AJAX modal fragments for integration in a dynamic frontend.
 
 Features:
-- List all authors alphabetically
+- List all authors alphabetically with book counts from a single GROUP BY query
 - Add new authors via full-page or modal form
 - View author details
 - Delete authors with confirmation (AJAX support)
+- 304 Not Modified for unchanged list and detail views (library change counter)
 
 Modules:
 - flask: routing, rendering, request handling
-- app.models: database models (Author)
+- app.models: database models (Author, Book)
 - app.utils: utility functions for date parsing and DB commit
+- app.conditional: ETag validators and 304 responses
 - sqlalchemy.exc: for database error handling
 - werkzeug.exceptions: for standardized HTTP error responses
 
@@ -30,10 +32,12 @@ Date: 2025-07-10
 
 import logging
 from flask import Blueprint, render_template, request, redirect, url_for, jsonify
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.exceptions import InternalServerError
-from app.models import db, Author
+from app.models import db, Author, Book
 from ..utils import parse_date, commit_session
+from ..conditional import library_conditional
 
 logger = logging.getLogger(__name__)
 
@@ -41,21 +45,38 @@ authors_bp = Blueprint("authors", __name__, url_prefix="/authors")
 
 
 @authors_bp.route("/", methods=["GET"])
+@library_conditional
 def list_authors() -> str:
     """
     Retrieve and list all authors ordered alphabetically by name.
 
+    Book counts are computed in the same query with a GROUP BY instead of
+    loading each author's book collection.
+
     :return: Rendered HTML template for author list (full-page or modal).
     :raises InternalServerError: If a database error occurs.
     """
     try:
-        authors = Author.query.order_by(Author.name).all()
+        rows = (
+            db.session.query(Author, func.count(Book.id))
+            .outerjoin(Book, Book.author_id == Author.id)
+            .group_by(Author.id)
+            .order_by(Author.name)
+            .all()
+        )
+        authors = [author for author, _ in rows]
+        book_counts = {author.id: count for author, count in rows}
+
         # Return a modal partial if requested via ?modal=true
         if request.args.get("modal") == "true":
-            return render_template("partials/list/author.html", authors=authors)
+            return render_template(
+                "partials/list/author.html", authors=authors, book_counts=book_counts
+            )
 
         # Fallback
-        return render_template("authors/list.html", authors=authors)
+        return render_template(
+            "authors/list.html", authors=authors, book_counts=book_counts
+        )
 
     except SQLAlchemyError:
         logger.exception("Database error while listing authors")
@@ -126,6 +147,7 @@ def add_author() -> str:
 
 
 @authors_bp.route("/<int:author_id>", methods=["GET"])
+@library_conditional
 def author_detail(author_id: int) -> str:
     """
     Display details for a specific author.
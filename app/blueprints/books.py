@@ -6,14 +6,24 @@ as well as AJAX endpoints for rating and status updates.
 Features:
 - Add new books via HTML form
 - Edit existing book information and update reading status
-- View detailed book information, optionally as modal
+- View detailed book information, optionally as modal, with similar books
+- Similar-books lookup (MinHash/LSH index) as JSON
 - Delete books, including optional deletion of the author if no books remain
 - Rate books via AJAX
+- Batch-update ratings and reading progress in one transaction
+- Bulk import books and authors from an uploaded CSV/JSONL file
+- Stream the library as CSV or NDJSON with the home page filters
 
 Dependencies:
 - Flask (Blueprint, render_template, request, redirect, url_for, jsonify)
-- SQLAlchemy ORM (db, Book, Author)
+- SQLAlchemy ORM (db, Book)
 - Utility: commit_session (wrapper for database commit with error handling)
+- get_author_directory (cached author list for the author dropdowns)
+- app.services.importer (streaming bulk import)
+- app.services.exporter (streaming export)
+- app.similar.similar_books (precomputed similarity index)
+- app.fragment_cache.invalidate_books (drops cached cards after batched updates)
+- app.conditional (304 responses for unchanged details; counter bump for batches)
 
 Raises:
 - ValueError: if form data is missing or invalid
@@ -21,6 +31,8 @@ Raises:
 - SQLAlchemyError: if database operations fail
 - JSONDecodeError: when parsing request payloads fails (where applicable)
 - NotFound: if a queried book or author does not exist
+- Conflict (409 JSON): if a book was changed by a concurrent request while being
+  edited or rated (optimistic versioning on Book.version)
 
 Author: Martin Haferanke
 Date: 2025-07-10
@@ -29,10 +41,30 @@ Date: 2025-07-10
 import logging
 from datetime import datetime
 
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify
-from app.models import db, Book, Author
+from flask import (
+    Blueprint,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    jsonify,
+    current_app,
+    Response,
+    stream_with_context,
+    abort,
+)
+from app.models import db, Book, next_book_version
 from ..utils import commit_session
+from ..author_directory import get_author_directory
+from ..services.importer import detect_format, import_books
+from ..services import exporter
+from ..similar import similar_books
+from ..fragment_cache import invalidate_books
+from ..conditional import bump_library_version, library_conditional
+from sqlalchemy import case, update
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.exc import StaleDataError
 
 logger = logging.getLogger(__name__)
 
@@ -58,7 +90,7 @@ def add_book():
     :raises SQLAlchemyError: if committing the new book to the database fails
     """
     message = None
-    authors = Author.query.order_by(Author.name).all()
+    authors = get_author_directory()
 
     if request.method == "POST":
         # Retrieve form data
@@ -137,6 +169,7 @@ def delete_book(book_id: int):
 
 
 @books_bp.route("/<int:book_id>", methods=["GET"])
+@library_conditional
 def book_detail(book_id: int):
     """
     Display book details, optionally as modal.
@@ -146,10 +179,49 @@ def book_detail(book_id: int):
     :return: Rendered template
     :raises NotFound: if book does not exist
     """
-    book = Book.query.get_or_404(book_id)
+    book = Book.query.options(joinedload(Book.author)).get_or_404(book_id)
+    similar = similar_books(book.id, current_app.config["SIMILAR_BOOKS_K"])
     if request.args.get("modal") == "true":
-        return render_template("partials/detail/book.html", book=book)
-    return render_template("books/detail.html", book=book)
+        return render_template("partials/detail/book.html", book=book, similar=similar)
+    return render_template("books/detail.html", book=book, similar=similar)
+
+
+@books_bp.route("/<int:book_id>/similar", methods=["GET"])
+def book_similar(book_id: int):
+    """
+    Return the books most similar to a book (MinHash/LSH index).
+
+    :param book_id: ID of the book
+    :query k: Number of neighbours (default SIMILAR_BOOKS_K, max SIMILAR_BOOKS_MAX_K)
+    :return: JSON with the book id and a list of {id, title, author, score}
+    :raises NotFound: if book does not exist
+    """
+    if db.session.get(Book, book_id) is None:
+        abort(404)
+    k = request.args.get("k", current_app.config["SIMILAR_BOOKS_K"], type=int)
+    k = max(1, min(k, current_app.config["SIMILAR_BOOKS_MAX_K"]))
+    return jsonify({"book_id": book_id, "similar": similar_books(book_id, k)})
+
+
+def _version_conflict(book_id: int):
+    """
+    Answer a write that lost a race against a concurrent write to the same book.
+
+    The session has already been rolled back by commit_session().
+
+    :param book_id: ID of the book
+    :return: 409 JSON response
+    """
+    logger.warning("Concurrent update of book %s; write rejected", book_id)
+    return (
+        jsonify(
+            {
+                "success": False,
+                "error": "The book was changed by another request. Reload and try again.",
+            }
+        ),
+        409,
+    )
 
 
 @books_bp.route("/<int:book_id>/edit", methods=["GET", "POST"])
@@ -164,12 +236,13 @@ def edit_book(book_id: int):
     :form rating: New integer rating (optional, 0–10)
     :form is_read: 'on' if read (optional)
     :form progress: Integer 0–100 (optional)
-    :return: JSON for AJAX or rendered modal template
+    :return: JSON for AJAX (409 if the book was changed concurrently) or
+        rendered modal template
     :raises NotFound: if book not found
     :raises SQLAlchemyError: if commit fails
     """
     book = Book.query.get_or_404(book_id)
-    authors = Author.query.order_by(Author.name).all()
+    authors = get_author_directory()
 
     if request.method == "POST":
         try:
@@ -189,8 +262,10 @@ def edit_book(book_id: int):
             if progress_str.isdigit():
                 book.progress = max(0, min(100, int(progress_str)))
 
-            db.session.commit()
+            commit_session()
             return jsonify({"success": True})
+        except StaleDataError:
+            return _version_conflict(book_id)
         except (ValueError, SQLAlchemyError):
             logger.exception("Failed to edit book")
             return jsonify({"success": False})
@@ -209,7 +284,8 @@ def rate_book(book_id: int):
 
     :param book_id: Book ID
     :form rating: Integer rating 0–10
-    :return: JSON success flag and new rating
+    :return: JSON success flag and new rating (409 if the book was changed
+        concurrently)
     :raises NotFound: if book not found
     :raises ValueError: if rating invalid
     :raises SQLAlchemyError: if commit fails
@@ -219,6 +295,172 @@ def rate_book(book_id: int):
         book.rating = int(request.form.get("rating", 0))
         commit_session()
         return jsonify({"success": True, "rating": book.rating})
+    except StaleDataError:
+        return _version_conflict(book_id)
     except (ValueError, SQLAlchemyError):
         logger.exception("Failed to rate book")
         raise
+
+
+def _parse_book_updates(items) -> dict:
+    """
+    Validate and coalesce batched book updates.
+
+    Later entries for the same book override earlier ones field by field.
+    Ratings are clamped to 0–10 and progress to 0–100, as in `edit_book()`.
+
+    :param items: List of dicts with book_id and any of rating, progress, is_read
+    :return: Mapping of book_id to a dict of column values
+    :raises ValueError: if an entry is malformed
+    """
+    if not isinstance(items, list):
+        raise ValueError("'updates' must be a list.")
+
+    merged: dict = {}
+    for item in items:
+        if not isinstance(item, dict) or "book_id" not in item:
+            raise ValueError("Each update needs a 'book_id'.")
+        values = merged.setdefault(int(item["book_id"]), {})
+        if item.get("rating") is not None:
+            values["rating"] = max(0, min(10, int(item["rating"])))
+        if item.get("progress") is not None:
+            values["progress"] = max(0, min(100, int(item["progress"])))
+        if item.get("is_read") is not None:
+            values["is_read"] = item["is_read"] in (True, 1, "true", "on", "1")
+    return {book_id: values for book_id, values in merged.items() if values}
+
+
+@books_bp.route("/batch-update", methods=["POST"])
+def batch_update_books():
+    """
+    Apply many rating/progress/read-status updates in a single transaction.
+
+    Each changed column is set with one CASE expression keyed by book id, so the
+    whole batch is written by a single UPDATE statement and one commit.
+
+    :json updates: List of {book_id, rating?, progress?, is_read?}
+    :return: JSON with success flag, updated ids and ids that were not found;
+        400 if the body is not a JSON object or an update is invalid
+    :raises SQLAlchemyError: if the update or commit fails
+    """
+    # A malformed or non-JSON body is a client error, not an empty batch
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"success": False, "error": "Body must be a JSON object."}), 400
+    try:
+        updates = _parse_book_updates(payload.get("updates", []))
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    limit = current_app.config["BOOK_BATCH_UPDATE_MAX"]
+    if len(updates) > limit:
+        return (
+            jsonify({"success": False, "error": f"At most {limit} books per batch."}),
+            400,
+        )
+    if not updates:
+        return jsonify({"success": True, "updated": [], "not_found": []})
+
+    ids = list(updates)
+    existing = {
+        row.id for row in db.session.query(Book.id).filter(Book.id.in_(ids))
+    }
+
+    assignments = {}
+    for column in ("rating", "progress", "is_read"):
+        whens = {
+            book_id: values[column]
+            for book_id, values in updates.items()
+            if column in values and book_id in existing
+        }
+        if whens:
+            attr = getattr(Book, column)
+            assignments[column] = case(whens, value=Book.id, else_=attr)
+
+    try:
+        if assignments:
+            # Core UPDATE bypasses the ORM versioning, so advance the version here
+            # (as next_book_version() does: a timestamp, but always increasing)
+            now = next_book_version()
+            assignments["version"] = case(
+                (Book.version >= now, Book.version + 1), else_=now
+            )
+            db.session.execute(
+                update(Book)
+                .where(Book.id.in_(existing))
+                .values(**assignments)
+                .execution_options(synchronize_session=False)
+            )
+            bump_library_version(db.session)
+        commit_session()
+        invalidate_books(existing)
+    except SQLAlchemyError:
+        logger.exception("Failed to apply batched book updates")
+        raise
+
+    return jsonify(
+        {
+            "success": True,
+            "updated": sorted(existing),
+            "not_found": sorted(set(ids) - existing),
+        }
+    )
+
+
+@books_bp.route("/import", methods=["POST"])
+def import_books_upload():
+    """
+    Bulk import books from an uploaded CSV or JSONL file.
+
+    The upload is streamed row by row and written in batches; see
+    app/services/importer.py for the accepted columns.
+
+    :form file: CSV (with header row) or JSONL file
+    :query format: 'csv' or 'jsonl' (optional, defaults to the file extension)
+    :query batch_size: Rows per insert batch (optional)
+    :return: JSON import report (imported, rejected, errors, throughput)
+    """
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"success": False, "error": "No file uploaded."}), 400
+
+    try:
+        fmt = detect_format(upload.filename, request.args.get("format"))
+    except ValueError as ve:
+        return jsonify({"success": False, "error": str(ve)}), 400
+
+    batch_size = request.args.get(
+        "batch_size", current_app.config["IMPORT_BATCH_SIZE"], type=int
+    )
+    report = import_books(upload.stream, fmt, db.engine, batch_size)
+    return jsonify({"success": True, **report})
+
+
+@books_bp.route("/export", methods=["GET"])
+def export_books():
+    """
+    Stream the library (books joined with author fields) as CSV or NDJSON.
+
+    Rows are read from a streaming cursor and sent in chunks, so memory use does
+    not grow with the library size.
+
+    :query format: 'csv' (default) or 'ndjson'
+    :query search: Search terms as on the home page (optional)
+    :query author_id: Author ID to filter by (optional)
+    :return: Streamed attachment response
+    """
+    fmt = request.args.get("format", "csv", type=str).lower()
+    if fmt not in exporter.FORMATS:
+        return jsonify({"success": False, "error": "Format must be csv or ndjson."}), 400
+
+    body = exporter.generate_export(
+        fmt,
+        request.args.get("search", type=str),
+        request.args.get("author_id", type=int),
+    )
+    filename = f"library-{datetime.now():%Y%m%d}.{fmt}"
+    return Response(
+        stream_with_context(body),
+        content_type=exporter.FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
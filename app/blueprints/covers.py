@@ -0,0 +1,102 @@
+# app / blueprints / covers.py
+"""
+Serves book cover thumbnails from the local cover cache.
+
+Thumbnail URLs contain the size, the normalized ISBN and the format, so the
+content behind a URL never changes and browsers may cache it for a year
+without revalidating. Covers that are missing or could not be fetched are
+answered with a placeholder image that browsers and proxies keep only for
+COVER_PLACEHOLDER_MAX_AGE seconds, so a cover shows up soon after it becomes
+available (COVER_MISSING_TTL only applies to the server-side missing marker).
+
+Features:
+- GET /covers/<size>/<isbn>.<jpg|webp>
+- Template globals `cover_url()` and `cover_webp()` for the cover macro in
+  partials/cover.html (lazy-loaded <picture> with WebP and 2x sources)
+
+Dependencies:
+- Flask (Blueprint, send_file, url_for, abort)
+- app.services.covers: cover cache and sources
+
+Raises:
+- NotFound: for unknown sizes or formats and non-canonical ISBNs
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+import os
+
+from flask import Blueprint, abort, current_app, send_file, url_for
+
+from ..services import covers
+
+logger = logging.getLogger(__name__)
+
+covers_bp = Blueprint("covers", __name__)
+
+PLACEHOLDER = "assets/cover-placeholder.svg"
+
+# Thumbnails never change for a given URL
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+@covers_bp.app_template_global()
+def cover_url(isbn: str | None, size: str = "M", ext: str = "jpg") -> str:
+    """
+    Build the URL of a cover thumbnail.
+
+    :param isbn: ISBN in any notation.
+    :param size: Size name from COVER_SIZES.
+    :param ext: "jpg" or "webp".
+    :return: Thumbnail URL, or the placeholder URL for a missing/invalid ISBN.
+    """
+    normalized = covers.normalize_isbn(isbn)
+    if normalized is None:
+        return url_for("static", filename=PLACEHOLDER)
+    return url_for("covers.cover", size=size, isbn=normalized, ext=ext)
+
+
+@covers_bp.app_template_global()
+def cover_webp(isbn: str | None) -> bool:
+    """
+    :param isbn: ISBN in any notation.
+    :return: True if a WebP source should be offered for this cover.
+    """
+    return covers.webp_supported() and covers.normalize_isbn(isbn) is not None
+
+
+@covers_bp.route("/<size>/<isbn>.<ext>", methods=["GET"])
+def cover(size: str, isbn: str, ext: str):
+    """
+    Serve a cover thumbnail, fetching and resizing the cover on first request.
+
+    :param size: Size name from COVER_SIZES.
+    :param isbn: Normalized ISBN.
+    :param ext: "jpg" or "webp" (if supported).
+    :return: The thumbnail (immutable) or the placeholder (short-lived)
+    :raises NotFound: for unknown sizes/formats or non-canonical ISBNs
+    """
+    if (
+        size not in current_app.config["COVER_SIZES"]
+        or ext not in covers.available_formats()
+        or covers.normalize_isbn(isbn) != isbn
+    ):
+        abort(404)
+
+    path = covers.get_cover(isbn, size, ext)
+    if path is None:
+        # Short-lived: the cause may be transient (timeout, 5xx)
+        return send_file(
+            os.path.join(current_app.static_folder, PLACEHOLDER),
+            mimetype="image/svg+xml",
+            max_age=current_app.config["COVER_PLACEHOLDER_MAX_AGE"],
+        )
+
+    with open(path, "rb") as f:
+        mimetype = covers.sniff_mimetype(f.read(12))
+    response = send_file(path, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
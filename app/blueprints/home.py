@@ -4,17 +4,25 @@ Provides the main landing page of the application with support for book search,
 author filtering, and dynamic sorting of results.
 
 Features:
-- Filter books by partial title match
+- Full-text search over title, description and author (SQLite FTS5, bm25-ranked)
 - Filter books by specific author ID
 - Sort results by book title or author name
+- Keyset-paginated results with a "load more" fragment endpoint
+- Authors are loaded together with their books (no per-card author query)
 - Display dynamic messages based on filters
+- 304 Not Modified for unchanged pages (library change counter)
 
 Dependencies:
-- Flask (Blueprint, render_template, request)
+- Flask (Blueprint, render_template, request, current_app, url_for)
 - SQLAlchemy ORM (Book, Author)
+- app.search.filter_books (FTS5 search with LIKE fallback, author filter)
+- app.pagination.keyset_page (cursor pagination)
+- app.author_directory.get_author_directory (cached author dropdown)
+- app.conditional.library_conditional (ETag, 304 responses)
 
 Raises:
 - SQLAlchemyError: if database query fails
+- BadRequest: if a pagination cursor is invalid
 - Exception: for any unexpected error during rendering
 
 Author: Martin Haferanke
@@ -22,23 +30,94 @@ Date: 2025-07-10
 """
 
 import logging
-from flask import Blueprint, render_template, request
+from flask import Blueprint, render_template, request, current_app, url_for
 from app.models import Book, Author
+from app.search import filter_books
+from app.author_directory import get_author_directory
+from app.pagination import keyset_page
+from app.conditional import library_conditional
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, contains_eager
+from werkzeug.exceptions import HTTPException
 
 logger = logging.getLogger(__name__)
 
 home_bp = Blueprint("home", __name__)
 
 
+def build_book_query(search_query: str | None, author_id: int | None, sort_param: str | None):
+    """
+    Build the filtered book query and its keyset sort keys for the listing.
+
+    Title and author sorts are case-insensitive (served by the lower() indexes).
+    The last sort key is always Book.id so that the order is total. Each book's
+    author is loaded in the same query so rendering the cards issues no
+    further SELECTs.
+
+    :param search_query: Search terms (optional)
+    :param author_id: Author ID to filter by (optional)
+    :param sort_param: 'title', 'author' or None for default order
+    :return: Tuple of (query, effective sort name, list of sort key columns)
+    """
+    q, rank = filter_books(Book.query, search_query, author_id)
+
+    if sort_param == "author":
+        q = q.join(Author).options(contains_eager(Book.author))
+        return q, "author", [func.lower(Author.name), Book.id]
+
+    q = q.options(joinedload(Book.author))
+    if sort_param == "title":
+        return q, "title", [func.lower(Book.title), Book.id]
+    if rank is not None:
+        return q, "relevance", [rank, Book.id]
+    return q, "id", [Book.id]
+
+
+def fetch_book_page(search_query, author_id, sort_param):
+    """
+    Fetch one bounded page of books for the current request's filters.
+
+    :query cursor: Cursor returned with the previous page (optional)
+    :query limit: Page size, capped at BOOKS_PAGE_SIZE_MAX (optional)
+    :return: Tuple of (books, next page URL or None)
+    :raises BadRequest: if the cursor is invalid
+    """
+    page_size = current_app.config["BOOKS_PAGE_SIZE"]
+    limit = request.args.get("limit", page_size, type=int)
+    limit = max(1, min(limit, current_app.config["BOOKS_PAGE_SIZE_MAX"]))
+    cursor = request.args.get("cursor", type=str)
+
+    q, sort, keys = build_book_query(search_query, author_id, sort_param)
+    books, next_cursor = keyset_page(q, sort, keys, cursor, limit)
+
+    next_url = None
+    if next_cursor:
+        next_url = url_for(
+            "home.book_page",
+            search=search_query,
+            author_id=author_id,
+            sort=sort_param,
+            limit=limit if limit != page_size else None,
+            cursor=next_cursor,
+        )
+    return books, next_url
+
+
 @home_bp.route("/", methods=["GET"])
+@library_conditional
 def home():
     """
     Display the home page with optional filters and sorting.
 
-    :query search: Title substring to search (optional)
+    Only the first page of books is rendered; further pages are loaded through
+    `book_page()`.
+
+    :query search: Search terms for title, description or author (optional)
     :query author_id: ID of the author to filter by (optional)
     :query sort: Sort by 'title' or 'author' (optional)
+    :query cursor: Pagination cursor (optional)
+    :query limit: Page size (optional)
     :return: Rendered home page template
     :raises SQLAlchemyError: on database query errors
     :raises Exception: on unexpected errors
@@ -49,22 +128,11 @@ def home():
         sort_param = request.args.get("sort", type=str)
         message = None
 
-        q = Book.query
-
-        if search_query:
-            q = q.filter(Book.title.ilike(f"%{search_query}%"))
-
         author = None
         if author_id:
-            q = q.filter(Book.author_id == author_id)
             author = Author.query.get(author_id)
 
-        if sort_param == "title":
-            q = q.order_by(Book.title)
-        elif sort_param == "author":
-            q = q.join(Author).order_by(Author.name)
-
-        books = q.all()
+        books, next_url = fetch_book_page(search_query, author_id, sort_param)
 
         # Toast Message
         if search_query and not author_id:
@@ -74,11 +142,12 @@ def home():
         elif search_query and author:
             message = f'Showing results for "{search_query}" by author: {author.name}'
 
-        authors = Author.query.order_by(Author.name).all()
+        authors = get_author_directory()
 
         return render_template(
             "home.html",
             books=books,
+            next_url=next_url,
             authors=authors,
             selected_author=author_id,
             selected_sort=sort_param,
@@ -86,9 +155,47 @@ def home():
             message=message,
         )
 
+    except HTTPException:
+        raise
     except SQLAlchemyError:
         logger.exception("Database error during home page rendering")
         raise
     except Exception:
         logger.exception("Failed to load home page")
         raise
+
+
+@home_bp.route("/page", methods=["GET"])
+@library_conditional
+def book_page():
+    """
+    Return the next page of book cards as an HTML fragment for "load more".
+
+    Accepts the same filters as `home()`. The URL of the following page is sent
+    in the `X-Next-Page` response header and omitted on the last page.
+
+    :query search: Search terms (optional)
+    :query author_id: ID of the author to filter by (optional)
+    :query sort: Sort by 'title' or 'author' (optional)
+    :query cursor: Cursor returned with the previous page
+    :query limit: Page size (optional)
+    :return: Rendered book card fragment
+    :raises BadRequest: if the cursor is invalid
+    :raises SQLAlchemyError: on database query errors
+    """
+    try:
+        books, next_url = fetch_book_page(
+            request.args.get("search", type=str),
+            request.args.get("author_id", type=int),
+            request.args.get("sort", type=str),
+        )
+    except SQLAlchemyError:
+        logger.exception("Database error while loading book page")
+        raise
+
+    response = current_app.make_response(
+        render_template("partials/list/book.html", books=books)
+    )
+    if next_url:
+        response.headers["X-Next-Page"] = next_url
+    return response
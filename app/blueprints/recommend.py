@@ -10,12 +10,20 @@ Features:
 - JSON-based interaction with AI model
 - Deduplication to avoid suggesting already owned books
 - Author creation and book insertion for selected recommendations
+- Persistent response cache keyed on the prompt inputs (TTL + LRU)
+- Background recommendation jobs with JSON polling (default) and Server-Sent
+  Events (RECOMMENDATION_TRANSPORT=sse, for threaded or async servers)
+- Coalescing metrics: upstream calls saved per prompt fingerprint
+- Quota status for the current client, so the page can back off before a 429
+- Streamed results: each recommendation card is pushed to the page as soon as
+  the job has received it (AI_STREAMING)
 
 Dependencies:
 - Flask (Blueprint, render_template, request, jsonify)
 - SQLAlchemy ORM (db, Book)
 - Utility functions: commit_session, get_or_create_author
-- AI services: prepare_books_data, fetch_ai_recommendation
+- Prompt builder: load_seed_books, build_recommendation_prompt (token budget)
+- Recommendation jobs: enqueue_job, get_job (AI call, caching and dedup run there)
 
 Raises:
 - ValueError: for invalid or missing input fields (dates, required form data)
@@ -29,17 +37,30 @@ Date: 2025-07-10
 
 import json
 import logging
+import time
 from datetime import datetime
 
-from flask import Blueprint, render_template, request, jsonify
-from sqlalchemy import desc
+from flask import (
+    Blueprint,
+    render_template,
+    request,
+    jsonify,
+    redirect,
+    url_for,
+    abort,
+    current_app,
+    Response,
+    stream_with_context,
+)
 from sqlalchemy.exc import SQLAlchemyError
 
 from ..extentions import limiter
+from ..ratelimit import quota_status
 
 from app.models import db, Book
 from ..utils import commit_session, get_or_create_author
-from ..services.ai_services import prepare_books_data, fetch_ai_recommendation
+from ..services import prompt_builder, recommendation_jobs
+from ..services.single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -60,84 +81,248 @@ def show_recommend_form():
 @limiter.limit("3/minute")
 def generate_recommendations():
     """
-    Generate 3 book recommendations using AI based on top-rated books.
+    Start a background job that generates 3 book recommendations using AI.
 
-    :return: Rendered recommend.html with recommendations or error
-    :raises Exception: if AI service fails or no top-rated books
+    The prompt is built from the top-rated books right away; the AI call runs on
+    the job worker pool. Browsers are redirected to the job page, which waits for
+    the result via Server-Sent Events (or polling). JSON clients get 202 with the
+    job URLs.
+
+    :form refresh: '1' to bypass the response cache (optional)
+    :return: Redirect to the job page, 202 JSON, or recommend.html with an error
+    :raises Exception: if the job cannot be created
     """
-    top_books = Book.query.filter(Book.rating >= 8).order_by(desc(Book.rating)).all()
+    top_books = prompt_builder.load_seed_books(
+        current_app.config["RECOMMENDATION_SEED_BOOKS"]
+    )
     if not top_books:
         return render_template(
             "recommend.html", error="You don't have any books rated above 8 yet."
         )
 
     try:
-        data = prepare_books_data(top_books)
-        existing_titles = [b.title for b in Book.query.all()]
-
-        prompt = f"""
-        Based on these top-rated books, recommend exactly 3 similar titles.
-        Exclude any books already in the library: {existing_titles}
-
-        Return your answer as valid JSON with one top-level key:
-
-        {{
-          "recommendations": [
-            {{
-              "title": "<string>",
-              "author": "<string>",
-              "author_birth_date": "YYYY-MM-DD",
-              "author_date_of_death": "YYYY-MM-DD",
-              "description": "<string, max 2 short sentences>",
-              "isbn": "<string>",
-              "publication_year": <integer>
-            }},
-            {{ ... }},
-            {{ ... }}
-          ]
-        }}
-
-        Top-rated books to base your recommendations on:
-        {json.dumps(data, indent=2)}
-
-        Make sure:
-        - The outer object has exactly one field: "recommendations".
-        - There are exactly 3 items in the array.
-        - Dates use ISO format (YYYY-MM-DD) or an empty string.
-        - Descriptions are brief (max. 2 sentences).
-        - Try to vary in your book selection to get different recommendations.
-        """
-
-        result = fetch_ai_recommendation(prompt)
-        if isinstance(result, dict):
-            recs = result.get("recommendations", [])
-        elif isinstance(result, list):
-            recs = result
-        else:
-            logger.error("Unexpected AI response format: %r", result)
-            recs = []
-
-        existing = {(b.title, b.author.name) for b in Book.query.all()}
-        filtered = [
-            r for r in recs if (r.get("title"), r.get("author")) not in existing
-        ]
-
-        message = None
-        if not filtered:
-            message = (
-                "All recommended books are already in your library. Try again later."
-            )
+        prompt = prompt_builder.build_recommendation_prompt(top_books)
 
-        return render_template(
-            "recommend.html",
-            recommendations=filtered,
-            user_books=top_books,
-            error=message,
+        user_books = [{"title": b.title, "rating": b.rating} for b in top_books]
+        job_id = recommendation_jobs.enqueue_job(
+            prompt, user_books, refresh=request.form.get("refresh") == "1"
         )
     except Exception as e:
-        logger.exception("Recommendation generation failed")
+        logger.exception("Could not start recommendation job")
         return render_template("recommend.html", error=f"An error occurred: {e}")
 
+    if request.accept_mimetypes.best == "application/json":
+        return (
+            jsonify(
+                {
+                    "job_id": job_id,
+                    "status_url": url_for("recommend.job_status", job_id=job_id),
+                    "events_url": url_for("recommend.job_events", job_id=job_id),
+                }
+            ),
+            202,
+        )
+    return redirect(url_for("recommend.job_view", job_id=job_id), code=303)
+
+
+def _job_or_404(job_id: str) -> dict:
+    """
+    Load a recommendation job or abort with 404.
+
+    :param job_id: Job identifier
+    :return: Job dict from recommendation_jobs.get_job()
+    :raises NotFound: if the job does not exist
+    """
+    job = recommendation_jobs.get_job(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+
+def _new_cards(job: dict, after: int) -> list:
+    """
+    Render the recommendations a running job received after the first `after`.
+
+    :param job: Job dict from recommendation_jobs.get_job()
+    :param after: Number of recommendations the client already shows
+    :return: Card HTML strings (empty unless the job is running)
+    """
+    if job["status"] != recommendation_jobs.RUNNING or not job["result"]:
+        return []
+    return [
+        render_template("partials/list/recommendation.html", book=rec, preview=True)
+        for rec in job["result"]["recommendations"][after:]
+    ]
+
+
+@recommend_bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id: str):
+    """
+    Return the state of a recommendation job as JSON (for polling).
+
+    :param job_id: Job identifier
+    :query after: Number of recommendations the page already shows (optional);
+        the rendered cards of newer ones are returned in `cards`
+    :return: JSON with status, error, new cards and, once done, the recommendations
+    :raises NotFound: if the job does not exist
+    """
+    job = _job_or_404(job_id)
+    after = max(request.args.get("after", 0, type=int), 0)
+    response = jsonify(
+        {
+            "job_id": job["id"],
+            "status": job["status"],
+            "error": job["error"],
+            "result": job["result"],
+            "cards": _new_cards(job, after),
+        }
+    )
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@recommend_bp.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id: str):
+    """
+    Stream job status changes as Server-Sent Events until the job finishes.
+
+    While the job runs, every recommendation it has received so far is sent
+    once as a `recommendation` event carrying the rendered card HTML. The
+    stream ends after a finished status, when the job is deleted, or after
+    RECOMMENDATION_SSE_TIMEOUT seconds; EventSource clients reconnect
+    automatically in the latter case.
+
+    The stream holds a server thread while open, so the job page only uses it
+    with RECOMMENDATION_TRANSPORT=sse (threaded or async servers); polling
+    `job_status()` is the default.
+
+    :param job_id: Job identifier
+    :query after: Number of recommendations the page already shows (optional;
+        the Last-Event-ID header of a reconnect takes precedence)
+    :return: text/event-stream response
+    :raises NotFound: if the job does not exist
+    """
+    _job_or_404(job_id)
+    timeout = current_app.config["RECOMMENDATION_SSE_TIMEOUT"]
+    interval = current_app.config["RECOMMENDATION_POLL_INTERVAL"]
+    # Reconnecting EventSource clients report the last received event id
+    sent = request.headers.get("Last-Event-ID", type=int)
+    if sent is None:
+        sent = request.args.get("after", 0, type=int)
+    sent = max(sent, 0)
+
+    def stream():
+        nonlocal sent
+        deadline = time.monotonic() + timeout
+        last_status = None
+        yield "retry: 2000\n\n"
+        while True:
+            job = recommendation_jobs.get_job(job_id)
+            if job is None:
+                # Deleted meanwhile (retention cleanup)
+                payload = json.dumps({"status": recommendation_jobs.FAILED, "error": "Job not found"})
+                yield f"event: status\ndata: {payload}\n\n"
+                return
+            for html in _new_cards(job, sent):
+                sent += 1
+                payload = json.dumps({"html": html})
+                yield f"id: {sent}\nevent: recommendation\ndata: {payload}\n\n"
+            if job["status"] != last_status:
+                last_status = job["status"]
+                payload = json.dumps({"status": last_status, "error": job["error"]})
+                yield f"event: status\ndata: {payload}\n\n"
+            if last_status in recommendation_jobs.FINISHED:
+                return
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(interval)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@recommend_bp.route("/jobs/<job_id>/view", methods=["GET"])
+def job_view(job_id: str):
+    """
+    Render the recommendation page for a job: a waiting state while it runs,
+    the recommendations once it is done, or the error if it failed.
+
+    :param job_id: Job identifier
+    :return: Rendered recommend.html
+    :raises NotFound: if the job does not exist
+    """
+    job = _job_or_404(job_id)
+
+    if job["status"] == recommendation_jobs.FAILED:
+        return render_template(
+            "recommend.html", error=f"An error occurred: {job['error']}"
+        )
+    if job["status"] != recommendation_jobs.DONE:
+        partial = job["result"]["recommendations"] if job["result"] else []
+        return render_template(
+            "recommend.html",
+            pending_job=job,
+            pending_recommendations=partial,
+            use_sse=current_app.config["RECOMMENDATION_TRANSPORT"] == "sse",
+        )
+
+    result = job["result"]
+    cached_at = (
+        datetime.fromisoformat(result["cached_at"]) if result["cached_at"] else None
+    )
+    message = None
+    if not result["recommendations"]:
+        message = "All recommended books are already in your library. Try again later."
+
+    return render_template(
+        "recommend.html",
+        recommendations=result["recommendations"],
+        user_books=job["user_books"],
+        error=message,
+        from_cache=cached_at is not None,
+        cached_at=cached_at,
+    )
+
+
+@recommend_bp.route("/quota", methods=["GET"])
+def recommendation_quota():
+    """
+    Report the current client's remaining recommendation requests.
+
+    Reading the quota does not count against it.
+
+    :return: JSON with `allowed` (a request would be accepted now),
+        `retry_after` (seconds until it would be) and per-limit details
+    """
+    limits = quota_status("recommend.generate_recommendations", "POST")
+    retry_after = max((lim["retry_after"] for lim in limits), default=0)
+    response = jsonify({"allowed": retry_after == 0, "retry_after": retry_after, "limits": limits})
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@recommend_bp.route("/metrics", methods=["GET"])
+def coalescing_metrics():
+    """
+    Report how many backend calls were saved by coalescing concurrent
+    identical recommendation requests in this process.
+
+    :return: JSON with totals and per-fingerprint counters (calls, executions,
+        saved, last_call, in_flight)
+    """
+    per_key = single_flight().metrics()
+    return jsonify(
+        {
+            "calls": sum(m["calls"] for m in per_key.values()),
+            "executions": sum(m["executions"] for m in per_key.values()),
+            "saved": sum(m["saved"] for m in per_key.values()),
+            "fingerprints": per_key,
+        }
+    )
+
 
 @recommend_bp.route("/add", methods=["POST"])
 def add_recommended_book():
@@ -177,11 +362,15 @@ def add_recommended_book():
         publication_year = (
             int(pub_year) if pub_year and pub_year.isdigit() else datetime.now().year
         )
-        author = get_or_create_author(author_name, birth_date, death_date)
-        if Book.query.filter_by(title=title, author_id=author.id).first():
+        # Same comparison as for the suggestions themselves: normalized title,
+        # author names tolerant of case, accents and initials
+        from ..services.recommender import filter_existing
+
+        if not filter_existing([{"title": title, "author": author_name}]):
             return jsonify(
                 {"success": False, "error": "This book is already in your library."}
             )
+        author = get_or_create_author(author_name, birth_date, death_date)
 
         book = Book(
             isbn=request.form.get("isbn", f"REC-{int(datetime.now().timestamp())}"),
@@ -0,0 +1,192 @@
+"""
+app / compression.py
+
+Purpose:
+Content-negotiated gzip/brotli compression of responses. Server-rendered pages
+repeat a full card per book and compress very well (typically 10-20x), as do
+the HTML fragments and JSON returned to the AJAX modals.
+
+Features:
+- Encoding chosen from the client's Accept-Encoding (q-values honoured; brotli
+  preferred when both are equally acceptable and the brotli package is installed)
+- COMPRESS_MIMETYPES allowlist, COMPRESS_MIN_SIZE threshold and separate gzip
+  and brotli levels; `Vary: Accept-Encoding` on every eligible response
+- Streamed responses (CSV/NDJSON export) are compressed chunk by chunk, each
+  chunk flushed so the client keeps receiving data as it is produced
+- Left untouched: responses that already carry a Content-Encoding (precompressed
+  bundles), file responses (send_file), partial content, `no-transform`, and
+  types outside the allowlist such as text/event-stream
+- Strong ETags become weak, since the encoded bytes differ from the original
+
+Required Modules:
+- gzip, zlib: For gzip encoding (whole bodies and streams)
+- brotli (optional): For br encoding
+- flask: For the after_request hook
+
+Exceptions:
+- None; responses that cannot or should not be compressed are sent unchanged
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import gzip
+import logging
+import zlib
+from typing import Iterable, Iterator
+
+from flask import Flask, Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only gzip is offered then
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Statuses without a body, or whose body must not be re-encoded
+_SKIP_STATUSES = {204, 206, 304}
+
+
+def available_encodings() -> tuple:
+    """
+    :return: Content-Encodings this server can produce, in order of preference.
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding() -> str | None:
+    """
+    Pick the response encoding for the current request.
+
+    :return: "br", "gzip", or None if the client accepts neither.
+    """
+    accepted = request.accept_encodings
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _StreamCompressor:
+    """
+    Incremental compressor whose output can be flushed after every chunk.
+
+    :param encoding: "gzip" or "br".
+    :param level: gzip level or brotli quality.
+    """
+
+    def __init__(self, encoding: str, level: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=level)
+            self._zlib = None
+        else:
+            # wbits 16+ produces a gzip header and trailer
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._brotli = None
+
+    def chunk(self, data: bytes) -> bytes:
+        """
+        :param data: Next piece of the body.
+        :return: Compressed output, flushed so the client can decode it now.
+        """
+        if self._zlib is not None:
+            return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+        return self._brotli.process(data) + self._brotli.flush()
+
+    def finish(self) -> bytes:
+        """
+        :return: Remaining output, including the end-of-stream marker.
+        """
+        if self._zlib is not None:
+            return self._zlib.flush(zlib.Z_FINISH)
+        return self._brotli.finish()
+
+
+def _compress_stream(chunks: Iterable[bytes], compressor: _StreamCompressor) -> Iterator[bytes]:
+    """
+    Compress a streamed body chunk by chunk.
+
+    Runs after the request context is gone, so it must not touch `current_app`.
+
+    :param chunks: Encoded body chunks.
+    :param compressor: Compressor for the chosen encoding.
+    :return: Iterator over compressed chunks.
+    """
+    try:
+        for data in chunks:
+            if data:
+                out = compressor.chunk(data)
+                if out:
+                    yield out
+        yield compressor.finish()
+    finally:
+        # Closing the wrapped iterator runs its cleanup (e.g. stream_with_context)
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compress a response if the client accepts it and it is worth it.
+
+    :param response: Response about to be sent.
+    :return: The same response, possibly compressed.
+    """
+    config = current_app.config
+    if (
+        not config["COMPRESS_ENABLED"]
+        or response.status_code < 200
+        or response.status_code in _SKIP_STATUSES
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in config["COMPRESS_MIMETYPES"]
+        or response.cache_control.no_transform
+    ):
+        return response
+
+    # Caches must keep encoded and plain variants apart even if this one is sent plain
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        if not config["COMPRESS_STREAMS"]:
+            return response
+        level = config["COMPRESS_BR_LEVEL" if encoding == "br" else "COMPRESS_LEVEL"]
+        compressor = _StreamCompressor(encoding, level)
+        response.response = _compress_stream(response.iter_encoded(), compressor)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < config["COMPRESS_MIN_SIZE"]:
+            return response
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=config["COMPRESS_BR_LEVEL"])
+        else:
+            compressed = gzip.compress(data, config["COMPRESS_LEVEL"], mtime=0)
+        response.set_data(compressed)
+
+    response.content_encoding = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """
+    Register response compression on an app.
+
+    :param app: Flask application.
+    """
+    app.after_request(compress_response)
+    logger.debug(
+        "Response compression %s (%s)",
+        "enabled" if app.config["COMPRESS_ENABLED"] else "disabled",
+        ", ".join(available_encodings()),
+    )
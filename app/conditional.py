@@ -0,0 +1,153 @@
+"""
+app / conditional.py
+
+Purpose:
+Conditional GET for pages and modal fragments that only depend on the library
+data. Every write to a book or author advances one library-wide change counter;
+views decorated with `library_conditional` answer `If-None-Match` with 304 Not
+Modified when the counter has not moved, after a single primary-key lookup and
+without running their ORM queries or rendering a template.
+
+Background:
+The counter is the `library_version` row in `app_metadata`. Its value is a
+microsecond timestamp that strictly increases with every write (see
+`app.utils.bump_counter`), so it serves as the ETag. No Last-Modified header is
+sent: at its one-second resolution, a write in the same second as a client's
+previous fetch would produce a false 304 for `If-Modified-Since`. It is bumped
+in the same transaction as the write:
+- by mapper events on Book and Author for ORM writes (add, edit, rate, delete,
+  recommend add, author add/delete)
+- by `bump_library_version()` for Core writes (batch update, bulk import)
+
+The ETag also covers the deployed templates and asset bundles, so a deploy
+invalidates every page even if the library did not change.
+
+Features:
+- `library_conditional` view decorator: weak ETag, `Cache-Control: no-cache`
+  (browsers revalidate on every use) and 304 handling
+- `library_version()` / `bump_library_version()` helpers
+- CONDITIONAL_GET_ENABLED turns the 304 handling off
+
+Required Modules:
+- hashlib, os, time: For the deploy fingerprint and counter floor
+- flask, werkzeug.http: For the decorator and validator comparison
+- sqlalchemy.event: For mapper events on Book and Author
+- app.models, app.utils, app.assets: Models, shared counters, bundle manifest
+
+Exceptions:
+- SQLAlchemyError: Raised if the change counter cannot be read or bumped
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import hashlib
+import logging
+import os
+import time
+from functools import wraps
+
+from flask import Flask, Response, current_app, make_response, request
+from sqlalchemy import event
+from werkzeug.http import is_resource_modified
+
+from app.assets import bundle_fingerprint
+from app.models import db, Author, Book
+from app.utils import bump_counter, read_counter
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "library_version"
+
+
+def library_version() -> int:
+    """
+    Read the library change counter on a plain connection (no ORM session).
+
+    :return: Counter value (microseconds since the epoch of the last write), or
+        0 if the library was never written.
+    :raises SQLAlchemyError: if the query fails.
+    """
+    with db.engine.connect() as conn:
+        return read_counter(conn, VERSION_KEY)
+
+
+def bump_library_version(connection) -> None:
+    """
+    Advance the library change counter in the caller's transaction.
+
+    :param connection: SQLAlchemy Connection or Session of the write.
+    :raises SQLAlchemyError: if the statement fails.
+    """
+    bump_counter(connection, VERSION_KEY, floor=time.time_ns() // 1000)
+
+
+@event.listens_for(Book, "after_insert")
+@event.listens_for(Book, "after_update")
+@event.listens_for(Book, "after_delete")
+@event.listens_for(Author, "after_insert")
+@event.listens_for(Author, "after_update")
+@event.listens_for(Author, "after_delete")
+def _library_changed(mapper, connection, target) -> None:
+    bump_library_version(connection)
+
+
+def _template_fingerprint(app: Flask) -> str:
+    """
+    Fingerprint the template files of a deployment by name, size and mtime.
+
+    :param app: Flask application.
+    :return: Hex digest.
+    """
+    digest = hashlib.sha1()
+    root = os.path.join(app.root_path, app.template_folder)
+    for directory, _, files in sorted(os.walk(root)):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(directory, name))
+            digest.update(f"{directory}/{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def _etag(version: int) -> str:
+    deploy = current_app.extensions["conditional_get_salt"] + bundle_fingerprint()
+    return f"{version}-{hashlib.sha1(deploy.encode()).hexdigest()[:8]}"
+
+
+def library_conditional(view):
+    """
+    Serve a view through conditional GET keyed on the library change counter.
+
+    The view must depend only on the library data and the request URL.
+
+    :param view: View function.
+    :return: Wrapped view.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_app.config["CONDITIONAL_GET_ENABLED"] or request.method not in ("GET", "HEAD"):
+            return view(*args, **kwargs)
+
+        etag = _etag(library_version())
+        # ETag only: If-Modified-Since is ignored and gets a full response
+        if not is_resource_modified(request.environ, etag=etag):
+            response = Response(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        response.cache_control.no_cache = True
+        return response
+
+    return wrapper
+
+
+def init_conditional(app: Flask) -> None:
+    """
+    Compute the deploy fingerprint that is part of every library ETag.
+
+    :param app: Flask application.
+    """
+    app.extensions["conditional_get_salt"] = _template_fingerprint(app)
@@ -45,11 +45,176 @@ class BaseConfig:
         "DATABASE_URL", f"sqlite:///{os.path.join(_base_dir, 'data/library.sqlite')}"
     )
 
-    # Image processing service URL
+    # SQLite performance profile applied to every new connection (see app/events.py).
+    # WAL lets readers proceed while a write is in progress; NORMAL sync is safe with WAL.
+    SQLITE_PRAGMAS: dict[str, str | int] = {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -8000)),  # negative = KiB
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 0)),
+        "temp_store": os.getenv("SQLITE_TEMP_STORE", "DEFAULT"),
+    }
+
+    # Home page listing: default and maximum number of books per page
+    BOOKS_PAGE_SIZE: int = int(os.getenv("BOOKS_PAGE_SIZE", 24))
+    BOOKS_PAGE_SIZE_MAX: int = int(os.getenv("BOOKS_PAGE_SIZE_MAX", 100))
+
+    # Maximum number of books per batched rating/progress update
+    BOOK_BATCH_UPDATE_MAX: int = int(os.getenv("BOOK_BATCH_UPDATE_MAX", 500))
+
+    # Similar books ("More like this"): default and maximum number of neighbours
+    SIMILAR_BOOKS_K: int = int(os.getenv("SIMILAR_BOOKS_K", 5))
+    SIMILAR_BOOKS_MAX_K: int = int(os.getenv("SIMILAR_BOOKS_MAX_K", 50))
+
+    # Bulk import: rows per executemany batch and commit
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+
+    # Author dropdown cache: seconds between checks of the shared version counter
+    AUTHOR_DIRECTORY_CHECK_INTERVAL: float = float(
+        os.getenv("AUTHOR_DIRECTORY_CHECK_INTERVAL", 1.0)
+    )
+
+    # Image processing service URL (default for COVER_SOURCE_URL when set)
     processing_image_url: str | None = os.getenv("processing_image_url")
 
+    # Cover cache: source ('openlibrary' downloads COVER_SOURCE_URL, 'directory'
+    # reads <isbn>.<ext> from COVER_SOURCE_DIR), thumbnail directory, thumbnail
+    # heights per size name, JPEG/WebP quality, seconds before a missing cover is
+    # requested again (server side only), browser cache lifetime of the placeholder
+    # image (s), and download pool size and timeout (s)
+    COVER_SOURCE: str = os.getenv("COVER_SOURCE", "openlibrary")
+    COVER_SOURCE_URL: str = (
+        os.getenv("COVER_SOURCE_URL")
+        or processing_image_url
+        or "https://covers.openlibrary.org/b/isbn/{isbn}-L.jpg?default=false"
+    )
+    COVER_SOURCE_DIR: str = os.getenv("COVER_SOURCE_DIR", os.path.join(_base_dir, "data/cover_sources"))
+    COVER_CACHE_DIR: str = os.getenv("COVER_CACHE_DIR", os.path.join(_base_dir, "data/covers"))
+    COVER_SIZES: dict[str, int] = {"M": 240, "L": 480}
+    COVER_QUALITY: int = int(os.getenv("COVER_QUALITY", 80))
+    COVER_MISSING_TTL: int = int(os.getenv("COVER_MISSING_TTL", 86400))
+    COVER_PLACEHOLDER_MAX_AGE: int = int(os.getenv("COVER_PLACEHOLDER_MAX_AGE", 300))
+    COVER_POOL_SIZE: int = int(os.getenv("COVER_POOL_SIZE", 10))
+    COVER_TIMEOUT: float = float(os.getenv("COVER_TIMEOUT", 10))
+
+    # Logging: written by a background thread as JSON lines ('json') or plain text
+    # ('text'); the file rotates at LOG_MAX_BYTES and LOG_BACKUP_COUNT old files
+    # are kept
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower()
+    LOG_FILE: str = os.getenv(
+        "LOG_FILE", os.path.join(os.path.dirname(_base_dir), "logs", "bookalchemy.log")
+    )
+    LOG_MAX_BYTES: int = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT: int = int(os.getenv("LOG_BACKUP_COUNT", 10))
+
+    # Fast start: skip create_all() and the migration run when the schema version
+    # recorded in the database is already the newest (one read-only query)
+    FAST_START: bool = os.getenv("FAST_START", "true").lower() in ("1", "true", "yes")
+
+    # Rendered template fragments ({% cache %}, e.g. book cards): on/off, LRU size
+    FRAGMENT_CACHE_ENABLED: bool = os.getenv("FRAGMENT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    FRAGMENT_CACHE_MAX_ENTRIES: int = int(os.getenv("FRAGMENT_CACHE_MAX_ENTRIES", 5000))
+
+    # Conditional GET: answer unchanged pages and modal fragments with 304, based
+    # on the library change counter
+    CONDITIONAL_GET_ENABLED: bool = os.getenv("CONDITIONAL_GET_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Static bundles built by `flask build-assets`: 'true', 'false' or 'auto'
+    # (bundles unless debug mode is on, so source edits show up while developing)
+    ASSETS_USE_BUNDLES: str = os.getenv("ASSETS_USE_BUNDLES", "auto").lower()
+
+    # Response compression: on/off, minimum body size in bytes, gzip level (1-9),
+    # brotli quality (0-11, needs the brotli package), whether streamed responses
+    # are compressed, and the MIME types that are compressed
+    COMPRESS_ENABLED: bool = os.getenv("COMPRESS_ENABLED", "true").lower() in ("1", "true", "yes")
+    COMPRESS_MIN_SIZE: int = int(os.getenv("COMPRESS_MIN_SIZE", 500))
+    COMPRESS_LEVEL: int = int(os.getenv("COMPRESS_LEVEL", 6))
+    COMPRESS_BR_LEVEL: int = int(os.getenv("COMPRESS_BR_LEVEL", 4))
+    COMPRESS_STREAMS: bool = os.getenv("COMPRESS_STREAMS", "true").lower() in ("1", "true", "yes")
+    COMPRESS_MIMETYPES: tuple[str, ...] = tuple(
+        os.getenv(
+            "COMPRESS_MIMETYPES",
+            "text/html,text/css,text/plain,text/csv,text/javascript,application/json,"
+            "application/x-ndjson,image/svg+xml",
+        ).split(",")
+    )
+
     # OpenAI API
     OPENAI_API_KEY: str | None = os.getenv("OPENAI_API_KEY")
+    AI_API_URL: str = os.getenv(
+        "AI_API_URL", "https://api.openai.com/v1/chat/completions"
+    )
+
+    # AI HTTP client: pool size, timeouts (s), retries with jittered exponential
+    # backoff on 429/5xx, and circuit breaker (failures to open, seconds open)
+    AI_POOL_SIZE: int = int(os.getenv("AI_POOL_SIZE", 10))
+    AI_CONNECT_TIMEOUT: float = float(os.getenv("AI_CONNECT_TIMEOUT", 5))
+    AI_READ_TIMEOUT: float = float(os.getenv("AI_READ_TIMEOUT", 30))
+    AI_MAX_RETRIES: int = int(os.getenv("AI_MAX_RETRIES", 3))
+    AI_BACKOFF_FACTOR: float = float(os.getenv("AI_BACKOFF_FACTOR", 0.5))
+    AI_BACKOFF_JITTER: float = float(os.getenv("AI_BACKOFF_JITTER", 0.5))
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = int(
+        os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", 5)
+    )
+    AI_CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("AI_CIRCUIT_RESET_TIMEOUT", 30))
+
+    # Rate-limit counter storage shared by all worker processes: sqlite:///<file>
+    # (no server needed), redis://host:6379, memcached://host:11211 or memory://
+    # (per process). The sqlite storage supports the fixed-window strategy.
+    RATELIMIT_STORAGE_URI: str = os.getenv(
+        "RATELIMIT_STORAGE_URI", f"sqlite:///{os.path.join(_base_dir, 'data/ratelimit.sqlite')}"
+    )
+    RATELIMIT_STRATEGY: str = os.getenv("RATELIMIT_STRATEGY", "fixed-window")
+
+    # Stream AI completions so recommendation cards appear as each one completes
+    AI_STREAMING: bool = os.getenv("AI_STREAMING", "true").lower() in ("1", "true", "yes")
+
+    # Recommendation backend: 'openai', 'local' (offline TF-IDF engine) or 'auto'
+    # (OpenAI when an API key is set); seconds before the local model is rebuilt
+    RECOMMENDATION_BACKEND: str = os.getenv("RECOMMENDATION_BACKEND", "auto")
+    LOCAL_RECOMMENDER_MAX_AGE: int = int(os.getenv("LOCAL_RECOMMENDER_MAX_AGE", 300))
+
+    # AI recommendation cache: entry lifetime in seconds and LRU size limit
+    RECOMMENDATION_CACHE_TTL: int = int(os.getenv("RECOMMENDATION_CACHE_TTL", 86400))
+    RECOMMENDATION_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("RECOMMENDATION_CACHE_MAX_ENTRIES", 200)
+    )
+
+    # AI prompt size: estimated token budget, maximum number of top-rated seed books
+    # and of library books considered for the in-prompt exclusion sample
+    RECOMMENDATION_PROMPT_TOKEN_BUDGET: int = int(
+        os.getenv("RECOMMENDATION_PROMPT_TOKEN_BUDGET", 2000)
+    )
+    RECOMMENDATION_SEED_BOOKS: int = int(os.getenv("RECOMMENDATION_SEED_BOOKS", 15))
+    RECOMMENDATION_EXCLUSION_SAMPLE: int = int(
+        os.getenv("RECOMMENDATION_EXCLUSION_SAMPLE", 200)
+    )
+
+    # Background recommendation jobs: worker threads, how long finished jobs are
+    # kept, how often a running job records that it is alive, and after how many
+    # seconds without such a sign a running job counts as abandoned (keep it a
+    # few heartbeats above the interval)
+    RECOMMENDATION_WORKERS: int = int(os.getenv("RECOMMENDATION_WORKERS", 2))
+    RECOMMENDATION_JOB_RETENTION: int = int(
+        os.getenv("RECOMMENDATION_JOB_RETENTION", 7 * 24 * 3600)
+    )
+    RECOMMENDATION_JOB_HEARTBEAT: float = float(
+        os.getenv("RECOMMENDATION_JOB_HEARTBEAT", 30)
+    )
+    RECOMMENDATION_JOB_STALE_AFTER: int = int(
+        os.getenv("RECOMMENDATION_JOB_STALE_AFTER", 120)
+    )
+    # How the job page waits for the result: 'poll' (short JSON requests, works on
+    # any server) or 'sse' (Server-Sent Events; each open stream occupies a worker
+    # thread, so only use it with a threaded or async server). For SSE: status
+    # check interval and maximum stream duration (s) before the client reconnects
+    RECOMMENDATION_TRANSPORT: str = os.getenv("RECOMMENDATION_TRANSPORT", "poll").lower()
+    RECOMMENDATION_POLL_INTERVAL: float = float(
+        os.getenv("RECOMMENDATION_POLL_INTERVAL", 0.5)
+    )
+    RECOMMENDATION_SSE_TIMEOUT: int = int(os.getenv("RECOMMENDATION_SSE_TIMEOUT", 10))
 
     # Flask settings
     DEBUG: bool = False
@@ -69,6 +234,8 @@ class TestingConfig(BaseConfig):
     TESTING: bool = True
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///:memory:"
     OPENAI_API_KEY: None = None  # Prevent real API calls during tests
+    RECOMMENDATION_BACKEND: str = "local"
+    RATELIMIT_STORAGE_URI: str = "memory://"
 
 
 class ProductionConfig(BaseConfig):
@@ -80,6 +247,14 @@ class ProductionConfig(BaseConfig):
     )
     SQLALCHEMY_ECHO: bool = False  # Disable SQL logging in production
 
+    # Larger page cache, memory-mapped reads and in-memory temp tables
+    SQLITE_PRAGMAS: dict[str, str | int] = {
+        **BaseConfig.SQLITE_PRAGMAS,
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64000)),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 268435456)),
+        "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    }
+
 
 # Mapping for easy lookup by environment name
 config_by_name: dict[str, type[BaseConfig]] = {
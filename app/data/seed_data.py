@@ -19,6 +19,7 @@ Required Modules:
 - datetime
 - run (for app instance)
 - app.models (for db, Author, Book)
+- app.search (for rebuilding the full-text index)
 
 Author: Martin Haferanke
 Date: July 10, 2025
@@ -27,6 +28,7 @@ Date: July 10, 2025
 from datetime import date
 from run import app
 from app.models import db, Author, Book
+from app.search import rebuild_search_index
 
 with app.app_context():
     db.drop_all()
@@ -144,4 +146,7 @@ with app.app_context():
     db.session.add_all(books)
     db.session.commit()
 
+    # Re-index from scratch; drop_all() does not remove the FTS table
+    rebuild_search_index(db.engine)
+
     print("Books successfully added to the database.")
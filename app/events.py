@@ -2,7 +2,8 @@
 app / events.py
 
 Purpose:
-SQLAlchemy event handler to enable foreign key support for SQLite connections.
+SQLAlchemy event handlers for SQLite connections: enables foreign key support and
+applies the configurable performance profile (journal mode, cache size, etc.).
 This ensures that foreign key constraints are enforced in SQLite, which is not enabled by default.
 
 Background:
@@ -10,9 +11,17 @@ SQLite does not enforce foreign key constraints unless explicitly instructed to
 Although tables may define foreign key relations, they will be ignored unless `PRAGMA foreign_keys = ON` is executed for each connection.
 This module ensures that behavior by hooking into the SQLAlchemy connection lifecycle.
 
+Most other SQLite settings are also per connection. The default rollback journal
+makes writers block readers, so every rating or status update would stall
+concurrent page loads. The `SQLITE_PRAGMAS` profile from the app configuration
+(e.g. journal_mode=WAL, synchronous=NORMAL, busy_timeout) is applied to each new
+connection of the application engine.
+
 Features:
 - Hooks into SQLAlchemy's Engine "connect" event
 - Executes PRAGMA statement to activate foreign key checks on every new connection
+- Applies a validated, config-driven PRAGMA profile to each new SQLite connection
+- Reports the effective PRAGMA values for logging at startup
 
 Required Modules:
 - logging: For logging errors
@@ -24,12 +33,27 @@ Date: 2025-07-11
 """
 
 import logging
+import re
+from typing import Dict, Any
+
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
 
 # Set up module-level logger
 logger = logging.getLogger(__name__)
 
+# PRAGMAs that may be set through the SQLITE_PRAGMAS configuration
+ALLOWED_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+)
+
+_PRAGMA_VALUE_RE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
 
 @event.listens_for(Engine, "connect")
 def _enable_sqlite_fk(dbapi_con, con_record):
@@ -45,3 +69,69 @@ def _enable_sqlite_fk(dbapi_con, con_record):
     except Exception as exc:
         logger.exception("Failed to enable SQLite foreign keys")
         raise Exception("Could not enforce foreign key constraints for SQLite") from exc
+
+
+def _validate_pragmas(pragmas: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Check PRAGMA names against the allowlist and values against a safe pattern.
+
+    :param pragmas: Mapping of PRAGMA name to value from the configuration.
+    :return: Validated mapping with string values.
+    :raises ValueError: If a name is not allowed or a value is malformed.
+    """
+    validated = {}
+    for name, value in pragmas.items():
+        if name not in ALLOWED_PRAGMAS:
+            raise ValueError(f"Unsupported SQLite PRAGMA '{name}'")
+        value = str(value)
+        if not _PRAGMA_VALUE_RE.match(value):
+            raise ValueError(f"Invalid value {value!r} for SQLite PRAGMA '{name}'")
+        validated[name] = value
+    return validated
+
+
+def register_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """
+    Apply a PRAGMA profile to every new connection of an SQLite engine.
+
+    Does nothing for non-SQLite engines or an empty profile.
+
+    :param engine: Application engine.
+    :param pragmas: Mapping of PRAGMA name to value (see ALLOWED_PRAGMAS).
+    :raises ValueError: If the profile contains unsupported names or values.
+    """
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+    validated = _validate_pragmas(pragmas)
+
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_con, con_record):
+        """
+        Execute the configured PRAGMA statements on a new connection.
+
+        :param dbapi_con: DBAPI connection object (e.g., sqlite3.Connection).
+        :param con_record: SQLAlchemy connection record (unused).
+        :raises Exception: If a PRAGMA command fails.
+        """
+        try:
+            for name, value in validated.items():
+                dbapi_con.execute(f"PRAGMA {name}={value}")
+        except Exception as exc:
+            logger.exception("Failed to apply SQLite PRAGMA profile")
+            raise Exception("Could not apply SQLite PRAGMA profile") from exc
+
+
+def effective_sqlite_pragmas(engine: Engine) -> Dict[str, Any]:
+    """
+    Read back the PRAGMA values actually in effect on a pooled connection.
+
+    :param engine: Application engine.
+    :return: Mapping of PRAGMA name to effective value, empty for non-SQLite engines.
+    """
+    if engine.dialect.name != "sqlite":
+        return {}
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ("foreign_keys",) + ALLOWED_PRAGMAS
+        }
@@ -8,10 +8,13 @@ This file handles delayed (lazy) initialization to avoid circular imports.
 Features:
 - Centralized declaration of the Flask-Limiter instance
 - Configured to use the remote address (IP) as the unique request identity key
+- Counter storage from RATELIMIT_STORAGE_URI; importing app.ratelimit registers
+  the `sqlite://` scheme so worker processes can share counters without a server
 
 Required Modules:
 - flask_limiter.Limiter: Core rate limiter class for Flask
 - flask_limiter.util.get_remote_address: Default IP-based key function for rate limiting
+- app.ratelimit: SQLite rate-limit storage
 
 Author: Martin Haferanke
 Date: 2025-07-11
@@ -20,4 +23,6 @@ Date: 2025-07-11
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
+from app import ratelimit  # noqa: F401  (registers the sqlite:// storage scheme)
+
 limiter = Limiter(key_func=get_remote_address)
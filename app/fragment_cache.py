@@ -0,0 +1,209 @@
+"""
+app / fragment_cache.py
+
+Purpose:
+In-process cache of rendered template fragments. The home page renders one card
+per book, but a book rarely changes between page views, so each card is
+rendered once and reused until the book is written again.
+
+Usage in templates:
+    {% cache "book-card", book.id, book.version, book.author.name %}
+        ... card markup ...
+    {% endcache %}
+
+The key is the tuple of all arguments: a fragment name, the id of the object
+it shows, and whatever else its markup depends on (typically a row version).
+Fragments are grouped by (name, id), so `invalidate()` drops every cached
+variant of one object at once.
+
+Invalidation:
+- The key contains `Book.version`, which every write advances, so a changed
+  book can never be served from an outdated fragment, in this process or any
+  other worker.
+- Fragments of the previous version are unreachable after a write; mapper
+  events on Book (insert/update/delete) and `invalidate_books()` for Core
+  updates free them right away instead of leaving them to the LRU.
+
+Features:
+- `{% cache %}` Jinja extension (`FragmentCacheExtension`)
+- Bounded LRU (FRAGMENT_CACHE_MAX_ENTRIES); FRAGMENT_CACHE_ENABLED turns it off
+- Hit/miss counters via `FragmentCache.stats()`
+
+Required Modules:
+- threading, collections.OrderedDict: For the thread-safe LRU
+- jinja2.ext, jinja2.nodes: For the template tag
+- sqlalchemy.event: For mapper events on Book
+
+Exceptions:
+- TemplateSyntaxError: Raised by Jinja if a `{% cache %}` tag has no arguments
+- TypeError: Raised if a key argument is not hashable
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Set, Tuple
+
+from flask import Flask, current_app, has_app_context
+from jinja2 import nodes
+from jinja2.ext import Extension
+from sqlalchemy import event
+
+from app.models import Book
+
+logger = logging.getLogger(__name__)
+
+BOOK_CARD = "book-card"
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU of rendered fragments keyed by tuples.
+
+    :param max_entries: Maximum number of cached fragments.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._groups: Dict[Tuple, Set[Tuple]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> str | None:
+        """
+        :param key: Fragment key.
+        :return: Cached fragment, or None.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Tuple, value: str) -> None:
+        """
+        Store a fragment, evicting the least recently used ones if full.
+
+        :param key: Fragment key; its first two items form the group.
+        :param value: Rendered fragment.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._groups.setdefault(key[:2], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(self._entries.popitem(last=False)[0])
+
+    def _discard(self, key: Tuple) -> None:
+        group = self._groups.get(key[:2])
+        if group is not None:
+            group.discard(key)
+            if not group:
+                del self._groups[key[:2]]
+
+    def invalidate(self, name: str, ids: Iterable[Hashable]) -> int:
+        """
+        Drop all cached variants of the given objects.
+
+        :param name: Fragment name.
+        :param ids: Object ids.
+        :return: Number of fragments dropped.
+        """
+        dropped = 0
+        with self._lock:
+            for ident in ids:
+                for key in self._groups.pop((name, ident), ()):
+                    del self._entries[key]
+                    dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        """Drop all fragments."""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: Number of entries, hits and misses.
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension providing the `{% cache key, ... %}...{% endcache %}` tag."""
+
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method("_render", [nodes.Tuple(args, "load")])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, key: Tuple, caller) -> str:
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = caller()
+            cache.set(key, fragment)
+        return fragment
+
+
+def get_fragment_cache() -> FragmentCache | None:
+    """
+    :return: The current app's fragment cache, or None if disabled.
+    """
+    return current_app.extensions.get("fragment_cache")
+
+
+def invalidate_books(ids: Iterable[int]) -> None:
+    """
+    Drop the cached cards of books written outside the ORM unit of work
+    (e.g. Core UPDATE statements).
+
+    :param ids: Book ids.
+    """
+    if not has_app_context():
+        return
+    cache = get_fragment_cache()
+    if cache is not None:
+        cache.invalidate(BOOK_CARD, ids)
+
+
+@event.listens_for(Book, "after_insert")
+@event.listens_for(Book, "after_update")
+@event.listens_for(Book, "after_delete")
+def _invalidate_book(mapper, connection, target: Book) -> None:
+    invalidate_books([target.id])
+
+
+def init_fragment_cache(app: Flask) -> None:
+    """
+    Install the `{% cache %}` tag and create the app's fragment cache.
+
+    :param app: Flask application.
+    """
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    if app.config["FRAGMENT_CACHE_ENABLED"]:
+        cache = FragmentCache(app.config["FRAGMENT_CACHE_MAX_ENTRIES"])
+        app.jinja_env.fragment_cache = cache
+        app.extensions["fragment_cache"] = cache
@@ -0,0 +1,230 @@
+"""
+app / logging_config.py
+
+Purpose:
+Non-blocking, structured application logging. Log calls only put the record on
+an in-memory queue; a background thread (QueueListener) formats the records and
+writes them to a size-rotated file, so request handlers never wait for file I/O
+or log rotation.
+
+Features:
+- JSON lines: timestamp, level, logger, module, message, request id, exception,
+  plus any `extra={...}` fields (LOG_FORMAT=text keeps the classic format)
+- Request ids: taken from an incoming X-Request-ID header or generated, stored in
+  `g.request_id`, attached to every record logged during the request and
+  returned in the X-Request-ID response header
+- One access line per request (method, path, status, duration)
+- Rotation size and retention from LOG_MAX_BYTES and LOG_BACKUP_COUNT
+- Creating another app in the same process replaces the pipeline instead of
+  adding a second handler; forked worker processes restart the writer thread
+
+Required Modules:
+- logging.handlers: QueueHandler, QueueListener, RotatingFileHandler
+- json, queue, re, uuid: For formatting, the queue and request ids
+- flask: For request hooks and the request context
+
+Exceptions:
+- OSError: Raised at startup if the log directory cannot be created
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import Flask, g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Incoming ids are accepted only if they are short and harmless in a log line
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "request_id",
+}
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s in %(module)s [%(request_id)s]: %(message)s"
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request id (or "-") to each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = g.get("request_id", "-") if has_request_context() else "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    Queue handler that keeps exceptions separate from the message.
+
+    The standard QueueHandler merges the traceback into the message text; here it
+    is rendered into `exc_text`, so the JSON line keeps it in its own field.
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Pipeline:
+    """The process's queue handler and writer thread."""
+
+    def __init__(self, handler: QueueHandler, listener: QueueListener) -> None:
+        self.handler = handler
+        self.listener = listener
+
+    def stop(self) -> None:
+        """Flush queued records, stop the writer thread and close the file."""
+        logging.getLogger().removeHandler(self.handler)
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for target in self.listener.handlers:
+            target.close()
+
+    def restart_in_child(self) -> None:
+        """
+        Give a forked process its own queue and writer thread (the parent's
+        thread does not exist in the child).
+        """
+        fresh = queue.SimpleQueue()
+        self.handler.queue = fresh
+        self.listener.queue = fresh
+        self.listener._thread = None
+        self.listener.start()
+
+
+_pipeline: _Pipeline | None = None
+
+
+def _stop_pipeline() -> None:
+    if _pipeline is not None:
+        _pipeline.stop()
+
+
+def _restart_after_fork() -> None:
+    if _pipeline is not None:
+        _pipeline.restart_in_child()
+
+
+atexit.register(_stop_pipeline)
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def _assign_request_id() -> None:
+    """Use the caller's X-Request-ID if it is valid, otherwise create one."""
+    incoming = request.headers.get(REQUEST_ID_HEADER, "")
+    g.request_id = incoming if _VALID_REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+    g.request_started = time.perf_counter()
+
+
+def _log_request(response):
+    """Return the request id to the client and write the access line."""
+    request_id = g.get("request_id")
+    if request_id:
+        response.headers[REQUEST_ID_HEADER] = request_id
+    started = g.get("request_started")
+    if started is not None:
+        logger.info(
+            "%s %s %s",
+            request.method,
+            request.full_path.rstrip("?"),
+            response.status_code,
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        )
+    return response
+
+
+def init_logging(app: Flask) -> None:
+    """
+    Route all logging through a queue to a rotating file and add request ids.
+
+    :param app: Flask application.
+    :raises OSError: if the log directory cannot be created.
+    """
+    global _pipeline
+
+    config = app.config
+    log_file = config["LOG_FILE"]
+    os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=config["LOG_MAX_BYTES"],
+        backupCount=config["LOG_BACKUP_COUNT"],
+        encoding="utf-8",
+        delay=True,
+    )
+    if config["LOG_FORMAT"] == "text":
+        file_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    else:
+        file_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _RecordQueueHandler(log_queue)
+    # Runs in the logging thread, while the request context is still available
+    queue_handler.addFilter(RequestIdFilter())
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+
+    _stop_pipeline()
+    _pipeline = _Pipeline(queue_handler, listener)
+    listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    root.setLevel(config["LOG_LEVEL"])
+
+    app.before_request(_assign_request_id)
+    app.after_request(_log_request)
@@ -0,0 +1,416 @@
+"""
+app / migrations.py
+
+Purpose:
+Minimal versioned schema migration system for the Book Alchemy database.
+Upgrades an existing database (e.g. data/library.sqlite) in place, which
+`db.create_all()` cannot do because it only creates missing tables.
+
+Background:
+Each migration has an integer version and a function that receives an open
+connection. Applied versions are recorded in the `schema_migrations` table, and
+`upgrade()` runs every pending migration in version order, each in its own
+transaction. Migrations use plain SQL rather than the current models so that
+they keep working when the models change later. They should be idempotent
+(`IF NOT EXISTS`), because a database created by `db.create_all()` already has
+every object the models declare.
+
+Features:
+- `@migration(version, name)` decorator to register migrations
+- `upgrade()` to apply pending migrations, `current_version()` to inspect state
+- `is_current()`: read-only check used by fast start to skip schema setup
+- `flask upgrade-db` CLI command
+- Migration 1: indexes on lookup, filter and sort columns, including
+  case-insensitive (lower()) indexes for alphabetical sorting
+- Migration 2: `app_metadata` table for shared version counters
+- Migration 3: `recommendation_cache` table for cached AI responses
+- Migration 4: `recommendation_jobs` table for background recommendation jobs
+- Migration 5: indexed `books.title_key` column (normalized title) for dedup
+- Migration 6: `book_minhash` / `book_lsh` tables for similar-book lookups;
+  existing books are indexed at the next startup (`app.similar`)
+- Migration 7: `books.version` row version for the card fragment cache
+- Migration 8: `library_version` change counter for conditional GET
+- Migration 9: recompute `books.title_key` after accent folding learned
+  letters without a Unicode decomposition (e.g. "ł", "ø")
+
+Required Modules:
+- logging: For reporting applied migrations
+- datetime: For recording the application time
+- click, flask.cli: For the CLI command
+- sqlalchemy: For connections and SQL execution
+
+Exceptions:
+- SQLAlchemyError: Raised if a migration fails; the failing migration is rolled back
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = "schema_migrations"
+
+# Registered migrations as (version, name, function), sorted by version
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = []
+
+
+def migration(version: int, name: str):
+    """
+    Register a function as the migration for a schema version.
+
+    :param version: Unique, increasing schema version number.
+    :param name: Short human-readable description.
+    :return: Decorator that registers the function unchanged.
+    :raises ValueError: If the version is already registered.
+    """
+
+    def decorator(func: Callable[[Connection], None]):
+        if any(v == version for v, _, _ in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+
+    return decorator
+
+
+def _ensure_version_table(conn: Connection) -> None:
+    """
+    Create the migration bookkeeping table if it does not exist.
+
+    :param conn: Open connection inside a transaction.
+    """
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, "
+            "name VARCHAR NOT NULL, "
+            "applied_at VARCHAR NOT NULL)"
+        )
+    )
+
+
+def current_version(engine: Engine) -> int:
+    """
+    Return the highest applied schema version.
+
+    :param engine: SQLAlchemy engine bound to the application database.
+    :return: Applied schema version, or 0 for an unversioned database.
+    """
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        version = conn.execute(text(f"SELECT MAX(version) FROM {VERSION_TABLE}")).scalar()
+    return version or 0
+
+
+def head_version() -> int:
+    """
+    Return the newest registered schema version.
+
+    :return: Highest migration version, or 0 if none are registered.
+    """
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+# Database URLs whose schema was found at head_version() in this process
+_current_databases: set = set()
+
+
+def is_current(engine: Engine) -> bool:
+    """
+    Check with one read-only query whether the schema is at the newest version.
+
+    The answer is remembered per database for the lifetime of the process, so
+    further app instances on the same database skip the query.
+
+    :param engine: SQLAlchemy engine bound to the application database.
+    :return: True if all migrations are applied, False if the schema is older,
+        unversioned, or the database does not exist yet.
+    """
+    url = str(engine.url)
+    if url in _current_databases:
+        return True
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(text(f"SELECT MAX(version) FROM {VERSION_TABLE}")).scalar()
+    except SQLAlchemyError:
+        return False
+    if version != head_version():
+        return False
+    _current_databases.add(url)
+    return True
+
+
+def upgrade(engine: Engine) -> List[int]:
+    """
+    Apply all pending migrations in version order.
+
+    :param engine: SQLAlchemy engine bound to the application database.
+    :return: List of versions applied by this call.
+    :raises SQLAlchemyError: If a migration fails (that migration is rolled back).
+    """
+    applied: List[int] = []
+    start = current_version(engine)
+
+    for version, name, func in MIGRATIONS:
+        if version <= start:
+            continue
+        try:
+            with engine.begin() as conn:
+                func(conn)
+                conn.execute(
+                    text(
+                        f"INSERT INTO {VERSION_TABLE} (version, name, applied_at) "
+                        "VALUES (:version, :name, :applied_at)"
+                    ),
+                    {
+                        "version": version,
+                        "name": name,
+                        "applied_at": datetime.now(timezone.utc).isoformat(),
+                    },
+                )
+        except SQLAlchemyError:
+            logger.exception("Migration %s (%s) failed", version, name)
+            raise
+        logger.info("Applied migration %s: %s", version, name)
+        applied.append(version)
+
+    return applied
+
+
+@click.command("upgrade-db")
+@with_appcontext
+def upgrade_db_command() -> None:
+    """Apply pending schema migrations to the configured database."""
+    from app.models import db
+
+    applied = upgrade(db.engine)
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(map(str, applied))}")
+    click.echo(f"Database is at schema version {current_version(db.engine)}.")
+
+
+# --------------------------------------------------------------------------- #
+# Migrations
+# --------------------------------------------------------------------------- #
+
+
+@migration(1, "add lookup, filter and sort indexes")
+def _add_indexes(conn: Connection) -> None:
+    """
+    Create indexes for foreign-key joins, rating filters, title/ISBN/author
+    lookups and case-insensitive alphabetical sorting.
+
+    :param conn: Open connection inside a transaction.
+    """
+    statements = [
+        "CREATE INDEX IF NOT EXISTS ix_books_author_id ON books (author_id)",
+        "CREATE INDEX IF NOT EXISTS ix_books_rating ON books (rating)",
+        "CREATE INDEX IF NOT EXISTS ix_books_title ON books (title)",
+        "CREATE INDEX IF NOT EXISTS ix_books_isbn ON books (isbn)",
+        "CREATE INDEX IF NOT EXISTS ix_authors_name ON authors (name)",
+        "CREATE INDEX IF NOT EXISTS ix_books_title_lower ON books (lower(title))",
+        "CREATE INDEX IF NOT EXISTS ix_authors_name_lower ON authors (lower(name))",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+
+    # Refresh planner statistics so SQLite picks up the new indexes
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("ANALYZE"))
+
+
+@migration(2, "add app_metadata counters table")
+def _add_app_metadata(conn: Connection) -> None:
+    """
+    Create a key/value table for shared counters, such as cache versions that
+    worker processes compare to detect stale in-process caches.
+
+    :param conn: Open connection inside a transaction.
+    """
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS app_metadata ("
+            "key VARCHAR PRIMARY KEY, "
+            "value INTEGER NOT NULL DEFAULT 0)"
+        )
+    )
+
+
+@migration(3, "add recommendation_cache table")
+def _add_recommendation_cache(conn: Connection) -> None:
+    """
+    Create the persistent AI recommendation cache with an index for LRU eviction.
+
+    :param conn: Open connection inside a transaction.
+    """
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS recommendation_cache ("
+            "key VARCHAR PRIMARY KEY, "
+            "response TEXT NOT NULL, "
+            "created_at FLOAT NOT NULL, "
+            "last_used_at FLOAT NOT NULL, "
+            "hits INTEGER NOT NULL DEFAULT 0)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_recommendation_cache_last_used_at "
+            "ON recommendation_cache (last_used_at)"
+        )
+    )
+
+
+@migration(4, "add recommendation_jobs table")
+def _add_recommendation_jobs(conn: Connection) -> None:
+    """
+    Create the table that persists background recommendation jobs and results.
+
+    :param conn: Open connection inside a transaction.
+    """
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS recommendation_jobs ("
+            "id VARCHAR PRIMARY KEY, "
+            "status VARCHAR NOT NULL, "
+            "prompt TEXT NOT NULL, "
+            "refresh BOOLEAN NOT NULL DEFAULT 0, "
+            "user_books TEXT NOT NULL, "
+            "result TEXT, "
+            "error TEXT, "
+            "created_at FLOAT NOT NULL, "
+            "updated_at FLOAT NOT NULL)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_recommendation_jobs_status "
+            "ON recommendation_jobs (status, updated_at)"
+        )
+    )
+
+
+@migration(5, "add normalized books.title_key column")
+def _add_book_title_key(conn: Connection) -> None:
+    """
+    Add the indexed normalized title key used to detect books already in the
+    library, and fill it for existing rows.
+
+    :param conn: Open connection inside a transaction.
+    """
+    from app.normalize import title_key
+
+    columns = {column["name"] for column in inspect(conn).get_columns("books")}
+    if "title_key" not in columns:
+        conn.execute(text("ALTER TABLE books ADD COLUMN title_key VARCHAR"))
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_books_title_key ON books (title_key)")
+    )
+
+    rows = conn.execute(text("SELECT id, title FROM books WHERE title_key IS NULL"))
+    updates = [{"id": row.id, "key": title_key(row.title)} for row in rows]
+    if updates:
+        conn.execute(
+            text("UPDATE books SET title_key = :key WHERE id = :id"), updates
+        )
+
+
+@migration(6, "add MinHash/LSH similar-books index")
+def _add_similar_index(conn: Connection) -> None:
+    """
+    Create the MinHash signature and LSH bucket tables.
+
+    Signatures depend on the current shingling code, so existing books are not
+    indexed here: the `similar_index_backfill` marker asks
+    `app.similar.backfill_similar_index()` to index them at startup.
+
+    :param conn: Open connection inside a transaction.
+    """
+    # Clustered key without a rowid table on SQLite: one B-tree per bucket row
+    without_rowid = " WITHOUT ROWID" if conn.dialect.name == "sqlite" else ""
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS book_minhash ("
+            "book_id INTEGER PRIMARY KEY, "
+            "signature BLOB NOT NULL)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS book_lsh ("
+            "band INTEGER NOT NULL, "
+            "bucket INTEGER NOT NULL, "
+            "book_id INTEGER NOT NULL, "
+            f"PRIMARY KEY (band, bucket, book_id)){without_rowid}"
+        )
+    )
+    marker = {"key": "similar_index_backfill"}
+    if conn.execute(text("SELECT 1 FROM app_metadata WHERE key = :key"), marker).first() is None:
+        conn.execute(text("INSERT INTO app_metadata (key, value) VALUES (:key, 1)"), marker)
+
+
+@migration(7, "add books.version row version")
+def _add_book_version(conn: Connection) -> None:
+    """
+    Add the row version used to key cached book card fragments, and give
+    existing rows a version based on the current time.
+
+    :param conn: Open connection inside a transaction.
+    """
+    from app.models import next_book_version
+
+    columns = {column["name"] for column in inspect(conn).get_columns("books")}
+    if "version" not in columns:
+        conn.execute(
+            text("ALTER TABLE books ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        )
+    conn.execute(
+        text("UPDATE books SET version = :version WHERE version = 0"),
+        {"version": next_book_version()},
+    )
+
+
+@migration(8, "seed library_version change counter")
+def _seed_library_version(conn: Connection) -> None:
+    """
+    Start the library change counter at the current time, so the ETags of an
+    existing library never repeat those of an empty or recreated database.
+
+    :param conn: Open connection inside a transaction.
+    """
+    from app.conditional import bump_library_version
+
+    bump_library_version(conn)
+
+
+@migration(9, "recompute books.title_key with extended accent folding")
+def _recompute_title_keys(conn: Connection) -> None:
+    """
+    Refresh stored title keys whose folding changed (titles containing letters
+    such as "ł" or "ø", which were previously kept as is).
+
+    :param conn: Open connection inside a transaction.
+    """
+    from app.normalize import title_key
+
+    rows = conn.execute(text("SELECT id, title, title_key FROM books"))
+    updates = [
+        {"id": row.id, "key": key}
+        for row in rows
+        if (key := title_key(row.title)) != row.title_key
+    ]
+    if updates:
+        conn.execute(
+            text("UPDATE books SET title_key = :key WHERE id = :id"), updates
+        )
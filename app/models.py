@@ -9,6 +9,9 @@ Features:
 - Author model: stores name and lifespan information
 - Book model: includes title, ISBN, publication details, and reading status
 - Relationship: One Author can have many Books
+- Indexes on lookup, filter and sort columns (kept in sync with app.migrations)
+- Normalized, indexed `title_key` on Book for duplicate detection
+- Row `version` on Book, advanced on every write (keys the card fragment cache)
 
 Required Modules:
 - flask_sqlalchemy.SQLAlchemy: For ORM model definition
@@ -22,10 +25,14 @@ Author: Martin Haferanke
 Date: 2025-07-11
 """
 
+import time
+
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import backref
+from sqlalchemy.orm import backref, validates
 from sqlalchemy.exc import SQLAlchemyError
 
+from app import normalize
+
 # Initialize SQLAlchemy instance
 db = SQLAlchemy()
 
@@ -43,10 +50,13 @@ class Author(db.Model):
     __tablename__ = "authors"
 
     id: int = db.Column(db.Integer, primary_key=True)
-    name: str = db.Column(db.String, nullable=False)
+    name: str = db.Column(db.String, nullable=False, index=True)
     birth_date = db.Column(db.Date, nullable=True)
     date_of_death = db.Column(db.Date, nullable=True)
 
+    # Case-insensitive index for alphabetical sorting
+    __table_args__ = (db.Index("ix_authors_name_lower", db.func.lower(name)),)
+
     def __repr__(self) -> str:
         return f"<Author id={self.id} name='{self.name}'>"
 
@@ -54,6 +64,20 @@ class Author(db.Model):
         return f"{self.name} ({self.birth_date} – {self.date_of_death or 'Present'})"
 
 
+def next_book_version(current: int | None = None) -> int:
+    """
+    Return the row version for a write to a book.
+
+    Versions are microsecond timestamps, forced to increase per row. Unlike a
+    counter starting at 1, they are never reused when SQLite hands the id of a
+    deleted book to a new one, so cached fragments of the old book cannot match.
+
+    :param current: Version before the write (None for inserts).
+    :return: New version.
+    """
+    return max(time.time_ns() // 1000, (current or 0) + 1)
+
+
 class Book(db.Model):
     """
     SQLAlchemy model representing a book.
@@ -67,24 +91,52 @@ class Book(db.Model):
     :param rating: Optional numeric rating.
     :param is_read: Whether the book has been read (default: False).
     :param progress: Reading progress in percentage (default: 0).
+    :param title_key: Normalized title for duplicate detection (derived from title).
+    :param version: Row version, set by SQLAlchemy on every ORM insert and update
+                    (Core updates must set it explicitly).
     """
 
     __tablename__ = "books"
 
     id: int = db.Column(db.Integer, primary_key=True)
-    title: str = db.Column(db.String, nullable=False)
+    title: str = db.Column(db.String, nullable=False, index=True)
     short_description: str = db.Column(db.String, nullable=False)
     publication_year: int = db.Column(db.Integer, nullable=False)
-    isbn: str = db.Column(db.String, nullable=False)
+    isbn: str = db.Column(db.String, nullable=False, index=True)
 
     author_id: int | None = db.Column(
-        db.Integer, db.ForeignKey("authors.id", ondelete="SET NULL"), nullable=True
+        db.Integer,
+        db.ForeignKey("authors.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
     )
-    rating: int | None = db.Column(db.Integer, nullable=True)
+    rating: int | None = db.Column(db.Integer, nullable=True, index=True)
 
     is_read: bool = db.Column(db.Boolean, nullable=False, default=False)
     progress: int = db.Column(db.Integer, nullable=False, default=0)
 
+    # Normalized title (see app.normalize); set from `title` by the validator for
+    # ORM writes and by the column default for Core inserts (bulk import)
+    title_key: str | None = db.Column(
+        db.String,
+        index=True,
+        default=lambda ctx: normalize.title_key(
+            ctx.get_current_parameters().get("title")
+        ),
+    )
+
+    # Row version (see next_book_version); the column default covers Core inserts
+    version: int = db.Column(db.Integer, nullable=False, default=next_book_version)
+
+    # Case-insensitive index for alphabetical sorting
+    __table_args__ = (db.Index("ix_books_title_lower", db.func.lower(title)),)
+
+    # ORM writes advance `version`; updates of a stale row raise StaleDataError
+    __mapper_args__ = {
+        "version_id_col": version,
+        "version_id_generator": next_book_version,
+    }
+
     # Define relationship to Author model
     author = db.relationship(
         "Author",
@@ -95,6 +147,18 @@ class Book(db.Model):
         ),
     )
 
+    @validates("title")
+    def _set_title_key(self, key: str, title: str) -> str:
+        """
+        Keep `title_key` in sync whenever the title is assigned.
+
+        :param key: Attribute name ('title').
+        :param title: New title.
+        :return: The title unchanged.
+        """
+        self.title_key = normalize.title_key(title)
+        return title
+
     def __repr__(self) -> str:
         return f"<Book id={self.id} title='{self.title}'>"
 
@@ -0,0 +1,115 @@
+"""
+app / normalize.py
+
+Purpose:
+Normalized comparison keys for book titles and author names, so that the same
+book is recognized regardless of case, accents, punctuation, leading articles
+or author initials (e.g. "The Left Hand of Darkness" / "left hand of darkness",
+"Ursula K. Le Guin" / "Ursula Le Guin").
+
+Features:
+- `title_key()`: key stored in the indexed `books.title_key` column
+- `name_key()`: token set for loose author name comparison
+- `names_match()`: author comparison tolerant of initials and word order
+- `tokenize()`: folded word tokens for text models (local recommender)
+- `STOPWORDS`: common English words left out of text models (local
+  recommender, similar-books index)
+
+Required Modules:
+- re, unicodedata: For accent folding and tokenization
+
+Exceptions:
+- No exceptions are raised; empty or missing input yields an empty key
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import re
+import unicodedata
+from typing import FrozenSet, List
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_LEADING_ARTICLES = ("the ", "a ", "an ")
+
+# Words too common to tell books apart
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has he her his in is it its of on or "
+    "she that the their they this to was were which who will with".split()
+)
+
+# Letters that have no Unicode decomposition, so NFKD leaves them unchanged
+_UNDECOMPOSABLE = str.maketrans(
+    {"ł": "l", "ø": "o", "đ": "d", "ð": "d", "ħ": "h", "ı": "i", "ŧ": "t",
+     "æ": "ae", "œ": "oe", "þ": "th"}
+)
+
+
+def _fold(value: str | None) -> str:
+    """
+    Lowercase, strip accents and replace punctuation with single spaces.
+
+    :param value: Input text (may be None).
+    :return: Folded text.
+    """
+    if not value:
+        return ""
+    text = value.casefold()
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in decomposed if not unicodedata.combining(c))
+        text = text.translate(_UNDECOMPOSABLE)
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def title_key(title: str | None) -> str:
+    """
+    Build the normalized comparison key of a book title.
+
+    :param title: Book title.
+    :return: Folded title without a leading English article.
+    """
+    key = _fold(title)
+    for article in _LEADING_ARTICLES:
+        if key.startswith(article):
+            return key[len(article):]
+    return key
+
+
+def name_key(name: str | None) -> FrozenSet[str]:
+    """
+    Build the normalized token set of an author name, ignoring initials.
+
+    :param name: Author name.
+    :return: Set of name tokens longer than one character (all tokens if the
+        name consists of initials only).
+    """
+    tokens = _fold(name).split()
+    return frozenset(t for t in tokens if len(t) > 1) or frozenset(tokens)
+
+
+def names_match(a: str | None, b: str | None) -> bool:
+    """
+    Check whether two author names refer to the same person.
+
+    Names match if the tokens of one are contained in the other, so
+    "Ursula K. Le Guin", "Le Guin, Ursula" and "Ursula Le Guin" all match.
+
+    :param a: First author name.
+    :param b: Second author name.
+    :return: True if both are non-empty and match.
+    """
+    key_a, key_b = name_key(a), name_key(b)
+    if not key_a or not key_b:
+        return False
+    return key_a <= key_b or key_b <= key_a
+
+
+def tokenize(text: str | None) -> List[str]:
+    """
+    Split text into folded word tokens.
+
+    :param text: Input text.
+    :return: Lowercase, accent-free alphanumeric tokens in order.
+    """
+    return _fold(text).split()
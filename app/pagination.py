@@ -0,0 +1,109 @@
+"""
+app / pagination.py
+
+Purpose:
+Keyset (cursor) pagination helpers for bounded listing queries.
+
+Background:
+OFFSET pagination makes the database walk and discard every skipped row, so deep
+pages get slower as the library grows. Keyset pagination instead remembers the sort
+key values of the last row on a page and continues with `WHERE (keys) > (last keys)`,
+which an index on the sort columns can answer directly. The final sort key must be
+unique (typically the primary key) so that the order is total and no row is skipped.
+
+Features:
+- Encodes sort key values into opaque, URL-safe cursor strings
+- Validates cursors against the sort order they were issued for
+- Applies keyset filtering, ordering and a limit to SQLAlchemy queries
+- Fetches one extra row to detect whether a further page exists
+
+Required Modules:
+- base64, json: For cursor encoding
+- sqlalchemy: For tuple comparison in keyset filters
+- werkzeug.exceptions.BadRequest: For rejecting malformed cursors
+
+Exceptions:
+- BadRequest: Raised if a cursor cannot be decoded or belongs to another sort order
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, List, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import ColumnElement
+from werkzeug.exceptions import BadRequest
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """
+    Encode the sort key values of a row into an opaque cursor string.
+
+    :param sort: Name of the sort order the cursor belongs to.
+    :param values: Sort key values of the last row on a page.
+    :return: URL-safe cursor string.
+    """
+    raw = json.dumps({"s": sort, "k": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, key_count: int) -> List[Any]:
+    """
+    Decode a cursor string and validate it against the current sort order.
+
+    :param cursor: Cursor string from the request.
+    :param sort: Name of the sort order in effect.
+    :param key_count: Number of sort keys the sort order uses.
+    :return: List of sort key values.
+    :raises BadRequest: If the cursor is malformed, holds non-scalar values or was
+        issued for another sort.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["k"]
+        if payload["s"] != sort or not isinstance(values, list) or len(values) != key_count:
+            raise ValueError("cursor does not match sort order")
+        # Only plain scalars can be bound as SQL parameters
+        if not all(v is None or isinstance(v, (str, int, float)) for v in values):
+            raise ValueError("cursor holds a non-scalar value")
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise BadRequest("Invalid pagination cursor.")
+    return values
+
+
+def keyset_page(
+    q: Query,
+    sort: str,
+    keys: Sequence[ColumnElement],
+    cursor: str | None,
+    limit: int,
+) -> Tuple[List[Any], str | None]:
+    """
+    Fetch one page of a query ordered by the given keys, starting after a cursor.
+
+    :param q: Query returning the entities to paginate.
+    :param sort: Name of the sort order (embedded in issued cursors).
+    :param keys: Ascending sort key columns; the last one must be unique.
+    :param cursor: Cursor from the previous page, or None for the first page.
+    :param limit: Maximum number of entities to return.
+    :return: Tuple of (entities on this page, cursor for the next page or None).
+    :raises BadRequest: If the cursor is invalid.
+    """
+    if cursor:
+        after = decode_cursor(cursor, sort, len(keys))
+        q = q.filter(tuple_(*keys) > tuple_(*after))
+
+    rows = q.add_columns(*keys).order_by(*keys).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, tuple(rows[-1])[1:])
+
+    return [row[0] for row in rows], next_cursor
@@ -0,0 +1,209 @@
+"""
+app / ratelimit.py
+
+Purpose:
+Rate-limit storage shared by all worker processes of one host, and quota status
+for the current client.
+
+Flask-Limiter keeps its counters in process memory by default, so with N worker
+processes every limit is effectively N times higher. `RATELIMIT_STORAGE_URI`
+selects the storage instead; besides the schemes built into `limits`
+(memory://, redis://, memcached://, mongodb://) this module registers
+`sqlite:///path/to/file`, which needs no external service: all processes on the
+host count in the same SQLite file.
+
+Features:
+- `SQLiteStorage`: fixed-window counters in one table, atomic increments with a
+  single UPSERT ... RETURNING statement, WAL mode and a busy timeout for
+  concurrent writers, periodic purge of expired counters
+- `quota_status()`: remaining requests and reset time of every limit on an
+  endpoint for the current client, without consuming any of them
+
+Required Modules:
+- sqlite3, threading, time: For the storage connection per thread and windows
+- limits.storage.Storage: Base class (subclasses register their URI scheme)
+- flask, app.extentions.limiter: For resolving an endpoint's limits
+
+Exceptions:
+- sqlite3.Error: Raised by the storage if the counter file cannot be used
+  (Flask-Limiter logs it and, with RATELIMIT_SWALLOW_ERRORS, lets requests pass)
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List
+
+from flask import current_app
+from limits.storage import Storage
+
+logger = logging.getLogger(__name__)
+
+# Expired counters are deleted after every PURGE_EVERY increments
+PURGE_EVERY = 500
+
+
+class SQLiteStorage(Storage):
+    """
+    Fixed-window rate-limit storage in a SQLite file.
+
+    :param uri: 'sqlite:///relative/path' or 'sqlite:////absolute/path'.
+    :param wrap_exceptions: Wrap sqlite3 errors in limits' StorageError.
+    :param timeout: Seconds to wait for a locked database (storage option).
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, timeout: float = 5.0, **options: Any) -> None:
+        path = uri.split("://", 1)[1]
+        self.path = path[1:] if path.startswith("/") else path
+        if not self.path or self.path == ":memory:":
+            raise ValueError("The sqlite rate-limit storage needs a file path")
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        self._increments = 0
+        # The file is opened on the first rate-limited request, not at startup
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return this thread's connection, opening it on first use.
+
+        Connections are never shared with a forked worker process: a child
+        opens its own on first use. The counter table is created with the first
+        connection of each thread.
+
+        :return: Autocommit connection in WAL mode.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """
+        Increment a counter, starting a new window if the old one expired.
+
+        :param key: Rate-limit key.
+        :param expiry: Window length in seconds.
+        :param amount: Increment.
+        :return: Counter value after the increment.
+        """
+        now = time.time()
+        conn = self._connection()
+        count = conn.execute(
+            "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END, "
+            "expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now),
+        ).fetchone()[0]
+
+        self._increments += 1
+        if self._increments % PURGE_EVERY == 0:
+            conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        return count
+
+    def get(self, key: str) -> int:
+        """
+        :param key: Rate-limit key.
+        :return: Counter value in the current window (0 if expired or unknown).
+        """
+        row = self._connection().execute(
+            "SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        """
+        :param key: Rate-limit key.
+        :return: End of the current window as a timestamp (now if none).
+        """
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        """
+        :return: True if the counter file can be queried.
+        """
+        try:
+            self._connection().execute("SELECT 1 FROM rate_limits LIMIT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int | None:
+        """
+        Delete all counters.
+
+        :return: Number of deleted counters.
+        """
+        return self._connection().execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        """
+        :param key: Rate-limit key to reset.
+        """
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+
+def quota_status(endpoint: str, method: str = "POST") -> List[Dict[str, Any]]:
+    """
+    Report the state of every rate limit on an endpoint for the current client.
+
+    Nothing is counted against the limits. Must run inside a request context,
+    because the client key comes from the request.
+
+    :param endpoint: Endpoint name (e.g. 'recommend.generate_recommendations').
+    :param method: HTTP method the limits are evaluated for.
+    :return: Dicts with limit, remaining, reset_at and retry_after (seconds
+        until a request is allowed again, 0 if one is allowed now).
+    """
+    from app.extentions import limiter  # imported late: extentions imports this module
+
+    blueprint = endpoint.rsplit(".", 1)[0] if "." in endpoint else None
+    defaults, decorated = limiter.limit_manager.resolve_limits(
+        current_app, endpoint, blueprint
+    )
+    now = time.time()
+    status = []
+    for lim in [*defaults, *decorated]:
+        if lim.is_exempt or (lim.methods is not None and method.lower() not in lim.methods):
+            continue
+        args = [lim.key_func(), lim.scope_for(endpoint, method)]
+        if limiter._key_prefix:
+            args.insert(0, limiter._key_prefix)
+        reset_at, remaining = limiter.limiter.get_window_stats(lim.limit, *args)
+        status.append(
+            {
+                "limit": str(lim.limit),
+                "remaining": remaining,
+                "reset_at": int(reset_at),
+                "retry_after": max(0, int(reset_at - now + 0.999)) if remaining == 0 else 0,
+            }
+        )
+    return status
@@ -0,0 +1,359 @@
+"""
+app / search.py
+
+Purpose:
+Full-text search support for the book library. Maintains an SQLite FTS5 index over
+book titles, short descriptions and author names, and applies search terms to book
+queries with bm25 relevance ranking.
+
+Background:
+A `LIKE '%term%'` filter cannot use a B-tree index because of the leading wildcard,
+so every search scans the whole `books` table. The FTS5 virtual table `books_fts`
+stores an inverted index keyed by the book id (rowid), which answers term and prefix
+lookups without touching unrelated rows. For non-SQLite databases (or SQLite builds
+without FTS5) the module falls back to the original `ilike` title filter.
+
+Features:
+- Creates and populates the FTS5 table on startup if it is missing
+- Keeps the index in sync through SQLAlchemy mapper events on Book and Author
+- Converts free-text input into a safe FTS5 prefix query
+- Ranks matches with bm25, weighting titles above authors and descriptions
+
+Required Modules:
+- logging: For logging index failures
+- re: For tokenizing search input
+- sqlalchemy: Events, text queries and column types
+- app.models: ORM models Book and Author
+
+Exceptions:
+- SQLAlchemyError: Raised if index creation or synchronization fails
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+import re
+
+from sqlalchemy import event, text, Integer, Float
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import ColumnElement
+
+from app.models import db, Book, Author
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "books_fts"
+
+# bm25 column weights: title, short_description, author_name
+_BM25_WEIGHTS = "10.0, 1.0, 5.0"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Database URLs whose FTS index has been verified or created in this process
+_fts_databases: set[str] = set()
+
+
+def _fts_active(connection) -> bool:
+    """
+    Check whether the FTS index is available for the given connection's database.
+
+    :param connection: SQLAlchemy Connection or Engine.
+    :return: True if the FTS table exists for this database.
+    """
+    return str(connection.engine.url) in _fts_databases
+
+
+def ensure_search_index(engine: Engine) -> bool:
+    """
+    Create the FTS5 table if it does not exist and populate it from the books table.
+
+    :param engine: SQLAlchemy engine bound to the application database.
+    :return: True if full-text search is available, False if falling back to LIKE.
+    """
+    if engine.dialect.name != "sqlite":
+        logger.info("Full-text search disabled: %s is not SQLite", engine.dialect.name)
+        return False
+
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+                {"name": FTS_TABLE},
+            ).first()
+            if not exists:
+                conn.execute(
+                    text(
+                        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                        "title, short_description, author_name, "
+                        "tokenize='unicode61 remove_diacritics 2')"
+                    )
+                )
+                _populate(conn)
+                logger.info("Created full-text search index '%s'", FTS_TABLE)
+    except SQLAlchemyError:
+        logger.exception("FTS5 unavailable, falling back to LIKE search")
+        return False
+
+    _fts_databases.add(str(engine.url))
+    return True
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    """
+    Drop all indexed rows and re-index every book from the books table.
+
+    :param engine: SQLAlchemy engine bound to the application database.
+    :raises SQLAlchemyError: If the rebuild fails.
+    """
+    if not ensure_search_index(engine):
+        return
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        _populate(conn)
+
+
+def _populate(conn) -> None:
+    """
+    Bulk-insert all books with their author names into the FTS table.
+
+    :param conn: Open SQLAlchemy connection inside a transaction.
+    """
+    conn.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, short_description, author_name) "
+            "SELECT b.id, b.title, COALESCE(b.short_description, ''), "
+            "COALESCE(a.name, '') "
+            "FROM books b LEFT JOIN authors a ON a.id = b.author_id"
+        )
+    )
+
+
+def index_books_after(conn, after_id: int) -> None:
+    """
+    Index all books with an id greater than `after_id`.
+
+    Used by bulk loaders that insert rows through Core statements, which bypass
+    the ORM mapper events that normally keep the index in sync.
+
+    :param conn: Connection inside the transaction that inserted the books.
+    :param after_id: Highest book id that existed before the insert.
+    """
+    if not _fts_active(conn):
+        return
+    conn.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, short_description, author_name) "
+            "SELECT b.id, b.title, COALESCE(b.short_description, ''), "
+            "COALESCE(a.name, '') "
+            "FROM books b LEFT JOIN authors a ON a.id = b.author_id "
+            "WHERE b.id > :after_id"
+        ),
+        {"after_id": after_id},
+    )
+
+
+def build_match_expression(search_query: str) -> str | None:
+    """
+    Convert free-text user input into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term so that FTS5 operators and punctuation
+    in the input cannot produce syntax errors.
+
+    :param search_query: Raw search string from the user.
+    :return: MATCH expression, or None if the input contains no searchable words.
+    """
+    tokens = _TOKEN_RE.findall(search_query or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def apply_search(q: Query, search_query: str) -> tuple[Query, ColumnElement | None]:
+    """
+    Restrict a Book query to books matching the search input.
+
+    Uses the FTS5 index when available and orders by bm25 relevance; otherwise
+    falls back to a case-insensitive substring match on the title.
+
+    :param q: Book query to filter.
+    :param search_query: Raw search string from the user.
+    :return: Tuple of (filtered query, bm25 rank column or None if unranked).
+    """
+    if not _fts_active(db.engine):
+        return q.filter(Book.title.ilike(f"%{search_query}%")), None
+
+    match = build_match_expression(search_query)
+    if match is None:
+        return q.filter(db.false()), None
+
+    fts = (
+        text(
+            f"SELECT rowid AS book_id, bm25({FTS_TABLE}, {_BM25_WEIGHTS}) AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        )
+        .bindparams(match=match)
+        .columns(book_id=Integer, rank=Float)
+        .subquery("fts")
+    )
+    q = q.join(fts, fts.c.book_id == Book.id)
+    return q, fts.c.rank
+
+
+def filter_books(
+    q: Query, search_query: str | None, author_id: int | None
+) -> tuple[Query, ColumnElement | None]:
+    """
+    Apply the home page filters (search terms and author) to a query over books.
+
+    Shared by the paginated listing and the export so both select the same rows.
+
+    :param q: Query whose FROM clause includes the books table.
+    :param search_query: Raw search string from the user (optional).
+    :param author_id: Author ID to filter by (optional).
+    :return: Tuple of (filtered query, bm25 rank column or None if unranked).
+    """
+    rank = None
+    if search_query:
+        q, rank = apply_search(q, search_query)
+    if author_id:
+        q = q.filter(Book.author_id == author_id)
+    return q, rank
+
+
+def _author_name(connection, author_id: int | None) -> str:
+    """
+    Look up an author's name on the flushing connection.
+
+    :param connection: Connection used by the current flush.
+    :param author_id: Author primary key or None.
+    :return: Author name, or an empty string if unknown.
+    """
+    if author_id is None:
+        return ""
+    name = connection.execute(
+        text("SELECT name FROM authors WHERE id = :id"), {"id": author_id}
+    ).scalar()
+    return name or ""
+
+
+_INDEXED_BOOK_FIELDS = ("title", "short_description", "author_id")
+
+
+@event.listens_for(Book, "after_insert")
+def _index_new_book(mapper, connection, target: Book) -> None:
+    """
+    Add a newly inserted book to the FTS index.
+
+    :param mapper: Book mapper (unused).
+    :param connection: Connection used by the current flush.
+    :param target: The Book instance that was inserted.
+    """
+    if _fts_active(connection):
+        _index_book(connection, target)
+
+
+@event.listens_for(Book, "after_update")
+def _reindex_book(mapper, connection, target: Book) -> None:
+    """
+    Re-index an updated book if one of its searchable fields changed.
+
+    Rating and progress updates leave the index untouched.
+
+    :param mapper: Book mapper (unused).
+    :param connection: Connection used by the current flush.
+    :param target: The Book instance that was updated.
+    """
+    if not _fts_active(connection):
+        return
+    attrs = db.inspect(target).attrs
+    if any(attrs[field].history.has_changes() for field in _INDEXED_BOOK_FIELDS):
+        _index_book(connection, target)
+
+
+def _index_book(connection, target: Book) -> None:
+    """
+    Insert or replace the FTS row for a book.
+
+    :param connection: Connection used by the current flush.
+    :param target: The Book instance to index.
+    """
+    connection.execute(
+        text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": target.id}
+    )
+    connection.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, short_description, author_name) "
+            "VALUES (:id, :title, :description, :author_name)"
+        ),
+        {
+            "id": target.id,
+            "title": target.title,
+            "description": target.short_description or "",
+            "author_name": _author_name(connection, target.author_id),
+        },
+    )
+
+
+@event.listens_for(Book, "after_delete")
+def _unindex_book(mapper, connection, target: Book) -> None:
+    """
+    Remove a deleted book from the FTS index.
+
+    :param mapper: Book mapper (unused).
+    :param connection: Connection used by the current flush.
+    :param target: The Book instance that was deleted.
+    """
+    if not _fts_active(connection):
+        return
+    connection.execute(
+        text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": target.id}
+    )
+
+
+def _set_author_name(connection, author_id: int, name: str) -> None:
+    """
+    Overwrite the indexed author name on all books of one author.
+
+    :param connection: Connection used by the current flush.
+    :param author_id: Author primary key.
+    :param name: Name to store in the index.
+    """
+    connection.execute(
+        text(
+            f"UPDATE {FTS_TABLE} SET author_name = :name "
+            "WHERE rowid IN (SELECT id FROM books WHERE author_id = :id)"
+        ),
+        {"name": name, "id": author_id},
+    )
+
+
+@event.listens_for(Author, "after_update")
+def _reindex_author_books(mapper, connection, target: Author) -> None:
+    """
+    Refresh the author name on all indexed books of a renamed author.
+
+    :param mapper: Author mapper (unused).
+    :param connection: Connection used by the current flush.
+    :param target: The Author instance that was updated.
+    """
+    if _fts_active(connection):
+        _set_author_name(connection, target.id, target.name)
+
+
+@event.listens_for(Author, "before_delete")
+def _clear_author_books(mapper, connection, target: Author) -> None:
+    """
+    Clear the author name on indexed books before their author is deleted.
+
+    Runs before the delete so the books can still be found by author_id, even
+    when the database sets the foreign key to NULL.
+
+    :param mapper: Author mapper (unused).
+    :param connection: Connection used by the current flush.
+    :param target: The Author instance about to be deleted.
+    """
+    if _fts_active(connection):
+        _set_author_name(connection, target.id, "")
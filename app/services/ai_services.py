@@ -5,11 +5,15 @@ communicating with the OpenAI API to retrieve book suggestions.
 
 Features:
 - Serialization of Book model instances for structured AI input
-- Robust OpenAI API request handling
+- Robust OpenAI API request handling through the shared pooled HTTP client
+  (keep-alive, retries with backoff, circuit breaker)
 - Parses structured JSON responses into application-ready data
+- Streaming mode: yields each recommendation as soon as its JSON object is
+  complete in the streamed completion
 
 Dependencies:
-- requests: for HTTP communication with OpenAI API
+- requests: for HTTP exception types
+- app.services.http_client: pooled, retrying client for the OpenAI API
 - os: for accessing environment variables
 - logging: for error tracking
 - json: for encoding and decoding JSON data
@@ -17,7 +21,8 @@ Dependencies:
 
 Raises:
 - EnvironmentError: if OPENAI_API_KEY is not set
-- requests.RequestException: on network issues or non-200 responses
+- requests.RequestException: on network issues or non-200 responses after retries
+- CircuitOpenError: while the AI service is considered down
 - ValueError: if response is not valid JSON
 - Exception: for serialization failures
 
@@ -28,12 +33,18 @@ Date: 2025-07-10
 import os
 import json
 import logging
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, List, Tuple
 
 import requests
+from flask import current_app
+
+from app.services.http_client import CircuitOpenError, ai_client
 
 logger = logging.getLogger(__name__)
 
+# Chat model used for recommendations (also part of the response cache key)
+AI_MODEL = "gpt-3.5-turbo"
+
 
 def prepare_books_data(books: List[Any]) -> List[Dict[str, Any]]:
     """
@@ -74,15 +85,13 @@ def prepare_books_data(books: List[Any]) -> List[Dict[str, Any]]:
     return data
 
 
-def fetch_ai_recommendation(prompt: str) -> Dict[str, Any]:
+def _request_parts(prompt: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
     """
-    Send a prompt to the OpenAI API and parse the JSON response with recommendations.
+    Build the headers and payload of a chat completions request.
 
     :param prompt: The user prompt for AI
-    :return: Parsed JSON response from AI
+    :return: Tuple of (headers, payload)
     :raises EnvironmentError: if OPENAI_API_KEY is not set
-    :raises requests.RequestException: if HTTP request fails
-    :raises ValueError: if JSON response is invalid
     """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -94,7 +103,7 @@ def fetch_ai_recommendation(prompt: str) -> Dict[str, Any]:
         "Content-Type": "application/json",
     }
     payload = {
-        "model": "gpt-3.5-turbo",
+        "model": AI_MODEL,
         "messages": [
             {
                 "role": "system",
@@ -108,20 +117,138 @@ def fetch_ai_recommendation(prompt: str) -> Dict[str, Any]:
         "max_tokens": 1500,
         "temperature": 0.7,
     }
+    return headers, payload
+
+
+def fetch_ai_recommendation(prompt: str) -> Dict[str, Any]:
+    """
+    Send a prompt to the OpenAI API and parse the JSON response with recommendations.
+
+    :param prompt: The user prompt for AI
+    :return: Parsed JSON response from AI
+    :raises EnvironmentError: if OPENAI_API_KEY is not set
+    :raises requests.RequestException: if HTTP request fails after retries
+    :raises CircuitOpenError: if the circuit for the AI service is open
+    :raises ValueError: if JSON response is invalid
+    """
+    headers, payload = _request_parts(prompt)
 
     try:
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30,
+        data = ai_client().post_json(
+            current_app.config["AI_API_URL"], payload, headers=headers
         )
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"]
+        content = data["choices"][0]["message"]["content"]
         return json.loads(content)
+    except CircuitOpenError as e:
+        logger.warning("AI request skipped: %s", e)
+        raise
     except requests.RequestException as e:
         logger.exception("OpenAI API request failed")
         raise
     except json.JSONDecodeError:
         logger.error("Invalid JSON from AI response")
         raise ValueError("Invalid JSON response from AI")
+
+
+class RecommendationStreamParser:
+    """
+    Incremental parser that extracts complete recommendation objects from a
+    growing JSON text of the form {"recommendations": [{...}, {...}, ...]}.
+
+    Text is fed in arbitrary chunks; every object that closes at the top level
+    of the first array is decoded and returned as soon as its closing brace
+    arrives. Strings (including escaped quotes and braces) are skipped correctly.
+    """
+
+    def __init__(self) -> None:
+        self.in_array = False
+        self.in_string = False
+        self.escaped = False
+        self.depth = 0  # object nesting depth inside the array
+        self.current: List[str] = []
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of the response text.
+
+        :param chunk: Next piece of the JSON text
+        :return: Recommendation objects completed by this chunk
+        """
+        completed: List[Dict[str, Any]] = []
+        for char in chunk:
+            if self.depth:
+                self.current.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+            if char == '"':
+                self.in_string = True
+            elif not self.in_array:
+                self.in_array = char == "["
+            elif char == "{":
+                if not self.depth:
+                    self.current = [char]
+                self.depth += 1
+            elif char == "}" and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    try:
+                        completed.append(json.loads("".join(self.current)))
+                    except json.JSONDecodeError:
+                        logger.warning("Skipping malformed streamed recommendation")
+            elif char == "]" and not self.depth:
+                self.in_array = False
+        return completed
+
+
+def stream_ai_recommendations(prompt: str) -> Iterator[Dict[str, Any]]:
+    """
+    Request a streamed completion and yield each recommendation as soon as its
+    JSON object is complete.
+
+    :param prompt: The user prompt for AI
+    :return: Iterator of recommendation dicts
+    :raises EnvironmentError: if OPENAI_API_KEY is not set
+    :raises requests.RequestException: if HTTP request fails after retries
+    :raises CircuitOpenError: if the circuit for the AI service is open
+    :raises ValueError: if the stream ends without its "data: [DONE]" marker
+    """
+    headers, payload = _request_parts(prompt)
+    payload["stream"] = True
+    parser = RecommendationStreamParser()
+    completed = False
+
+    try:
+        lines = ai_client().post_stream(
+            current_app.config["AI_API_URL"], payload, headers=headers
+        )
+        for line in lines:
+            # Server-sent events: "data: {chunk}" lines, ending with "data: [DONE]"
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                completed = True
+                break
+            try:
+                delta = json.loads(data)["choices"][0].get("delta", {})
+            except (json.JSONDecodeError, KeyError, IndexError):
+                logger.warning("Ignoring malformed stream event: %r", data[:200])
+                continue
+            yield from parser.feed(delta.get("content") or "")
+    except CircuitOpenError as e:
+        logger.warning("AI request skipped: %s", e)
+        raise
+    except requests.RequestException:
+        logger.exception("OpenAI API streaming request failed")
+        raise
+
+    if not completed:
+        # Connection closed early: the recommendations so far may be incomplete
+        logger.error("AI stream ended before data: [DONE]")
+        raise ValueError("The AI response stream was cut off")
@@ -0,0 +1,329 @@
+# app / services / covers.py
+"""
+Local cover image cache. Every cover is fetched once from a pluggable source,
+resized to the thumbnail sizes the pages use, and stored on disk keyed by ISBN,
+so pages no longer hotlink full-size images from a third-party CDN.
+
+Layout of COVER_CACHE_DIR:
+- <size>/<isbn>.<jpg|webp>: thumbnails (size names and heights from COVER_SIZES)
+- missing/<isbn>: marker for covers the source does not have; the source is
+  asked again after COVER_MISSING_TTL seconds
+
+Sources:
+- "openlibrary": HTTP download from COVER_SOURCE_URL (Open Library by default,
+  or the `processing_image_url` service if configured)
+- "directory": image files named <isbn>.<ext> in COVER_SOURCE_DIR (offline use
+  and tests)
+Further sources are added with `register_cover_source()`.
+
+Features:
+- Thumbnails as progressive JPEG and, where Pillow supports it, WebP
+- Concurrent requests for the same uncached cover share one download
+- Atomic file writes (no half-written thumbnails are ever served)
+- Pillow is required: without it no cover is fetched or stored (an error is
+  logged once and pages show the placeholder), never the full-size original
+
+Dependencies:
+- PIL (Pillow): for resizing and WebP encoding
+- requests: for HTTP exception types (imported on first download)
+- app.services.http_client: pooled client for downloads (imported on first use)
+- app.services.single_flight: download coalescing (own "covers" coalescer)
+
+Raises:
+- No exceptions for missing or unreachable covers; callers get None and serve
+  a placeholder
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import io
+import logging
+import os
+import re
+import tempfile
+import time
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from flask import current_app
+
+from app.services.single_flight import single_flight
+
+try:
+    from PIL import Image, features
+except ImportError:  # reported by get_cover(); the rest of the app still runs
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# URL extension -> (Pillow format, MIME type)
+FORMATS: Dict[str, Tuple[str, str]] = {
+    "jpg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+# Encoder settings: progressive JPEG renders early; WebP method 4 balances speed and size
+_ENCODER_OPTIONS = {
+    "jpg": {"optimize": True, "progressive": True},
+    "webp": {"method": 4},
+}
+
+SOURCE_EXTENSIONS = ("jpg", "jpeg", "png", "webp", "gif")
+
+_ISBN = re.compile(r"\d{9}[\dX]|\d{13}")
+_ISBN_NOISE = re.compile(r"[^0-9X]")
+
+
+def normalize_isbn(isbn: str | None) -> str | None:
+    """
+    Reduce an ISBN to its digits (and check character).
+
+    :param isbn: ISBN as entered, e.g. "978-0-441-47812-5".
+    :return: "9780441478125", or None if it is not an ISBN-10/13.
+    """
+    if not isbn:
+        return None
+    value = _ISBN_NOISE.sub("", isbn.upper())
+    return value if _ISBN.fullmatch(value) else None
+
+
+@lru_cache(maxsize=1)
+def webp_supported() -> bool:
+    """
+    :return: True if Pillow is installed with WebP support.
+    """
+    return Image is not None and features.check("webp")
+
+
+def available_formats() -> Tuple[str, ...]:
+    """
+    :return: URL extensions thumbnails can be served in.
+    """
+    return ("jpg", "webp") if webp_supported() else ("jpg",)
+
+
+class CoverSource:
+    """Base class of cover image sources."""
+
+    name = "base"
+
+    def fetch(self, isbn: str) -> bytes | None:
+        """
+        Load the original cover image of a book.
+
+        :param isbn: Normalized ISBN.
+        :return: Encoded image, or None if the source has no cover for it.
+        :raises requests.RequestException: if a remote source is unreachable.
+        :raises OSError: if a local source cannot be read.
+        """
+        raise NotImplementedError
+
+
+class OpenLibrarySource(CoverSource):
+    """Covers downloaded over HTTP from a URL template containing {isbn}."""
+
+    name = "openlibrary"
+
+    def fetch(self, isbn: str) -> bytes | None:
+        # The HTTP client (requests) is loaded on the first download, not at startup
+        from app.services.http_client import covers_client
+
+        url = current_app.config["COVER_SOURCE_URL"].format(isbn=isbn)
+        return covers_client().get_bytes(url)
+
+
+class DirectorySource(CoverSource):
+    """Covers read from <isbn>.<ext> files in COVER_SOURCE_DIR."""
+
+    name = "directory"
+
+    def fetch(self, isbn: str) -> bytes | None:
+        directory = current_app.config["COVER_SOURCE_DIR"]
+        for ext in SOURCE_EXTENSIONS:
+            path = os.path.join(directory, f"{isbn}.{ext}")
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    return f.read()
+        return None
+
+
+COVER_SOURCES: Dict[str, CoverSource] = {}
+
+
+def register_cover_source(source: CoverSource) -> None:
+    """
+    Make a cover source selectable through COVER_SOURCE.
+
+    :param source: Source instance; registered under its `name`.
+    """
+    COVER_SOURCES[source.name] = source
+
+
+register_cover_source(OpenLibrarySource())
+register_cover_source(DirectorySource())
+
+
+def get_cover_source() -> CoverSource:
+    """
+    Return the configured cover source.
+
+    :return: Source named by COVER_SOURCE.
+    :raises ValueError: if COVER_SOURCE names no registered source.
+    """
+    name = current_app.config["COVER_SOURCE"]
+    try:
+        return COVER_SOURCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown cover source: {name!r}") from None
+
+
+def sniff_mimetype(data: bytes) -> str:
+    """
+    Detect the MIME type of an encoded image from its signature.
+
+    :param data: Image bytes (only the first 12 are inspected).
+    :return: MIME type; "application/octet-stream" if unknown.
+    """
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data.startswith(b"GIF8"):
+        return "image/gif"
+    return "application/octet-stream"
+
+
+def _thumbnails(original: bytes) -> Dict[Tuple[str, str], bytes]:
+    """
+    Render all thumbnails of a cover.
+
+    :param original: Encoded source image.
+    :return: Mapping of (size name, extension) -> encoded thumbnail.
+    :raises OSError: if Pillow cannot decode the image.
+    """
+    sizes = current_app.config["COVER_SIZES"]
+    quality = current_app.config["COVER_QUALITY"]
+    with Image.open(io.BytesIO(original)) as source:
+        image = source.convert("RGB")
+    rendered = {}
+    for size, height in sizes.items():
+        thumb = image.copy()
+        thumb.thumbnail((height, height), Image.LANCZOS)
+        for ext in available_formats():
+            buffer = io.BytesIO()
+            thumb.save(buffer, FORMATS[ext][0], quality=quality, **_ENCODER_OPTIONS[ext])
+            rendered[(size, ext)] = buffer.getvalue()
+    return rendered
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """
+    Write a file so that readers see either nothing or the complete content.
+
+    :param path: Target path (its directory is created if needed).
+    :param data: File content.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@lru_cache(maxsize=1)
+def _thumbnails_unavailable() -> bool:
+    """
+    :return: True (after logging an error once) if Pillow is not installed.
+    """
+    if Image is None:
+        logger.error("Pillow is not installed; cover thumbnails are disabled")
+        return True
+    return False
+
+
+def cover_path(isbn: str, size: str, ext: str) -> str:
+    """
+    :param isbn: Normalized ISBN.
+    :param size: Size name from COVER_SIZES.
+    :param ext: Extension from FORMATS.
+    :return: Location of the cached thumbnail.
+    """
+    return os.path.join(current_app.config["COVER_CACHE_DIR"], size, f"{isbn}.{ext}")
+
+
+def _missing_path(isbn: str) -> str:
+    return os.path.join(current_app.config["COVER_CACHE_DIR"], "missing", isbn)
+
+
+def _populate(isbn: str) -> bool:
+    """
+    Fetch a cover from the source and store all of its thumbnails.
+
+    :param isbn: Normalized ISBN.
+    :return: True if the thumbnails were stored, False if there is no cover.
+    :raises requests.RequestException: if the source is unreachable.
+    :raises OSError: if the source or the cache directory cannot be used.
+    """
+    started = time.perf_counter()
+    original = get_cover_source().fetch(isbn)
+    try:
+        rendered = _thumbnails(original) if original else None
+    except OSError:
+        logger.warning("Cover for ISBN %s is not a readable image", isbn)
+        rendered = None
+    if not rendered:
+        _write_atomic(_missing_path(isbn), b"")
+        return False
+
+    for (size, ext), data in rendered.items():
+        _write_atomic(cover_path(isbn, size, ext), data)
+    if os.path.exists(_missing_path(isbn)):
+        os.unlink(_missing_path(isbn))
+    logger.info(
+        "Cached cover for ISBN %s (%s KB source) in %.0f ms",
+        isbn,
+        len(original) // 1024,
+        (time.perf_counter() - started) * 1000,
+    )
+    return True
+
+
+def get_cover(isbn: str, size: str, ext: str) -> str | None:
+    """
+    Return the cached thumbnail of a cover, fetching the cover on first use.
+
+    :param isbn: Normalized ISBN.
+    :param size: Size name from COVER_SIZES.
+    :param ext: Extension from `available_formats()`.
+    :return: Path of the thumbnail, or None if there is no cover (yet).
+    """
+    path = cover_path(isbn, size, ext)
+    if os.path.exists(path):
+        return path
+    if _thumbnails_unavailable():
+        return None
+
+    try:
+        missing_since = os.path.getmtime(_missing_path(isbn))
+    except OSError:
+        missing_since = None
+    if missing_since and time.time() - missing_since < current_app.config["COVER_MISSING_TTL"]:
+        return None
+
+    import requests
+
+    try:
+        single_flight("covers").do(isbn, lambda: _populate(isbn))
+    except (requests.RequestException, OSError) as e:
+        # Not recorded as missing, so the next request tries again
+        logger.warning("Could not fetch cover for ISBN %s: %s", isbn, e)
+        return None
+    return path if os.path.exists(path) else None
@@ -0,0 +1,160 @@
+# app / services / exporter.py
+"""
+Streams the library as CSV or NDJSON with constant memory, for nightly analytics
+exports of libraries of any size.
+
+Features:
+- Selects book columns joined with author fields in a single query
+- Supports the same search and author filters as the home page
+- Iterates rows through a streaming cursor (`yield_per`) instead of loading all rows
+- Encodes rows in small chunks suitable for a streamed Flask response
+- Column names match the bulk importer, so an export can be re-imported
+
+Dependencies:
+- csv, io, json: for row encoding
+- app.models: db, Book, Author
+- app.search.filter_books: shared home page filters
+
+Raises:
+- ValueError: if the export format is unknown
+- SQLAlchemyError: if the query fails while streaming
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator
+
+from app.models import db, Book, Author
+from app.search import filter_books
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+COLUMNS = (
+    "id",
+    "title",
+    "author",
+    "author_id",
+    "author_birth_date",
+    "author_date_of_death",
+    "publication_year",
+    "isbn",
+    "short_description",
+    "rating",
+    "is_read",
+    "progress",
+)
+
+# Rows fetched per cursor round trip and encoded per response chunk
+CHUNK_ROWS = 500
+
+
+def iter_export_rows(search_query: str | None, author_id: int | None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield exported rows as dictionaries, streaming from the database cursor.
+
+    :param search_query: Search terms as on the home page (optional).
+    :param author_id: Author ID to filter by (optional).
+    :return: Iterator of row dicts keyed by COLUMNS.
+    :raises SQLAlchemyError: if the query fails.
+    """
+    q = (
+        db.session.query(
+            Book.id,
+            Book.title,
+            Author.name.label("author"),
+            Book.author_id,
+            Author.birth_date.label("author_birth_date"),
+            Author.date_of_death.label("author_date_of_death"),
+            Book.publication_year,
+            Book.isbn,
+            Book.short_description,
+            Book.rating,
+            Book.is_read,
+            Book.progress,
+        )
+        .select_from(Book)
+        .outerjoin(Author, Book.author_id == Author.id)
+    )
+    q, _ = filter_books(q, search_query, author_id)
+
+    for row in q.order_by(Book.id).yield_per(CHUNK_ROWS):
+        yield {
+            key: value.isoformat() if isinstance(value, date) else value
+            for key, value in row._mapping.items()
+        }
+
+
+def _chunks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Group encoded lines into chunks of CHUNK_ROWS lines.
+
+    :param lines: Encoded lines including their line endings.
+    :return: Iterator of concatenated chunks.
+    """
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= CHUNK_ROWS:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def _csv_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Encode rows as CSV lines, starting with a header row.
+
+    :param rows: Row dicts keyed by COLUMNS.
+    :return: Iterator of CSV lines.
+    """
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=COLUMNS)
+
+    def take() -> str:
+        line = out.getvalue()
+        out.seek(0)
+        out.truncate()
+        return line
+
+    writer.writeheader()
+    yield take()
+    for row in rows:
+        writer.writerow(row)
+        yield take()
+
+
+def _ndjson_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Encode rows as newline-delimited JSON.
+
+    :param rows: Row dicts keyed by COLUMNS.
+    :return: Iterator of JSON lines.
+    """
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def generate_export(fmt: str, search_query: str | None, author_id: int | None) -> Iterator[str]:
+    """
+    Generate the export body in chunks.
+
+    :param fmt: 'csv' or 'ndjson'.
+    :param search_query: Search terms (optional).
+    :param author_id: Author ID filter (optional).
+    :return: Iterator of text chunks.
+    :raises ValueError: if the format is unknown.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Use csv or ndjson.")
+    rows = iter_export_rows(search_query, author_id)
+    lines = _csv_lines(rows) if fmt == "csv" else _ndjson_lines(rows)
+    return _chunks(lines)
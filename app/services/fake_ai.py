@@ -0,0 +1,248 @@
+# app / services / fake_ai.py
+"""
+Local stand-in for the OpenAI chat completions endpoint, for tests and offline
+development. Point `AI_API_URL` at it to exercise the whole recommendation flow
+(HTTP client, retries, circuit breaker, caching) without an API key or network.
+
+Features:
+- Answers `POST /v1/chat/completions` with three canned recommendations in the
+  OpenAI response format
+- Streaming: requests with `"stream": true` get the completion as server-sent
+  events in small content deltas, ending with `data: [DONE]`, optionally with a
+  delay between chunks to imitate token generation
+- Failure injection: a queue of status codes returned before succeeding
+  (e.g. [503, 503] to test retries, or many 500s to open the circuit)
+- Optional response delay for timeout tests
+- Custom completion content (e.g. a refusal) and streams cut off before
+  `data: [DONE]`
+- Counts received requests
+- `flask fake-ai` CLI command to run it as a standalone server
+
+Dependencies:
+- http.server, threading: for the in-process server
+- click: for the CLI command
+
+Raises:
+- OSError: if the port cannot be bound
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+import click
+
+logger = logging.getLogger(__name__)
+
+COMPLETIONS_PATH = "/v1/chat/completions"
+
+FAKE_RECOMMENDATIONS: Dict[str, Any] = {
+    "recommendations": [
+        {
+            "title": "The Left Hand of Darkness",
+            "author": "Ursula K. Le Guin",
+            "author_birth_date": "1929-10-21",
+            "author_date_of_death": "2018-01-22",
+            "description": "An envoy visits a planet whose people have no fixed sex.",
+            "isbn": "9780441478125",
+            "publication_year": 1969,
+        },
+        {
+            "title": "Solaris",
+            "author": "Stanisław Lem",
+            "author_birth_date": "1921-09-12",
+            "author_date_of_death": "2006-03-27",
+            "description": "Scientists study an ocean that may be a single mind.",
+            "isbn": "9780156027601",
+            "publication_year": 1961,
+        },
+        {
+            "title": "Kindred",
+            "author": "Octavia E. Butler",
+            "author_birth_date": "1947-06-22",
+            "author_date_of_death": "2006-02-24",
+            "description": "A woman is pulled back in time to a Maryland plantation.",
+            "isbn": "9780807083697",
+            "publication_year": 1979,
+        },
+    ]
+}
+
+
+class FakeAIServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server imitating the chat completions API.
+
+    :param host: Interface to bind.
+    :param port: Port to bind (0 picks a free port).
+    :param failures: Status codes to return, in order, before answering normally.
+    :param delay: Seconds to wait before each response.
+    :param chunk_size: Characters of content per streamed chunk.
+    :param chunk_delay: Seconds to wait between streamed chunks.
+    :param content: Completion text to send instead of the canned
+        recommendations (e.g. a refusal).
+    :param truncate: End streams without the `data: [DONE]` marker.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        failures: List[int] | None = None,
+        delay: float = 0.0,
+        chunk_size: int = 16,
+        chunk_delay: float = 0.0,
+        content: str | None = None,
+        truncate: bool = False,
+    ) -> None:
+        super().__init__((host, port), _FakeAIHandler)
+        self.failures = list(failures or [])
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.content = content
+        self.truncate = truncate
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Full URL of the completions endpoint (use as AI_API_URL)."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{COMPLETIONS_PATH}"
+
+    def next_status(self) -> int:
+        """
+        Count a request and return the status code to answer it with.
+
+        :return: Next injected failure status, or 200.
+        """
+        with self._lock:
+            self.request_count += 1
+            return self.failures.pop(0) if self.failures else 200
+
+    def start(self) -> "FakeAIServer":
+        """
+        Serve requests on a background thread.
+
+        :return: The server itself (for chaining).
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address) -> None:
+        """Log handler errors; clients dropping keep-alive connections are expected."""
+        logger.debug("fake AI: error serving %s", client_address, exc_info=True)
+
+
+class _FakeAIHandler(BaseHTTPRequestHandler):
+    """Request handler for FakeAIServer."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content: str) -> None:
+        # Like the real API: no Content-Length, connection closed at the end
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        size = max(self.server.chunk_size, 1)
+        for start in range(0, len(content), size):
+            event = {
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": content[start:start + size]}}],
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+        if not self.server.truncate:
+            self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            request = {}
+
+        if self.path != COMPLETIONS_PATH:
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        status = self.server.next_status()
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if status != 200:
+            self._send_json(status, {"error": {"message": f"Injected failure {status}"}})
+            return
+
+        content = self.server.content
+        if content is None:
+            content = json.dumps(FAKE_RECOMMENDATIONS, indent=2)
+        if request.get("stream"):
+            self._send_stream(content)
+            return
+        self._send_json(
+            200,
+            {
+                "object": "chat.completion",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {
+                            "role": "assistant",
+                            "content": content,
+                        },
+                        "finish_reason": "stop",
+                    }
+                ],
+            },
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("fake AI: " + format, *args)
+
+
+@click.command("fake-ai")
+@click.option("--host", default="127.0.0.1", help="Interface to bind.")
+@click.option("--port", type=int, default=5055, help="Port to bind.")
+@click.option("--fail", "failures", type=int, multiple=True, help="Status code to return before succeeding (repeatable).")
+@click.option("--delay", type=float, default=0.0, help="Seconds to wait before each response.")
+@click.option("--chunk-delay", type=float, default=0.05, help="Seconds between streamed chunks.")
+def fake_ai_command(host: str, port: int, failures: tuple, delay: float, chunk_delay: float) -> None:
+    """Run a local fake of the AI chat completions endpoint."""
+    server = FakeAIServer(host, port, list(failures), delay, chunk_delay=chunk_delay)
+    click.echo(f"Fake AI endpoint listening on {server.url} (set AI_API_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
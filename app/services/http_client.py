@@ -0,0 +1,314 @@
+# app / services / http_client.py
+"""
+Shared HTTP client for outbound calls from the service layer (currently the AI
+recommendation API).
+
+A plain `requests.post` opens a new TCP + TLS connection for every call and gives
+up on the first transient error. The client here keeps a pooled keep-alive
+session per upstream, retries rate-limited and failed requests with jittered
+exponential backoff, and stops calling an upstream that keeps failing until it
+had time to recover.
+
+Features:
+- One `requests.Session` per upstream with a sized connection pool (keep-alive)
+- Retries with exponential backoff plus jitter, honouring `Retry-After`, only
+  where the upstream cannot have processed (and billed) the request: connection
+  errors and 429/502/503/504; read timeouts and 500 responses are not retried
+- Circuit breaker: after N consecutive failures, calls fail fast for a cool-down
+  period; a single trial call then decides whether the circuit closes again
+- Separate connect and read timeouts (the read timeout applies per chunk when
+  streaming)
+- Line-by-line streaming of response bodies (server-sent events)
+- Clients are created once per app and configured from the app config (AI_*,
+  COVER_*)
+- GET of binary resources (cover images), with 404 reported as missing
+
+Dependencies:
+- requests, urllib3: session, connection pooling and retry policy
+- threading, time: for the thread-safe circuit breaker
+- flask.current_app: for configuration and per-app client storage
+
+Raises:
+- CircuitOpenError: while the circuit of an upstream is open
+- requests.RequestException: on network errors or error responses after retries
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, Tuple
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Statuses counted as upstream failures by the circuit breaker
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Statuses that are resent: the request was rejected before it was processed
+RESEND_STATUSES = (429, 502, 503, 504)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker.
+
+    :param failure_threshold: Consecutive failures that open the circuit.
+    :param reset_timeout: Seconds the circuit stays open before a trial call.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        :raises CircuitOpenError: if the circuit is open, or half-open with a
+            trial call already in flight.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let exactly one trial call through
+                self.state = HALF_OPEN
+                return
+            remaining = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(
+                f"Upstream unavailable, circuit open (retry in {remaining:.0f}s)"
+            )
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the failure count."""
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Circuit closed after successful trial call")
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        """Count a failure and open the circuit at the threshold or after a failed trial."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(
+                        "Circuit opened after %s consecutive failures", self.failures
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+class HttpClient:
+    """
+    Pooled, retrying HTTP client guarded by a circuit breaker.
+
+    :param pool_size: Maximum number of kept-alive connections per host.
+    :param max_retries: Retries for connection errors and RESEND_STATUSES.
+    :param backoff_factor: Base of the exponential backoff in seconds.
+    :param backoff_jitter: Maximum random seconds added to each backoff.
+    :param timeout: (connect, read) timeouts in seconds.
+    :param breaker: Circuit breaker for the upstream.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_jitter: float = 0.5,
+        timeout: Tuple[float, float] = (5.0, 30.0),
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        # POST is retried too, but never after the request may have been
+        # processed: a read timeout or a 500 can mean a completed, billed call
+        retry = Retry(
+            total=max_retries,
+            read=0,
+            other=0,
+            status_forcelist=RESEND_STATUSES,
+            allowed_methods=None,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+
+    def post_json(self, url: str, payload: Dict[str, Any], headers: Dict[str, str] | None = None) -> Any:
+        """
+        POST a JSON payload and return the decoded JSON response.
+
+        Connection errors, timeouts and 429/5xx responses (after retries) count as
+        upstream failures for the circuit breaker; other 4xx responses do not.
+
+        :param url: Target URL.
+        :param payload: JSON-serializable request body.
+        :param headers: Additional request headers.
+        :return: Decoded JSON response body.
+        :raises CircuitOpenError: if the circuit is open.
+        :raises requests.RequestException: on network errors or error responses.
+        :raises ValueError: if the response body is not JSON.
+        """
+        self.breaker.before_call()
+        try:
+            response = self.session.post(
+                url, json=payload, headers=headers, timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in RETRY_STATUSES:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response.json()
+
+    def post_stream(self, url: str, payload: Dict[str, Any], headers: Dict[str, str] | None = None) -> Iterator[str]:
+        """
+        POST a JSON payload and yield the response body line by line as it arrives.
+
+        Retries and the circuit breaker apply until the response headers are
+        received. A successful status is recorded as a success right away, so a
+        caller that stops reading early (e.g. at `data: [DONE]`) still closes a
+        half-open circuit; an error while reading the body counts as a failure.
+
+        :param url: Target URL.
+        :param payload: JSON-serializable request body.
+        :param headers: Additional request headers.
+        :return: Iterator of decoded response lines (without line endings).
+        :raises CircuitOpenError: if the circuit is open.
+        :raises requests.RequestException: on network errors or error responses.
+        """
+        self.breaker.before_call()
+        try:
+            response = self.session.post(
+                url, json=payload, headers=headers, timeout=self.timeout, stream=True
+            )
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in RETRY_STATUSES:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+
+        # Event streams usually declare no charset; the API sends UTF-8
+        response.encoding = response.encoding or "utf-8"
+        with response:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    yield line
+            except requests.RequestException:
+                self.breaker.record_failure()
+                raise
+
+    def get_bytes(self, url: str) -> bytes | None:
+        """
+        GET a resource and return its body.
+
+        :param url: Resource URL.
+        :return: Response body, or None if the resource does not exist (404).
+        :raises CircuitOpenError: if the circuit is open.
+        :raises requests.RequestException: on network errors or other error responses.
+        """
+        self.breaker.before_call()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code == 404:
+                self.breaker.record_success()
+                return None
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in RETRY_STATUSES:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response.content
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+
+def ai_client() -> HttpClient:
+    """
+    Return the app's HTTP client for the AI service, creating it on first use.
+
+    :return: Shared HttpClient configured from the AI_* config values.
+    """
+    app = current_app._get_current_object()
+    clients = app.extensions.setdefault("http_clients", {})
+    client = clients.get("ai")
+    if client is None:
+        config = app.config
+        client = HttpClient(
+            pool_size=config["AI_POOL_SIZE"],
+            max_retries=config["AI_MAX_RETRIES"],
+            backoff_factor=config["AI_BACKOFF_FACTOR"],
+            backoff_jitter=config["AI_BACKOFF_JITTER"],
+            timeout=(config["AI_CONNECT_TIMEOUT"], config["AI_READ_TIMEOUT"]),
+            breaker=CircuitBreaker(
+                config["AI_CIRCUIT_FAILURE_THRESHOLD"], config["AI_CIRCUIT_RESET_TIMEOUT"]
+            ),
+        )
+        # Another thread may have created the client meanwhile; keep the first one
+        client = clients.setdefault("ai", client)
+    return client
+
+
+def covers_client() -> HttpClient:
+    """
+    Return the app's HTTP client for cover image downloads, creating it on first use.
+
+    :return: Shared HttpClient configured from the COVER_* config values.
+    """
+    app = current_app._get_current_object()
+    clients = app.extensions.setdefault("http_clients", {})
+    client = clients.get("covers")
+    if client is None:
+        config = app.config
+        client = HttpClient(
+            pool_size=config["COVER_POOL_SIZE"],
+            max_retries=2,
+            timeout=(config["COVER_TIMEOUT"], config["COVER_TIMEOUT"]),
+        )
+        client = clients.setdefault("covers", client)
+    return client
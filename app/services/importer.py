@@ -0,0 +1,414 @@
+# app / services / importer.py
+"""
+Streams books and authors from CSV or JSON Lines files into the library in
+batched Core inserts, for catalogs far larger than the seed data.
+
+Features:
+- Reads CSV (header row) or JSONL input row by row, never holding the file in memory
+- Resolves authors through an in-memory name → id map loaded once up front
+- Inserts books with batched `executemany` statements and commits per batch
+- Validates each row and reports rejected rows with line number and reason,
+  including rows that are not valid UTF-8 or not well-formed CSV
+- Reports throughput (rows per second) for the whole import
+- Keeps the full-text index, the similar-books index and the author directory
+  version in sync
+- `flask import-books` CLI command (the upload endpoint lives in books.py)
+
+Accepted columns / keys:
+- title (required), author (required), publication_year (required)
+- isbn, short_description (or description), rating (0–10), progress (0–100),
+  is_read, author_birth_date, author_date_of_death (YYYY-MM-DD)
+
+Dependencies:
+- csv, json, io: for streaming input parsing
+- click, flask.cli: for the CLI command
+- sqlalchemy: for Core inserts and transactions
+- app.models: Book and Author tables
+- app.utils: parse_date, bump_counter
+- app.search, app.similar: index_books_after
+- app.conditional: bump_library_version (one library change per batch)
+
+Raises:
+- ValueError: if the input format is unknown
+- SQLAlchemyError: if a batch cannot be written (the batch is rolled back and
+  its rows are reported as rejected)
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import csv
+import io
+import json
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, IO, Iterator, List, Tuple
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models import Author, Book
+from app.utils import parse_date, bump_counter
+from app.search import index_books_after
+from app.similar import index_books_after as index_similar_books_after
+from app.author_directory import VERSION_KEY, invalidate_author_directory
+from app.conditional import bump_library_version
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+
+# Maximum number of rejected rows listed individually in the report
+MAX_REPORTED_ERRORS = 100
+
+_TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+
+# Input is decoded with errors="surrogateescape": bytes that are not valid UTF-8
+# become lone surrogates, so the row can be rejected instead of the whole import
+DECODE_ERRORS = "surrogateescape"
+_UNDECODED = re.compile(r"[\udc80-\udcff]")
+
+
+def detect_format(filename: str | None, explicit: str | None = None) -> str:
+    """
+    Determine the input format from an explicit value or the file extension.
+
+    :param filename: Name of the uploaded or local file (optional).
+    :param explicit: Format requested by the caller ('csv' or 'jsonl'), optional.
+    :return: 'csv' or 'jsonl'.
+    :raises ValueError: if the format is unknown.
+    """
+    fmt = (explicit or "").lower()
+    if not fmt and filename:
+        ext = filename.rsplit(".", 1)[-1].lower()
+        fmt = {"ndjson": "jsonl", "json": "jsonl"}.get(ext, ext)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported import format '{fmt or filename}'. Use csv or jsonl.")
+    return fmt
+
+
+def _undecodable(record: Dict[str, Any]) -> bool:
+    """
+    :param record: Parsed row.
+    :return: True if a key or value contains bytes that were not valid UTF-8.
+    """
+    for key, value in record.items():
+        for text in [key, *(value if isinstance(value, list) else [value])]:
+            if isinstance(text, str) and _UNDECODED.search(text):
+                return True
+    return False
+
+
+def iter_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Dict[str, Any] | None, str | None]]:
+    """
+    Yield parsed input rows one at a time.
+
+    :param stream: Text stream positioned at the start of the data (decoded
+        with DECODE_ERRORS, so invalid UTF-8 is reported per row).
+    :param fmt: 'csv' or 'jsonl'.
+    :return: Iterator of (line number, record or None, parse error or None).
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                # The failing line has not been counted yet
+                yield reader.line_num + 1, None, f"malformed CSV: {e}"
+                continue
+            if _undecodable(record):
+                yield reader.line_num, None, "not valid UTF-8 text"
+                continue
+            yield reader.line_num, record, None
+
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        if _UNDECODED.search(line):
+            yield line_no, None, "not valid UTF-8 text"
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def _text(record: Dict[str, Any], *keys: str) -> str:
+    """
+    Return the first non-empty value among the given keys, stripped.
+
+    :param record: Input row.
+    :param keys: Candidate keys in priority order.
+    :return: Stripped string value or an empty string.
+    """
+    for key in keys:
+        value = record.get(key)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return ""
+
+
+def _bounded_int(value: str, low: int, high: int, field: str) -> int:
+    """
+    Parse an integer and check that it lies within [low, high].
+
+    :param value: String value to parse.
+    :param low: Minimum allowed value.
+    :param high: Maximum allowed value.
+    :param field: Field name for error messages.
+    :return: Parsed integer.
+    :raises ValueError: if the value is not an integer or out of range.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{field} must be an integer")
+    if not low <= number <= high:
+        raise ValueError(f"{field} must be between {low} and {high}")
+    return number
+
+
+def validate_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate and normalize one input row.
+
+    :param record: Raw input row.
+    :return: Normalized row with book fields plus author name and dates.
+    :raises ValueError: if a required field is missing or a value is invalid.
+    """
+    title = _text(record, "title")
+    author = _text(record, "author", "author_name")
+    year_str = _text(record, "publication_year", "year")
+    if not title or not author or not year_str:
+        raise ValueError("title, author and publication_year are required")
+
+    rating_str = _text(record, "rating")
+    progress_str = _text(record, "progress")
+
+    return {
+        "title": title,
+        "author": author,
+        "publication_year": _bounded_int(
+            year_str, 0, datetime.now().year, "publication_year"
+        ),
+        "isbn": _text(record, "isbn"),
+        "short_description": _text(record, "short_description", "description"),
+        "rating": _bounded_int(rating_str, 0, 10, "rating") if rating_str else None,
+        "progress": _bounded_int(progress_str, 0, 100, "progress") if progress_str else 0,
+        "is_read": _text(record, "is_read").lower() in _TRUE_VALUES,
+        "birth_date": parse_date(_text(record, "author_birth_date", "birth_date")),
+        "date_of_death": parse_date(
+            _text(record, "author_date_of_death", "date_of_death")
+        ),
+    }
+
+
+class BookImporter:
+    """
+    Batched importer that writes validated rows through Core `executemany`.
+
+    :param engine: Application engine.
+    :param batch_size: Number of rows per insert batch and transaction.
+    """
+
+    def __init__(self, engine: Engine, batch_size: int = 1000) -> None:
+        self.engine = engine
+        self.batch_size = max(1, batch_size)
+        self.author_ids: Dict[str, int] = {}
+        self.imported = 0
+        self.rejected = 0
+        self.authors_created = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def _reject(self, line: int, reason: str) -> None:
+        """
+        Count a rejected row and keep its reason for the report.
+
+        :param line: Input line number.
+        :param reason: Human-readable rejection reason.
+        """
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": reason})
+
+    def _load_author_map(self) -> None:
+        """Load the name → id map for all existing authors in one query."""
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(Author.__table__.c.id, Author.__table__.c.name))
+            self.author_ids = {name: author_id for author_id, name in rows}
+
+    def _resolve_author(self, conn: Connection, row: Dict[str, Any], created: List[str]) -> int:
+        """
+        Look up an author id by name, inserting the author if it is new.
+
+        :param conn: Connection inside the current batch transaction.
+        :param row: Validated row.
+        :param created: Names of authors created in this batch (appended to).
+        :return: Author id.
+        """
+        author_id = self.author_ids.get(row["author"])
+        if author_id is None:
+            result = conn.execute(
+                insert(Author.__table__).values(
+                    name=row["author"],
+                    birth_date=row["birth_date"],
+                    date_of_death=row["date_of_death"],
+                )
+            )
+            author_id = result.inserted_primary_key[0]
+            self.author_ids[row["author"]] = author_id
+            created.append(row["author"])
+        return author_id
+
+    def _flush(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """
+        Write one batch of rows in a single transaction.
+
+        On failure the transaction is rolled back, authors created for the batch
+        are forgotten, and every row of the batch is reported as rejected.
+
+        :param batch: List of (line number, validated row).
+        """
+        if not batch:
+            return
+        created: List[str] = []
+        try:
+            with self.engine.begin() as conn:
+                last_id = conn.execute(select(func.max(Book.__table__.c.id))).scalar() or 0
+                books = [
+                    {
+                        "title": row["title"],
+                        "short_description": row["short_description"],
+                        "publication_year": row["publication_year"],
+                        "isbn": row["isbn"],
+                        "author_id": self._resolve_author(conn, row, created),
+                        "rating": row["rating"],
+                        "is_read": row["is_read"],
+                        "progress": row["progress"],
+                    }
+                    for _, row in batch
+                ]
+                conn.execute(insert(Book.__table__), books)
+                index_books_after(conn, last_id)
+                index_similar_books_after(conn, last_id)
+                bump_library_version(conn)
+                if created:
+                    bump_counter(conn, VERSION_KEY)
+        except SQLAlchemyError as e:
+            logger.exception("Import batch failed")
+            for name in created:
+                self.author_ids.pop(name, None)
+            for line, _ in batch:
+                self._reject(line, f"database error: {e.__class__.__name__}")
+            return
+
+        self.imported += len(batch)
+        self.authors_created += len(created)
+
+    def run(self, stream: IO[str], fmt: str) -> Dict[str, Any]:
+        """
+        Import all rows from a text stream.
+
+        :param stream: Text stream with CSV or JSONL data.
+        :param fmt: 'csv' or 'jsonl'.
+        :return: Report with counts, rejected rows, duration and throughput.
+        """
+        started = time.perf_counter()
+        self._load_author_map()
+
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        line = 0
+        try:
+            for line, record, parse_error in iter_records(stream, fmt):
+                if parse_error:
+                    self._reject(line, parse_error)
+                    continue
+                try:
+                    batch.append((line, validate_record(record)))
+                except ValueError as e:
+                    self._reject(line, str(e))
+                    continue
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+        except UnicodeDecodeError:
+            # Only for text streams opened with strict decoding by the caller:
+            # the rest of the input cannot be read
+            self._reject(line + 1, "not valid UTF-8 text; import stopped here")
+        self._flush(batch)
+
+        if self.authors_created:
+            invalidate_author_directory()
+
+        elapsed = time.perf_counter() - started
+        processed = self.imported + self.rejected
+        report = {
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "authors_created": self.authors_created,
+            "errors": self.errors,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(processed / elapsed, 1) if elapsed else None,
+        }
+        logger.info(
+            "Imported %s books (%s rejected, %s new authors) in %.2fs (%s rows/s)",
+            self.imported,
+            self.rejected,
+            self.authors_created,
+            elapsed,
+            report["rows_per_second"],
+        )
+        return report
+
+
+def import_books(stream: IO, fmt: str, engine: Engine, batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Import books from a CSV or JSONL stream.
+
+    :param stream: Text or binary stream (binary input is decoded as UTF-8,
+        rows with invalid bytes are rejected).
+    :param fmt: 'csv' or 'jsonl'.
+    :param engine: Application engine.
+    :param batch_size: Rows per insert batch and commit.
+    :return: Import report (see BookImporter.run).
+    """
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", errors=DECODE_ERRORS, newline="")
+    return BookImporter(engine, batch_size).run(stream, fmt)
+
+
+@click.command("import-books")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), help="Input format (default: from extension).")
+@click.option("--batch-size", type=int, default=None, help="Rows per insert batch and commit.")
+@with_appcontext
+def import_books_command(path: str, fmt: str | None, batch_size: int | None) -> None:
+    """Stream books and authors from a CSV or JSONL file into the library."""
+    from app.models import db
+
+    fmt = detect_format(path, fmt)
+    batch_size = batch_size or current_app.config["IMPORT_BATCH_SIZE"]
+    with open(path, encoding="utf-8-sig", errors=DECODE_ERRORS, newline="") as stream:
+        report = import_books(stream, fmt, db.engine, batch_size)
+
+    click.echo(
+        f"Imported {report['imported']} books, rejected {report['rejected']}, "
+        f"created {report['authors_created']} authors in {report['seconds']}s "
+        f"({report['rows_per_second']} rows/s)."
+    )
+    for error in report["errors"]:
+        click.echo(f"  line {error['line']}: {error['error']}", err=True)
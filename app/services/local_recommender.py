@@ -0,0 +1,327 @@
+# app / services / local_recommender.py
+"""
+Offline, content-based recommendation engine: suggests unread or unrated books
+from the library that are most similar to the user's top-rated books.
+
+Model:
+Every book is a sparse TF-IDF vector over its title, author name and short
+description (sublinear term frequency, smoothed IDF, L2-normalized). Title and
+author terms are weighted higher than description terms, and the author also
+contributes one whole-name feature so books by the same author are close. The
+user profile is the rating-weighted sum of the vectors of the books rated
+SEED_MIN_RATING or higher. Candidates are scored by cosine similarity through
+an inverted index, so only books sharing at least one term with the profile
+are touched.
+
+The vectors only depend on text, so the model is built once per process and
+rebuilt when the number of books or the highest book id changes, or after
+LOCAL_RECOMMENDER_MAX_AGE seconds (to pick up edited descriptions). Only the
+first build runs in the request; later rebuilds run on a background thread
+while requests keep using the previous model, which is at most a few writes
+behind. Ratings and read status are always read fresh.
+
+Features:
+- Pure-Python sparse vectors and inverted index (no NumPy/SciPy dependency)
+- Millisecond scoring once the model is built
+- Same JSON shape as the AI service: {"recommendations": [...]}, plus the
+  `book_id` and `score` of each suggested library book
+
+Dependencies:
+- math, threading, time: for weighting, background rebuilds and model age
+- flask.current_app: for configuration and per-app model storage
+- sqlalchemy: for loading book texts and candidate details
+- app.models, app.normalize: library tables, tokenization and stopwords
+- app.services.prompt_builder: favourite-book rating threshold
+
+Raises:
+- SQLAlchemyError: if the library cannot be loaded
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models import db, Book, Author
+from app.normalize import STOPWORDS, tokenize
+from app.services.prompt_builder import SEED_MIN_RATING
+
+logger = logging.getLogger(__name__)
+
+# Number of recommendations returned (the AI service also returns 3)
+RESULT_COUNT = 3
+
+# Field weights applied to term frequencies
+FIELD_WEIGHTS = {"title": 2.0, "author": 2.0, "description": 1.0}
+
+Vector = Dict[str, float]
+
+
+def _terms(title: str | None, author: str | None, description: str | None) -> Counter:
+    """
+    Collect weighted term counts for one book.
+
+    :param title: Book title.
+    :param author: Author name.
+    :param description: Short description.
+    :return: Counter of term -> weighted frequency.
+    """
+    counts: Counter = Counter()
+    for field, text in (("title", title), ("author", author), ("description", description)):
+        for token in tokenize(text):
+            if token not in STOPWORDS and len(token) > 1:
+                counts[token] += FIELD_WEIGHTS[field]
+    if author:
+        counts["author:" + " ".join(tokenize(author))] += FIELD_WEIGHTS["author"]
+    return counts
+
+
+class TfidfModel:
+    """
+    Sparse TF-IDF vectors of all books with an inverted index.
+
+    :param rows: Iterable of (book id, title, author name, description).
+    """
+
+    def __init__(self, rows) -> None:
+        term_counts: Dict[int, Counter] = {}
+        document_frequency: Counter = Counter()
+        for book_id, title, author, description in rows:
+            counts = _terms(title, author, description)
+            term_counts[book_id] = counts
+            document_frequency.update(counts.keys())
+
+        n = len(term_counts)
+        self.idf = {
+            term: math.log((1 + n) / (1 + df)) + 1.0
+            for term, df in document_frequency.items()
+        }
+        self.vectors: Dict[int, Vector] = {}
+        self.postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for book_id, counts in term_counts.items():
+            # Weighted term frequencies are always >= 1, so log damping is safe
+            vector = {
+                term: (1.0 + math.log(tf)) * self.idf[term] for term, tf in counts.items()
+            }
+            norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+            vector = {term: w / norm for term, w in vector.items()}
+            self.vectors[book_id] = vector
+            for term, weight in vector.items():
+                self.postings[term].append((book_id, weight))
+
+    def profile(self, seeds: List[Tuple[int, int]]) -> Vector:
+        """
+        Build the normalized user profile from rated seed books.
+
+        :param seeds: List of (book id, rating).
+        :return: Sparse profile vector.
+        """
+        profile: Vector = defaultdict(float)
+        for book_id, rating in seeds:
+            # 8 -> 1, 9 -> 2, 10 -> 3: higher ratings pull harder
+            weight = rating - SEED_MIN_RATING + 1
+            for term, w in self.vectors.get(book_id, {}).items():
+                profile[term] += weight * w
+        norm = math.sqrt(sum(w * w for w in profile.values())) or 1.0
+        return {term: w / norm for term, w in profile.items()}
+
+    def score(self, profile: Vector, exclude: set) -> List[Tuple[float, int]]:
+        """
+        Score every book sharing a term with the profile by cosine similarity.
+
+        :param profile: Profile from `profile()`.
+        :param exclude: Book ids to skip (the seeds).
+        :return: (score, book id) pairs, best first.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term, pw in profile.items():
+            for book_id, w in self.postings.get(term, ()):
+                scores[book_id] += pw * w
+        ranked = [(s, book_id) for book_id, s in scores.items() if book_id not in exclude]
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return ranked
+
+
+class _ModelCache:
+    """Per-app model state guarded by `lock`; `first_build` serializes the first build."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.first_build = threading.Lock()
+        self.model: TfidfModel | None = None
+        self.signature: Tuple[int, int] | None = None
+        self.built_at = 0.0
+        self.rebuild: threading.Thread | None = None
+
+
+def _library_signature() -> Tuple[int, int]:
+    """
+    Return a cheap fingerprint of the book set.
+
+    :return: Tuple of (number of books, highest book id).
+    """
+    count, max_id = db.session.query(func.count(Book.id), func.max(Book.id)).one()
+    return count, max_id or 0
+
+
+def _build(cache: _ModelCache) -> None:
+    """
+    Build a model from the current library and install it in the cache.
+
+    :param cache: Model cache of the app.
+    :raises SQLAlchemyError: if the library cannot be loaded.
+    """
+    started = time.perf_counter()
+    signature = _library_signature()
+    rows = (
+        db.session.query(Book.id, Book.title, Author.name, Book.short_description)
+        .outerjoin(Author, Book.author_id == Author.id)
+        .yield_per(1000)
+    )
+    model = TfidfModel(rows)
+    with cache.lock:
+        cache.model = model
+        cache.signature = signature
+        cache.built_at = time.monotonic()
+    logger.info(
+        "Built local recommendation model for %s books in %.1f ms",
+        signature[0],
+        (time.perf_counter() - started) * 1000,
+    )
+
+
+def _rebuild_in_background(app, cache: _ModelCache) -> None:
+    """
+    Rebuild the model on a background thread (runs on that thread).
+
+    :param app: Flask application.
+    :param cache: Model cache of the app.
+    """
+    with app.app_context():
+        try:
+            _build(cache)
+        except SQLAlchemyError:
+            # The old model stays in use; the next request tries again
+            logger.exception("Could not rebuild local recommendation model")
+        finally:
+            db.session.remove()
+            with cache.lock:
+                cache.rebuild = None
+
+
+def get_model() -> TfidfModel:
+    """
+    Return the app's TF-IDF model, rebuilding it if the library changed.
+
+    Only the first model is built in the calling request. An outdated model is
+    returned as is while its replacement is built in the background.
+
+    :return: Current TfidfModel.
+    :raises SQLAlchemyError: if the first model cannot be built.
+    """
+    app = current_app._get_current_object()
+    cache = app.extensions.setdefault("local_recommender", _ModelCache())
+    signature = _library_signature()
+    max_age = app.config["LOCAL_RECOMMENDER_MAX_AGE"]
+
+    with cache.lock:
+        model = cache.model
+        outdated = model is not None and (
+            cache.signature != signature or time.monotonic() - cache.built_at > max_age
+        )
+        if outdated and cache.rebuild is None:
+            cache.rebuild = threading.Thread(
+                target=_rebuild_in_background,
+                args=(app, cache),
+                name="local-recommender-rebuild",
+                daemon=True,
+            )
+            cache.rebuild.start()
+    if model is not None:
+        return model
+
+    # First use: concurrent requests wait for one build
+    with cache.first_build:
+        if cache.model is None:
+            _build(cache)
+    return cache.model
+
+
+def _serialize(book: Book, author: Author | None, score: float) -> Dict[str, Any]:
+    """
+    Convert a library book to the recommendation dict used by recommend.html.
+
+    :param book: Suggested book.
+    :param author: Its author (may be None).
+    :param score: Cosine similarity to the profile.
+    :return: Recommendation dict.
+    """
+
+    def iso(value) -> str:
+        return value.strftime("%Y-%m-%d") if value else ""
+
+    return {
+        "title": book.title,
+        "author": author.name if author else "",
+        "author_birth_date": iso(author.birth_date) if author else "",
+        "author_date_of_death": iso(author.date_of_death) if author else "",
+        "description": book.short_description or "",
+        "isbn": book.isbn or "",
+        "publication_year": book.publication_year,
+        "book_id": book.id,
+        "score": round(score, 4),
+    }
+
+
+def recommend(count: int = RESULT_COUNT) -> Dict[str, Any]:
+    """
+    Recommend unread or unrated library books similar to the top-rated ones.
+
+    :param count: Number of recommendations.
+    :return: {"recommendations": [...]} (empty list if nothing is rated highly).
+    :raises SQLAlchemyError: if the library cannot be loaded.
+    """
+    started = time.perf_counter()
+    model = get_model()
+    seeds = (
+        db.session.query(Book.id, Book.rating)
+        .filter(Book.rating >= SEED_MIN_RATING)
+        .all()
+    )
+    if not seeds:
+        return {"recommendations": []}
+
+    ranked = model.score(model.profile(seeds), exclude={book_id for book_id, _ in seeds})
+
+    # Walk the ranking in small windows until enough eligible books are found
+    picks: List[Dict[str, Any]] = []
+    window = max(count * 10, 30)
+    for start in range(0, len(ranked), window):
+        chunk = ranked[start:start + window]
+        scores = {book_id: s for s, book_id in chunk}
+        rows = (
+            db.session.query(Book, Author)
+            .outerjoin(Author, Book.author_id == Author.id)
+            .filter(Book.id.in_(scores))
+            .filter((Book.rating.is_(None)) | (Book.is_read.is_(False)))
+            .all()
+        )
+        rows.sort(key=lambda row: (-scores[row[0].id], row[0].id))
+        picks += [_serialize(book, author, scores[book.id]) for book, author in rows]
+        if len(picks) >= count:
+            break
+
+    logger.debug(
+        "Local recommendations computed in %.1f ms",
+        (time.perf_counter() - started) * 1000,
+    )
+    return {"recommendations": picks[:count]}
@@ -0,0 +1,216 @@
+# app / services / prompt_builder.py
+"""
+Token-budgeted construction of the AI recommendation prompt.
+
+The prompt used to embed every title in the library as an exclusion list, so
+its size, latency and cost grew with the library until it no longer fit the
+model context. It is now built within a fixed token budget:
+
+- Seed books: the highest-rated books (at most RECOMMENDATION_SEED_BOOKS),
+  dropped from the lowest rating up if they alone exceed the budget.
+- Exclusion sample: the books the model is most likely to suggest, i.e. other
+  books by the seed authors and then the best-rated remaining books, added
+  until the budget is used up.
+
+The sample only steers the model. Complete exclusion is enforced after the
+response arrives by `recommender.filter_existing()`, which checks every
+suggestion against the indexed normalized titles of the whole library.
+
+Features:
+- Bounded queries only (no full-table loads)
+- Deterministic output for identical library state (stable cache keys)
+- Approximate token counting without a tokenizer dependency
+
+Dependencies:
+- flask.current_app: for the budget configuration
+- sqlalchemy: for the bounded seed and exclusion queries
+- app.models: Book, Author
+- app.services.ai_services.prepare_books_data: seed book serialization
+
+Raises:
+- SQLAlchemyError: if the seed or exclusion queries fail
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import json
+import logging
+import math
+from typing import Any, Dict, List
+
+from flask import current_app
+from sqlalchemy import desc
+from sqlalchemy.orm import joinedload
+
+from app.models import db, Book, Author
+
+logger = logging.getLogger(__name__)
+
+# Minimum rating for a book to seed recommendations
+SEED_MIN_RATING = 8
+
+# Rough characters-per-token ratio for English text and JSON
+CHARS_PER_TOKEN = 4
+
+PROMPT_TEMPLATE = """
+        Based on these top-rated books, recommend exactly 3 similar titles.
+        Do not recommend the top-rated books themselves or any of these books
+        already in the library: {exclusions}
+
+        Return your answer as valid JSON with one top-level key:
+
+        {{
+          "recommendations": [
+            {{
+              "title": "<string>",
+              "author": "<string>",
+              "author_birth_date": "YYYY-MM-DD",
+              "author_date_of_death": "YYYY-MM-DD",
+              "description": "<string, max 2 short sentences>",
+              "isbn": "<string>",
+              "publication_year": <integer>
+            }},
+            {{ ... }},
+            {{ ... }}
+          ]
+        }}
+
+        Top-rated books to base your recommendations on:
+        {seeds}
+
+        Make sure:
+        - The outer object has exactly one field: "recommendations".
+        - There are exactly 3 items in the array.
+        - Dates use ISO format (YYYY-MM-DD) or an empty string.
+        - Descriptions are brief (max. 2 sentences).
+        - Try to vary in your book selection to get different recommendations.
+        """
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the number of model tokens in a text.
+
+    :param text: Prompt text.
+    :return: Estimated token count.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def load_seed_books(limit: int) -> List[Book]:
+    """
+    Load the highest-rated books with their authors.
+
+    :param limit: Maximum number of books.
+    :return: Books rated SEED_MIN_RATING or higher, best first.
+    :raises SQLAlchemyError: if the query fails.
+    """
+    return (
+        Book.query.options(joinedload(Book.author))
+        .filter(Book.rating >= SEED_MIN_RATING)
+        .order_by(desc(Book.rating), Book.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def select_exclusions(seed_books: List[Book], limit: int) -> List[str]:
+    """
+    Pick the library books the model is most likely to recommend.
+
+    Other books by the seed authors come first, then the best-rated remaining
+    books. Seed books are left out because the prompt already lists them.
+
+    :param seed_books: Books the recommendations are based on.
+    :param limit: Maximum number of entries.
+    :return: Entries formatted as "Title by Author" (or just the title).
+    :raises SQLAlchemyError: if the queries fail.
+    """
+    seed_ids = [b.id for b in seed_books]
+    author_ids = sorted({b.author_id for b in seed_books if b.author_id is not None})
+
+    base = (
+        db.session.query(Book.id, Book.title, Author.name)
+        .outerjoin(Author, Book.author_id == Author.id)
+        .filter(Book.id.notin_(seed_ids))
+    )
+    rows = []
+    if author_ids:
+        rows = (
+            base.filter(Book.author_id.in_(author_ids))
+            .order_by(desc(Book.rating), Book.id)
+            .limit(limit)
+            .all()
+        )
+    if len(rows) < limit:
+        seen = seed_ids + [row.id for row in rows]
+        rows += (
+            base.filter(Book.id.notin_(seen))
+            .order_by(desc(Book.rating), Book.id)
+            .limit(limit - len(rows))
+            .all()
+        )
+    return [f"{row.title} by {row.name}" if row.name else row.title for row in rows]
+
+
+def build_prompt(seed_data: List[Dict[str, Any]], exclusions: List[str], budget: int) -> str:
+    """
+    Render the prompt, fitting as many seeds and exclusions as the budget allows.
+
+    :param seed_data: Serialized seed books, best first.
+    :param exclusions: Exclusion entries, most relevant first.
+    :param budget: Maximum estimated prompt tokens.
+    :return: Prompt text.
+    """
+
+    def render(seeds: List[Dict[str, Any]], excluded: List[str]) -> str:
+        return PROMPT_TEMPLATE.format(
+            seeds=json.dumps(seeds, separators=(",", ":"), ensure_ascii=False),
+            exclusions=json.dumps(excluded, ensure_ascii=False),
+        )
+
+    seeds = list(seed_data)
+    while len(seeds) > 1 and estimate_tokens(render(seeds, [])) > budget:
+        seeds.pop()
+
+    used = estimate_tokens(render(seeds, []))
+    excluded: List[str] = []
+    for entry in exclusions:
+        # +1 token for the separator and quotes around each entry
+        cost = estimate_tokens(json.dumps(entry, ensure_ascii=False)) + 1
+        if used + cost > budget:
+            break
+        excluded.append(entry)
+        used += cost
+
+    if len(seeds) < len(seed_data) or len(excluded) < len(exclusions):
+        logger.debug(
+            "Prompt budget %s tokens: %s/%s seeds, %s/%s exclusions",
+            budget,
+            len(seeds),
+            len(seed_data),
+            len(excluded),
+            len(exclusions),
+        )
+    return render(seeds, excluded)
+
+
+def build_recommendation_prompt(seed_books: List[Book]) -> str:
+    """
+    Build the AI prompt for a set of seed books within the configured budget.
+
+    :param seed_books: Books from `load_seed_books()`.
+    :return: Prompt text.
+    :raises SQLAlchemyError: if the exclusion query fails.
+    """
+    # Imported here so loading the recommend blueprint does not load the AI client
+    from app.services.ai_services import prepare_books_data
+
+    config = current_app.config
+    exclusions = select_exclusions(seed_books, config["RECOMMENDATION_EXCLUSION_SAMPLE"])
+    return build_prompt(
+        prepare_books_data(seed_books),
+        exclusions,
+        config["RECOMMENDATION_PROMPT_TOKEN_BUDGET"],
+    )
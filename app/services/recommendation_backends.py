@@ -0,0 +1,156 @@
+# app / services / recommendation_backends.py
+"""
+Pluggable recommendation backends. The recommendation pipeline asks the
+configured backend for a response in the AI JSON shape
+({"recommendations": [...]}) and no longer depends on OpenAI directly.
+
+Backends:
+- openai: the AI chat completions service (`fetch_ai_recommendation`); its
+  responses are cached and filtered against the library
+- local:  the offline TF-IDF engine (`local_recommender`), which suggests
+  unread or unrated books from the library itself; it is fast and always
+  reflects the current library, so it is not cached
+
+`RECOMMENDATION_BACKEND` selects the backend: 'openai', 'local', or 'auto'
+(OpenAI if an API key is configured, otherwise local). Further backends can be
+added with `register_backend()`.
+
+Features:
+- Small backend interface (name, cache identity, cacheable, from_library,
+  recommend, stream)
+- Registry with automatic fallback to the local engine without an API key
+
+Dependencies:
+- os, flask.current_app: for backend selection
+- app.services.ai_services, app.services.local_recommender: implementations
+
+Raises:
+- ValueError: if RECOMMENDATION_BACKEND names an unknown backend
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterator
+
+from flask import current_app
+
+from app.services import local_recommender
+from app.services.ai_services import (
+    AI_MODEL,
+    fetch_ai_recommendation,
+    stream_ai_recommendations,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationBackend:
+    """
+    Base class for recommendation backends.
+
+    :attr name: Registry name used in RECOMMENDATION_BACKEND.
+    :attr cacheable: Whether responses go through the persistent response cache.
+    :attr from_library: Whether suggestions are books already in the library
+        (and must therefore not be filtered out as duplicates).
+    """
+
+    name = ""
+    cacheable = False
+    from_library = False
+
+    @property
+    def cache_id(self) -> str:
+        """Identity of the backend in response cache keys."""
+        return self.name
+
+    def recommend(self, prompt: str) -> Dict[str, Any]:
+        """
+        Produce recommendations.
+
+        :param prompt: AI prompt built from the top-rated books.
+        :return: Response in the shape {"recommendations": [...]}.
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt: str) -> Iterator[Dict[str, Any]]:
+        """
+        Produce recommendations one at a time as they become available.
+
+        The default waits for the complete response; backends with a streaming
+        upstream override it.
+
+        :param prompt: AI prompt built from the top-rated books.
+        :return: Iterator of recommendation dicts.
+        """
+        response = self.recommend(prompt)
+        if isinstance(response, dict):
+            response = response.get("recommendations", [])
+        yield from response
+
+
+class OpenAIBackend(RecommendationBackend):
+    """Recommendations from the OpenAI chat completions API."""
+
+    name = "openai"
+    cacheable = True
+
+    @property
+    def cache_id(self) -> str:
+        # The model name alone keeps keys compatible with earlier cache entries
+        return AI_MODEL
+
+    def recommend(self, prompt: str) -> Dict[str, Any]:
+        return fetch_ai_recommendation(prompt)
+
+    def stream(self, prompt: str) -> Iterator[Dict[str, Any]]:
+        return stream_ai_recommendations(prompt)
+
+
+class LocalBackend(RecommendationBackend):
+    """Offline content-based recommendations from the library (TF-IDF)."""
+
+    name = "local"
+    from_library = True
+
+    def recommend(self, prompt: str) -> Dict[str, Any]:
+        # The local engine reads the ratings directly; the prompt is not needed
+        return local_recommender.recommend()
+
+
+BACKENDS: Dict[str, RecommendationBackend] = {}
+
+
+def register_backend(backend: RecommendationBackend) -> None:
+    """
+    Make a backend selectable through RECOMMENDATION_BACKEND.
+
+    :param backend: Backend instance with a unique name.
+    """
+    BACKENDS[backend.name] = backend
+
+
+register_backend(OpenAIBackend())
+register_backend(LocalBackend())
+
+
+def get_backend() -> RecommendationBackend:
+    """
+    Return the configured recommendation backend.
+
+    :return: Backend instance.
+    :raises ValueError: if the configured backend is unknown.
+    """
+    name = current_app.config["RECOMMENDATION_BACKEND"]
+    if name == "auto":
+        has_key = current_app.config.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
+        name = "openai" if has_key else "local"
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown recommendation backend '{name}'. "
+            f"Choose one of: auto, {', '.join(sorted(BACKENDS))}."
+        )
@@ -0,0 +1,121 @@
+# app / services / recommendation_cache.py
+"""
+Persistent cache for AI recommendation responses, stored in the application
+database.
+
+The input to the AI service is fully determined by the prompt, which is built
+from the `prepare_books_data()` payload of the top-rated books and the library
+contents. Identical inputs therefore reuse the stored response instead of paying
+for another 5–30 s upstream call.
+
+Features:
+- Stable cache keys: SHA-256 over the canonical JSON of the prompt inputs
+- Time-to-live expiry (`RECOMMENDATION_CACHE_TTL` seconds)
+- LRU eviction once more than `RECOMMENDATION_CACHE_MAX_ENTRIES` entries exist
+- Hit counters and timestamps for each entry
+
+Dependencies:
+- hashlib, json, time: for keys, serialization and timestamps
+- flask.current_app: for configuration
+- sqlalchemy: for SQL access to the `recommendation_cache` table (migration 3)
+
+Raises:
+- SQLAlchemyError: if the cache table cannot be read or written (callers treat
+  the cache as optional and fall back to the AI service)
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Tuple
+
+from flask import current_app
+from sqlalchemy import text
+
+from app.models import db
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(*parts: Any) -> str:
+    """
+    Build a cache key from JSON-serializable prompt inputs.
+
+    :param parts: Values that fully determine the AI request (payload, model, ...).
+    :return: Hex SHA-256 digest of their canonical JSON encoding.
+    """
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get_cached(key: str) -> Tuple[Any, float] | None:
+    """
+    Look up a cached response and mark it as recently used.
+
+    Expired entries are deleted and reported as a miss.
+
+    :param key: Cache key from `cache_key()`.
+    :return: Tuple of (response, created_at timestamp) or None on a miss.
+    :raises SQLAlchemyError: if the cache table cannot be accessed.
+    """
+    ttl = current_app.config["RECOMMENDATION_CACHE_TTL"]
+    now = time.time()
+
+    with db.engine.begin() as conn:
+        row = conn.execute(
+            text("SELECT response, created_at FROM recommendation_cache WHERE key = :key"),
+            {"key": key},
+        ).first()
+        if row is None:
+            return None
+        if now - row.created_at > ttl:
+            conn.execute(
+                text("DELETE FROM recommendation_cache WHERE key = :key"), {"key": key}
+            )
+            return None
+        conn.execute(
+            text(
+                "UPDATE recommendation_cache SET last_used_at = :now, hits = hits + 1 "
+                "WHERE key = :key"
+            ),
+            {"now": now, "key": key},
+        )
+    return json.loads(row.response), row.created_at
+
+
+def store(key: str, response: Any) -> None:
+    """
+    Store a response and evict the least recently used entries over the limit.
+
+    :param key: Cache key from `cache_key()`.
+    :param response: JSON-serializable AI response.
+    :raises SQLAlchemyError: if the cache table cannot be written.
+    """
+    max_entries = current_app.config["RECOMMENDATION_CACHE_MAX_ENTRIES"]
+    now = time.time()
+
+    with db.engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO recommendation_cache (key, response, created_at, last_used_at, hits) "
+                "VALUES (:key, :response, :now, :now, 0) "
+                "ON CONFLICT (key) DO UPDATE SET response = excluded.response, "
+                "created_at = excluded.created_at, last_used_at = excluded.last_used_at"
+            ),
+            {"key": key, "response": json.dumps(response), "now": now},
+        )
+        count = conn.execute(text("SELECT COUNT(*) FROM recommendation_cache")).scalar()
+        if count > max_entries:
+            conn.execute(
+                text(
+                    "DELETE FROM recommendation_cache WHERE key IN ("
+                    "SELECT key FROM recommendation_cache "
+                    "ORDER BY last_used_at ASC LIMIT :excess)"
+                ),
+                {"excess": count - max_entries},
+            )
+
@@ -0,0 +1,369 @@
+# app / services / recommendation_jobs.py
+"""
+Background job subsystem for AI recommendations. A recommendation request is
+stored as a job and executed on a thread pool, so the web request returns
+immediately instead of pinning a WSGI worker for up to 30 seconds.
+
+Job lifecycle:
+- queued:  created by `enqueue_job()` and submitted to the worker pool
+- running: claimed atomically by exactly one worker (across processes); the
+           worker refreshes `updated_at` every RECOMMENDATION_JOB_HEARTBEAT
+           seconds, and with AI_STREAMING, the recommendations received so far
+           are stored as a partial result while the job runs
+- done:    result JSON stored (recommendations, user books, cache info)
+- failed:  error message stored
+
+Jobs and results are persisted in the `recommendation_jobs` table (migration 4),
+so results survive a process restart. `resume_pending_jobs()` re-submits queued
+jobs and running jobs that went stale (e.g. their worker process died); it runs
+once per serving process, on its first request (`init_job_resume()`), so CLI
+commands never start jobs and pre-fork servers resume them in the workers,
+where the worker pool's threads actually exist.
+
+Features:
+- Per-app ThreadPoolExecutor sized by RECOMMENDATION_WORKERS
+- Atomic job claiming with a conditional UPDATE (safe with several processes)
+- Heartbeat for running jobs, so slow AI calls (timeouts, retries, backoff)
+  are not mistaken for abandoned jobs
+- Stale-job recovery and retention-based cleanup of old jobs
+- `init_job_resume()`: resumes unfinished jobs on the first request of a process
+
+Dependencies:
+- concurrent.futures: for the worker pool
+- flask: for the application object and config
+- sqlalchemy: for persistence in the `recommendation_jobs` table
+- app.services.recommender: recommendation pipeline
+
+Raises:
+- SQLAlchemyError: if jobs cannot be stored or loaded
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from flask import Flask, current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models import db
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+
+def _executor(app: Flask) -> ThreadPoolExecutor:
+    """
+    Return the app's worker pool, creating it on first use.
+
+    :param app: Flask application.
+    :return: ThreadPoolExecutor shared by all requests of the app.
+    """
+    executor = app.extensions.get("recommendation_jobs")
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=app.config["RECOMMENDATION_WORKERS"],
+            thread_name_prefix="recommendation-job",
+        )
+        app.extensions["recommendation_jobs"] = executor
+    return executor
+
+
+def _submit(app: Flask, job_id: str) -> None:
+    """
+    Schedule a job on the app's worker pool.
+
+    :param app: Flask application.
+    :param job_id: Job identifier.
+    """
+    _executor(app).submit(_run_job, app, job_id)
+
+
+def enqueue_job(prompt: str, user_books: List[Dict[str, Any]], refresh: bool = False) -> str:
+    """
+    Persist a new recommendation job and submit it to the worker pool.
+
+    :param prompt: Fully built AI prompt.
+    :param user_books: Top-rated books ({title, rating}) shown with the result.
+    :param refresh: Bypass the response cache.
+    :return: Job identifier.
+    :raises SQLAlchemyError: if the job cannot be stored.
+    """
+    app = current_app._get_current_object()
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    retention = app.config["RECOMMENDATION_JOB_RETENTION"]
+
+    with db.engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO recommendation_jobs "
+                "(id, status, prompt, refresh, user_books, created_at, updated_at) "
+                "VALUES (:id, :status, :prompt, :refresh, :user_books, :now, :now)"
+            ),
+            {
+                "id": job_id,
+                "status": QUEUED,
+                "prompt": prompt,
+                "refresh": refresh,
+                "user_books": json.dumps(user_books),
+                "now": now,
+            },
+        )
+        # Drop finished jobs past their retention period
+        conn.execute(
+            text(
+                "DELETE FROM recommendation_jobs "
+                "WHERE status IN (:done, :failed) AND updated_at < :cutoff"
+            ),
+            {"done": DONE, "failed": FAILED, "cutoff": now - retention},
+        )
+
+    _submit(app, job_id)
+    return job_id
+
+
+def get_job(job_id: str) -> Dict[str, Any] | None:
+    """
+    Load a job with its decoded result.
+
+    :param job_id: Job identifier.
+    :return: Dict with id, status, error, result, user_books, or None if unknown.
+    :raises SQLAlchemyError: if the job cannot be loaded.
+    """
+    with db.engine.connect() as conn:
+        row = conn.execute(
+            text(
+                "SELECT id, status, user_books, result, error, created_at, updated_at "
+                "FROM recommendation_jobs WHERE id = :id"
+            ),
+            {"id": job_id},
+        ).first()
+    if row is None:
+        return None
+    return {
+        "id": row.id,
+        "status": row.status,
+        "error": row.error,
+        "user_books": json.loads(row.user_books),
+        "result": json.loads(row.result) if row.result else None,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+def _claim(job_id: str):
+    """
+    Atomically move a queued job to running.
+
+    :param job_id: Job identifier.
+    :return: The job row (prompt, refresh) if this worker claimed it, else None.
+    """
+    with db.engine.begin() as conn:
+        claimed = conn.execute(
+            text(
+                "UPDATE recommendation_jobs SET status = :running, updated_at = :now "
+                "WHERE id = :id AND status = :queued"
+            ),
+            {"running": RUNNING, "queued": QUEUED, "now": time.time(), "id": job_id},
+        ).rowcount
+        if not claimed:
+            return None
+        return conn.execute(
+            text("SELECT prompt, refresh FROM recommendation_jobs WHERE id = :id"),
+            {"id": job_id},
+        ).first()
+
+
+def _finish(job_id: str, status: str, result: Any = None, error: str | None = None) -> None:
+    """
+    Store the outcome of a job.
+
+    :param job_id: Job identifier.
+    :param status: DONE or FAILED.
+    :param result: JSON-serializable result for DONE jobs.
+    :param error: Error message for FAILED jobs.
+    """
+    with db.engine.begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE recommendation_jobs SET status = :status, result = :result, "
+                "error = :error, updated_at = :now WHERE id = :id"
+            ),
+            {
+                "status": status,
+                "result": json.dumps(result) if result is not None else None,
+                "error": error,
+                "now": time.time(),
+                "id": job_id,
+            },
+        )
+
+
+def _store_partial(job_id: str, recommendations: List[Dict[str, Any]]) -> None:
+    """
+    Store the recommendations received so far for a running job.
+
+    :param job_id: Job identifier.
+    :param recommendations: Accepted recommendations, in arrival order.
+    """
+    with db.engine.begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE recommendation_jobs SET result = :result, updated_at = :now "
+                "WHERE id = :id AND status = :running"
+            ),
+            {
+                "result": json.dumps({"recommendations": recommendations, "cached_at": None}),
+                "now": time.time(),
+                "id": job_id,
+                "running": RUNNING,
+            },
+        )
+
+
+def _heartbeat(engine, job_id: str, interval: float, stop: threading.Event) -> None:
+    """
+    Refresh `updated_at` of a running job until `stop` is set.
+
+    :param engine: Database engine of the app.
+    :param job_id: Job identifier.
+    :param interval: Seconds between updates.
+    :param stop: Event set when the job has finished.
+    """
+    while not stop.wait(interval):
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "UPDATE recommendation_jobs SET updated_at = :now "
+                        "WHERE id = :id AND status = :running"
+                    ),
+                    {"now": time.time(), "id": job_id, "running": RUNNING},
+                )
+        except SQLAlchemyError:
+            logger.exception("Heartbeat of job %s failed", job_id)
+
+
+def _run_job(app: Flask, job_id: str) -> None:
+    """
+    Execute one job inside an application context (runs on a pool thread).
+
+    :param app: Flask application.
+    :param job_id: Job identifier.
+    """
+    # Imported on first use: the pipeline loads the AI client stack (requests),
+    # which processes that never run a job do not need at startup
+    from app.services.recommender import run_recommendation
+
+    stop = threading.Event()
+    with app.app_context():
+        try:
+            job = _claim(job_id)
+            if job is None:
+                return
+
+            threading.Thread(
+                target=_heartbeat,
+                args=(db.engine, job_id, app.config["RECOMMENDATION_JOB_HEARTBEAT"], stop),
+                name=f"recommendation-heartbeat-{job_id[:8]}",
+                daemon=True,
+            ).start()
+
+            partial: List[Dict[str, Any]] = []
+
+            def on_item(rec: Dict[str, Any]) -> None:
+                partial.append(rec)
+                _store_partial(job_id, partial)
+
+            recs, cached_at = run_recommendation(
+                job.prompt, refresh=bool(job.refresh), on_item=on_item
+            )
+            _finish(
+                job_id,
+                DONE,
+                result={
+                    "recommendations": recs,
+                    "cached_at": cached_at.isoformat() if cached_at else None,
+                },
+            )
+        except Exception as e:
+            logger.exception("Recommendation job %s failed", job_id)
+            try:
+                _finish(job_id, FAILED, error=str(e))
+            except Exception:
+                logger.exception("Could not record failure of job %s", job_id)
+        finally:
+            stop.set()
+            db.session.remove()
+
+
+def resume_pending_jobs(app: Flask) -> int:
+    """
+    Re-submit jobs left unfinished by a previous process.
+
+    Running jobs whose last update (heartbeat) is older than
+    RECOMMENDATION_JOB_STALE_AFTER seconds are reset to queued first. Claiming stays atomic, so several processes
+    resuming the same jobs still run each job only once.
+
+    :param app: Flask application (called inside an app context).
+    :return: Number of jobs submitted.
+    :raises SQLAlchemyError: if the jobs table cannot be accessed.
+    """
+    cutoff = time.time() - app.config["RECOMMENDATION_JOB_STALE_AFTER"]
+    with db.engine.begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE recommendation_jobs SET status = :queued "
+                "WHERE status = :running AND updated_at < :cutoff"
+            ),
+            {"queued": QUEUED, "running": RUNNING, "cutoff": cutoff},
+        )
+        job_ids = conn.execute(
+            text("SELECT id FROM recommendation_jobs WHERE status = :queued"),
+            {"queued": QUEUED},
+        ).scalars().all()
+
+    for job_id in job_ids:
+        _submit(app, job_id)
+    if job_ids:
+        logger.info("Resumed %s pending recommendation jobs", len(job_ids))
+    return len(job_ids)
+
+
+def init_job_resume(app: Flask) -> None:
+    """
+    Resume unfinished jobs on the first request each process serves.
+
+    Resuming from the factory would also start jobs for every CLI command and,
+    with a pre-forking server, in a parent whose pool threads the workers do not
+    inherit. If resuming fails, the next request tries again.
+
+    :param app: Flask application.
+    """
+    lock = threading.Lock()
+    resumed = False
+
+    @app.before_request
+    def _resume_once() -> None:
+        nonlocal resumed
+        if resumed:
+            return
+        with lock:
+            if resumed:
+                return
+            try:
+                resume_pending_jobs(app)
+            except SQLAlchemyError:
+                logger.exception("Could not resume pending recommendation jobs")
+                return
+            resumed = True
@@ -0,0 +1,249 @@
+# app / services / recommender.py
+"""
+Recommendation pipeline run by the background job workers: asks the configured
+backend (OpenAI or the local engine) for a response, through the persistent
+cache where it applies, extracts the recommendation list and removes books
+that are already in the library.
+
+Features:
+- Backend-agnostic, cache-aware fetch with logged, non-fatal cache failures
+- Single-flight coalescing: concurrent jobs with the same prompt fingerprint
+  (the cache key) share one in-flight backend call
+- Streaming mode that hands each accepted recommendation to a callback as soon
+  as the backend produced it
+- Tolerant extraction of the recommendation list from the AI response
+- Deduplication against the library through the normalized, indexed title key
+
+Dependencies:
+- app.services.recommendation_backends: configured backend
+- app.services.recommendation_cache: persistent response cache
+- app.services.single_flight: per-app request coalescing
+- app.models: Book, Author
+- app.normalize: title and author name normalization
+
+Raises:
+- Exception: if the backend fails (e.g. the AI service is unreachable)
+- SQLAlchemyError: if the library lookup for deduplication fails
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models import db, Book, Author
+from app.normalize import names_match, title_key
+from app.services.recommendation_backends import get_backend
+from app.services import recommendation_cache
+from app.services.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_lookup(key: str) -> Tuple[Any, datetime] | None:
+    """
+    Look up a cached response, treating cache failures as a miss.
+
+    :param key: Cache key
+    :return: Tuple of (response, cache timestamp) or None
+    """
+    try:
+        cached = recommendation_cache.get_cached(key)
+    except SQLAlchemyError:
+        logger.exception("Recommendation cache lookup failed")
+        return None
+    if cached is None:
+        return None
+    result, created_at = cached
+    return result, datetime.fromtimestamp(created_at)
+
+
+def _cache_store(key: str, result: Any) -> None:
+    """
+    Store a response in the cache, logging (not raising) failures.
+
+    :param key: Cache key
+    :param result: JSON-serializable response
+    """
+    try:
+        recommendation_cache.store(key, result)
+    except SQLAlchemyError:
+        logger.exception("Failed to store recommendation in cache")
+
+
+def _is_recommendation(rec: Any) -> bool:
+    """
+    :param rec: Item of a backend response.
+    :return: True if it looks like a recommendation (a dict with a title).
+    """
+    return isinstance(rec, dict) and bool(rec.get("title"))
+
+
+def _checked_response(result: Any) -> Dict[str, Any]:
+    """
+    Validate an upstream response before it is used or cached.
+
+    :param result: Parsed backend response.
+    :return: {"recommendations": [...]} with only well-formed items.
+    :raises ValueError: if the response holds no recommendation (e.g. a refusal).
+    """
+    recs = [rec for rec in extract_recommendations(result) if _is_recommendation(rec)]
+    if not recs:
+        logger.error("AI response contains no recommendations: %r", str(result)[:200])
+        raise ValueError("The AI response contained no recommendations")
+    return {"recommendations": recs}
+
+
+def cached_recommendation(prompt: str, refresh: bool = False) -> Tuple[Any, datetime | None]:
+    """
+    Return the backend response for a prompt, using the persistent cache when
+    the backend is cacheable.
+
+    Cache failures are logged and never prevent a live request. Concurrent
+    misses for the same prompt share one backend call; only its leader stores
+    the response. Responses of cacheable (upstream) backends are validated
+    first, so refusals and malformed bodies are never cached.
+
+    :param prompt: Fully built AI prompt
+    :param refresh: Skip the cache lookup (the fresh response is still stored)
+    :return: Tuple of (response, cache timestamp as datetime or None if live)
+    :raises ValueError: if an upstream response contains no recommendations
+    :raises Exception: if the backend fails
+    """
+    backend = get_backend()
+    key = recommendation_cache.cache_key(prompt, backend.cache_id)
+    if backend.cacheable and not refresh:
+        cached = _cache_lookup(key)
+        if cached is not None:
+            return cached
+
+    def call() -> Any:
+        result = backend.recommend(prompt)
+        return _checked_response(result) if backend.cacheable else result
+
+    result, shared = single_flight().do(key, call)
+    if backend.cacheable and not shared:
+        _cache_store(key, result)
+    return result, None
+
+
+def run_recommendation(
+    prompt: str,
+    refresh: bool = False,
+    on_item: Callable[[Dict[str, Any]], None] | None = None,
+) -> Tuple[List[Dict[str, Any]], datetime | None]:
+    """
+    Run the full pipeline: backend (through the cache), extraction and, for
+    backends suggesting new books, removal of books already in the library.
+
+    With `on_item` and AI_STREAMING enabled, the backend response is streamed
+    and every accepted recommendation is passed to `on_item` as soon as it is
+    complete; cache hits are returned at once without streaming. Concurrent
+    streams for the same prompt share one upstream stream; only its leader
+    caches the result, and only if the stream completed with at least one
+    recommendation.
+
+    :param prompt: Fully built AI prompt
+    :param refresh: Skip the cache lookup
+    :param on_item: Callback for each accepted recommendation (optional)
+    :return: Tuple of (recommendation dicts, cache timestamp or None)
+    :raises ValueError: if an upstream response contains no recommendations
+    :raises Exception: if the backend fails
+    """
+    backend = get_backend()
+    if on_item is None or not current_app.config["AI_STREAMING"]:
+        response, cached_at = cached_recommendation(prompt, refresh)
+        recs = extract_recommendations(response)
+        if not backend.from_library:
+            recs = filter_existing(recs)
+        return recs, cached_at
+
+    key = recommendation_cache.cache_key(prompt, backend.cache_id)
+    if backend.cacheable and not refresh:
+        cached = _cache_lookup(key)
+        if cached is not None:
+            recs = extract_recommendations(cached[0])
+            if not backend.from_library:
+                recs = filter_existing(recs)
+            return recs, cached[1]
+
+    def store(items: List[Dict[str, Any]]) -> None:
+        # Leader only, after the upstream stream finished without error
+        recs = [rec for rec in items if _is_recommendation(rec)]
+        if backend.cacheable and recs:
+            _cache_store(key, {"recommendations": recs})
+
+    received: List[Dict[str, Any]] = []
+    accepted: List[Dict[str, Any]] = []
+    for rec in single_flight().stream(key, lambda: backend.stream(prompt), on_complete=store):
+        if not _is_recommendation(rec):
+            logger.warning("Skipping malformed streamed recommendation: %r", str(rec)[:200])
+            continue
+        received.append(rec)
+        if not backend.from_library:
+            # Checked one at a time so each card can be shown right away
+            if len(filter_existing(accepted + [rec])) == len(accepted):
+                continue
+        accepted.append(rec)
+        on_item(rec)
+
+    if backend.cacheable and not received:
+        raise ValueError("The AI response contained no recommendations")
+    return accepted, None
+
+
+def extract_recommendations(result: Any) -> List[Dict[str, Any]]:
+    """
+    Extract the list of recommendation dicts from an AI response.
+
+    :param result: Parsed AI response (dict with "recommendations" or a list)
+    :return: List of recommendation dicts (empty if the format is unexpected)
+    """
+    if isinstance(result, dict):
+        return result.get("recommendations", [])
+    if isinstance(result, list):
+        return result
+    logger.error("Unexpected AI response format: %r", result)
+    return []
+
+
+def filter_existing(recs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Remove recommendations that are already in the library (or repeated).
+
+    Titles are compared by their normalized key through the indexed
+    `books.title_key` column, so only books sharing a title with a suggestion
+    are loaded. Authors are compared loosely (case, accents, initials); a
+    library book without an author matches on the title alone.
+
+    :param recs: Recommendation dicts with "title" and "author" keys
+    :return: Recommendations not yet in the library, without duplicates
+    :raises SQLAlchemyError: if the library query fails
+    """
+    keys = {title_key(r.get("title")) for r in recs} - {""}
+    owned: Dict[str, List[str | None]] = {}
+    if keys:
+        rows = (
+            db.session.query(Book.title_key, Author.name)
+            .outerjoin(Author, Book.author_id == Author.id)
+            .filter(Book.title_key.in_(keys))
+            .all()
+        )
+        for key, author in rows:
+            owned.setdefault(key, []).append(author)
+
+    fresh: List[Dict[str, Any]] = []
+    for rec in recs:
+        key = title_key(rec.get("title"))
+        authors = owned.setdefault(key, [])
+        if any(a is None or names_match(a, rec.get("author")) for a in authors):
+            continue
+        # Also drop later duplicates within the same response
+        authors.append(rec.get("author"))
+        fresh.append(rec)
+    return fresh
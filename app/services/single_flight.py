@@ -0,0 +1,211 @@
+# app / services / single_flight.py
+"""
+Request coalescing ("single flight") for expensive upstream calls.
+
+Concurrent calls with the same key share one execution: the first caller (the
+leader) runs the function, later callers arriving while it is still running
+wait for and receive the leader's result (or exception) instead of starting
+their own. Once the call has finished, the next caller starts a new flight;
+reuse over time is the job of the response cache, not of this module.
+
+Coalescing happens within one process. Requests handled by other processes
+are still deduplicated over time by the persistent recommendation cache.
+
+Features:
+- `do()` for plain calls and `stream()` for iterators: followers of a streamed
+  flight replay the items already produced and then receive new items live
+- Per-key metrics (calls, upstream executions, coalesced calls saved, last
+  call), bounded to the most recently used METRICS_MAX_KEYS keys
+- One coalescer per app in `app.extensions["single_flight"]` for
+  recommendations, plus separate named coalescers for other callers
+
+Dependencies:
+- threading: for the flight registry lock and per-flight conditions
+- flask.current_app: for per-app storage
+
+Raises:
+- Any exception raised by the coalesced function, re-raised in every caller
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Number of keys kept in the metrics table (least recently used are dropped)
+METRICS_MAX_KEYS = 256
+
+
+class _Flight:
+    """State of one in-flight call shared by its leader and followers."""
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.items: List[Any] = []
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.done = False
+        self.followers = 0
+
+
+class SingleFlight:
+    """Registry of in-flight calls keyed by a caller-chosen fingerprint."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._metrics: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _join(self, key: str) -> Tuple[_Flight, bool]:
+        """
+        Join the flight for a key, starting one if none is running.
+
+        :param key: Call fingerprint.
+        :return: Tuple of (flight, True if the caller is the leader).
+        """
+        with self._lock:
+            stats = self._metrics.pop(key, None) or {"calls": 0, "executions": 0, "saved": 0}
+            self._metrics[key] = stats
+            while len(self._metrics) > METRICS_MAX_KEYS:
+                self._metrics.popitem(last=False)
+            stats["calls"] += 1
+            stats["last_call"] = time.time()
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                stats["saved"] += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            stats["executions"] += 1
+            return flight, True
+
+    def _land(self, key: str, flight: _Flight, result: Any = None, error: BaseException | None = None) -> None:
+        """
+        Publish the outcome of a flight and remove it from the registry.
+
+        :param key: Call fingerprint.
+        :param flight: The leader's flight.
+        :param result: Return value of the call.
+        :param error: Exception raised by the call, if any.
+        """
+        with self._lock:
+            self._flights.pop(key, None)
+        with flight.condition:
+            flight.result, flight.error, flight.done = result, error, True
+            flight.condition.notify_all()
+        if flight.followers:
+            logger.info("Coalesced %s concurrent call(s) for %s", flight.followers, key[:12])
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run `fn` once for all concurrent callers with the same key.
+
+        :param key: Call fingerprint.
+        :param fn: Function performing the upstream call.
+        :return: Tuple of (result, True if it was shared from another caller).
+        :raises Exception: whatever `fn` raised, in the leader and all followers.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            try:
+                result = fn()
+            except BaseException as e:
+                self._land(key, flight, error=e)
+                raise
+            self._land(key, flight, result=result)
+            return result, False
+
+        with flight.condition:
+            flight.condition.wait_for(lambda: flight.done)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, True
+
+    def stream(
+        self,
+        key: str,
+        fn: Callable[[], Iterable[Any]],
+        on_complete: Callable[[List[Any]], None] | None = None,
+    ) -> Iterator[Any]:
+        """
+        Iterate `fn()` once for all concurrent callers with the same key.
+
+        Followers first receive the items the leader has already produced and
+        then every further item as it arrives. If the leader stops iterating
+        early, its flight ends there and followers see only those items.
+
+        :param key: Call fingerprint.
+        :param fn: Function returning the upstream iterator.
+        :param on_complete: Called by the leader only, with all items, once the
+            upstream iterator is exhausted without error (e.g. to cache them).
+        :return: Iterator over the shared items.
+        :raises Exception: whatever `fn` or its iterator raised.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            try:
+                for item in fn():
+                    with flight.condition:
+                        flight.items.append(item)
+                        flight.condition.notify_all()
+                    yield item
+            except GeneratorExit:
+                self._land(key, flight)
+                raise
+            except BaseException as e:
+                self._land(key, flight, error=e)
+                raise
+            self._land(key, flight)
+            if on_complete is not None:
+                on_complete(flight.items)
+            return
+
+        index = 0
+        while True:
+            with flight.condition:
+                flight.condition.wait_for(lambda: flight.done or len(flight.items) > index)
+                pending = flight.items[index:]
+                finished = flight.done
+            yield from pending
+            index += len(pending)
+            if finished:
+                break
+        if flight.error is not None:
+            raise flight.error
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return a snapshot of the per-key metrics.
+
+        :return: Mapping of key -> {calls, executions, saved, last_call,
+            in_flight}, most recently used last.
+        """
+        with self._lock:
+            return {
+                key: dict(stats, in_flight=key in self._flights)
+                for key, stats in self._metrics.items()
+            }
+
+
+def single_flight(namespace: str | None = None) -> SingleFlight:
+    """
+    Return one of the current app's coalescers, creating it on first use.
+
+    Each namespace has its own flights and metrics, so unrelated callers (e.g.
+    cover downloads) do not show up in the recommendation metrics.
+
+    :param namespace: Coalescer name, or None for the recommendation coalescer.
+    :return: SingleFlight shared by all requests and job threads of the app.
+    """
+    name = "single_flight" if namespace is None else f"single_flight.{namespace}"
+    extensions = current_app._get_current_object().extensions
+    return extensions.setdefault(name, SingleFlight())
@@ -0,0 +1,363 @@
+"""
+app / similar.py
+
+Purpose:
+"More like this" support for books. Maintains a precomputed MinHash/LSH index over
+book titles and short descriptions and answers top-k similar-book lookups from it.
+
+Background:
+Comparing one book with every other book is O(n) per request. Instead, each book
+gets a MinHash signature (NUM_PERM minimum hash values over its shingles), whose
+agreement rate estimates the Jaccard similarity of two books' shingle sets. The
+signature is split into BANDS bands of ROWS values; each band is hashed into a
+bucket stored in `book_lsh`. Books sharing a bucket in any band are candidates,
+found through the (band, bucket) primary key without scanning the library, and
+only these candidates are ranked by their estimated similarity.
+
+With 32 bands of 2 rows, pairs with a Jaccard similarity of 0.1 are found with
+about 27 % probability, 0.2 with about 73 % and 0.3 with about 95 %.
+
+Shingles are title words (prefixed, so they stay distinct from description
+words) and description word bigrams, after dropping stop words.
+
+Features:
+- Tables `book_minhash` (signatures) and `book_lsh` (band buckets), migration 6
+- Incremental updates through mapper events on Book insert, update and delete
+- `book_lsh` is a clustered (band, bucket, book_id) key only, which keeps bulk
+  inserts cheap; entries are deleted by key, recomputed from the signature
+- `index_books_after()` for Core bulk inserts (importer)
+- `backfill_similar_index()`: indexes the books that existed before migration 6,
+  run at startup (the migration itself only creates the tables)
+- `similar_books()` for the `/books/<id>/similar` endpoint and the detail modal
+
+Required Modules:
+- hashlib, struct, zlib: For deterministic shingle hashes, signature packing
+  and band buckets
+- sqlalchemy: Events and text queries
+- app.models, app.normalize: ORM model Book and tokenization
+
+Exceptions:
+- SQLAlchemyError: Raised if the index cannot be updated or queried
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import hashlib
+import logging
+import operator
+import struct
+import zlib
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import bindparam, event, text
+
+from app.models import db, Book
+from app.normalize import STOPWORDS, tokenize
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+# Candidates (by number of shared buckets) ranked per lookup
+MAX_CANDIDATES = 50
+
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}I")
+_BAND_BYTES = ROWS * 4
+
+
+def shingles(title: str | None, description: str | None) -> Set[str]:
+    """
+    Build the shingle set of a book.
+
+    :param title: Book title.
+    :param description: Short description.
+    :return: Title words ("t:word") and description word bigrams.
+    """
+    result = {"t:" + w for w in tokenize(title) if w not in STOPWORDS}
+    words = [w for w in tokenize(description) if w not in STOPWORDS]
+    result.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    if len(words) == 1:
+        result.add(words[0])
+    return result
+
+
+def _shingle_hashes(shingle: str) -> Tuple[int, ...]:
+    """
+    Hash a shingle with NUM_PERM independent 32-bit hash functions.
+
+    One SHAKE-128 digest provides all NUM_PERM values at once, which is much
+    faster in Python than evaluating NUM_PERM arithmetic hash functions, and is
+    stable across processes (unlike the built-in `hash()`).
+
+    :param shingle: Shingle text.
+    :return: NUM_PERM hash values.
+    """
+    digest = hashlib.shake_128(shingle.encode("utf-8")).digest(_SIGNATURE.size)
+    return _SIGNATURE.unpack(digest)
+
+
+def minhash(shingle_set: Iterable[str]) -> bytes | None:
+    """
+    Compute the packed MinHash signature of a shingle set.
+
+    :param shingle_set: Shingles from `shingles()`.
+    :return: NUM_PERM packed 32-bit minimum hash values, or None for an empty set.
+    """
+    hashes = [_shingle_hashes(s) for s in shingle_set]
+    if not hashes:
+        return None
+    return _SIGNATURE.pack(*map(min, zip(*hashes)))
+
+
+def band_buckets(signature: bytes) -> List[int]:
+    """
+    Hash each band of a packed signature into a bucket id.
+
+    :param signature: Packed MinHash signature.
+    :return: One bucket id per band.
+    """
+    return [
+        zlib.crc32(signature[i * _BAND_BYTES:(i + 1) * _BAND_BYTES]) for i in range(BANDS)
+    ]
+
+
+def estimate_similarity(a: bytes, b: bytes) -> float:
+    """
+    Estimate the Jaccard similarity of two packed signatures.
+
+    :param a: Packed signature.
+    :param b: Packed signature.
+    :return: Fraction of equal signature values (0.0–1.0).
+    """
+    return sum(map(operator.eq, _SIGNATURE.unpack(a), _SIGNATURE.unpack(b))) / NUM_PERM
+
+
+def _delete_entries(connection, ids: List[int]) -> None:
+    """
+    Delete the signatures and buckets of the given books.
+
+    Bucket rows are addressed by their full primary key, recomputed from the
+    stored signatures, so `book_lsh` needs no secondary index on book_id.
+
+    :param connection: Connection inside the current transaction.
+    :param ids: Book ids.
+    """
+    stored = connection.execute(
+        text("SELECT book_id, signature FROM book_minhash WHERE book_id IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+        {"ids": ids},
+    ).all()
+    if not stored:
+        return
+    mark = _param_mark(connection)
+    connection.exec_driver_sql(
+        f"DELETE FROM book_lsh WHERE band = {mark} AND bucket = {mark} AND book_id = {mark}",
+        [
+            (band, bucket, book_id)
+            for book_id, signature in stored
+            for band, bucket in enumerate(band_buckets(signature))
+        ],
+    )
+    connection.execute(
+        text("DELETE FROM book_minhash WHERE book_id IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+        {"ids": [book_id for book_id, _ in stored]},
+    )
+
+
+def _param_mark(connection) -> str:
+    """
+    Return the DB-API placeholder for raw executemany statements.
+
+    :param connection: Open connection.
+    :return: '?' for qmark drivers (sqlite3), otherwise '%s'.
+    """
+    return "?" if connection.dialect.paramstyle == "qmark" else "%s"
+
+
+def _index_rows(connection, rows: Iterable[Any], replace: bool = True) -> None:
+    """
+    Store (or replace) the signatures and buckets of the given books.
+
+    :param connection: Connection inside the current transaction.
+    :param rows: Rows with id, title and short_description.
+    :param replace: Delete existing entries first (False for new books).
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    if replace:
+        _delete_entries(connection, [row.id for row in rows])
+
+    signatures: List[Tuple[int, bytes]] = []
+    buckets: List[Tuple[int, int, int]] = []
+    for row in rows:
+        signature = minhash(shingles(row.title, row.short_description))
+        if signature is None:
+            continue
+        signatures.append((row.id, signature))
+        buckets.extend(
+            (band, bucket, row.id) for band, bucket in enumerate(band_buckets(signature))
+        )
+    if signatures:
+        # Plain DB-API executemany: building SQLAlchemy parameter dicts for
+        # BANDS rows per book would cost more than computing the signatures
+        mark = _param_mark(connection)
+        connection.exec_driver_sql(
+            f"INSERT INTO book_minhash (book_id, signature) VALUES ({mark}, {mark})",
+            signatures,
+        )
+        connection.exec_driver_sql(
+            f"INSERT INTO book_lsh (band, bucket, book_id) VALUES ({mark}, {mark}, {mark})",
+            buckets,
+        )
+
+
+def index_books_after(connection, after_id: int) -> None:
+    """
+    Index all books with an id greater than `after_id`.
+
+    Used by bulk loaders that insert rows through Core statements (bypassing
+    the mapper events) and by the migration that creates the index.
+
+    :param connection: Connection inside the transaction that inserted the books.
+    :param after_id: Highest book id that existed before the insert.
+    """
+    rows = connection.execute(
+        text("SELECT id, title, short_description FROM books WHERE id > :after_id"),
+        {"after_id": after_id},
+    )
+    _index_rows(connection, rows, replace=False)
+
+
+# app_metadata row set by migration 6 until existing books are indexed
+BACKFILL_MARKER = "similar_index_backfill"
+
+
+def backfill_similar_index(engine) -> int:
+    """
+    Index the books that are not in the similarity index yet, if migration 6
+    asked for it, and clear the request.
+
+    :param engine: SQLAlchemy engine bound to the application database.
+    :return: Number of books indexed.
+    :raises SQLAlchemyError: If the books cannot be indexed.
+    """
+    with engine.begin() as conn:
+        marker = {"key": BACKFILL_MARKER}
+        if conn.execute(text("SELECT 1 FROM app_metadata WHERE key = :key"), marker).first() is None:
+            return 0
+        rows = conn.execute(
+            text(
+                "SELECT b.id, b.title, b.short_description FROM books b "
+                "LEFT JOIN book_minhash m ON m.book_id = b.id WHERE m.book_id IS NULL"
+            )
+        ).all()
+        _index_rows(conn, rows, replace=False)
+        conn.execute(text("DELETE FROM app_metadata WHERE key = :key"), marker)
+    logger.info("Added %s existing books to the similarity index", len(rows))
+    return len(rows)
+
+
+# Books sharing a bucket with a given book in any band, most shared first,
+# with their signatures and display fields (built once; BANDS is fixed)
+_CANDIDATES_SQL = text(
+    "SELECT m.book_id, m.signature, b.title, a.name AS author "
+    "FROM ("
+    "  SELECT book_id, COUNT(*) AS shared FROM book_lsh "
+    "  WHERE ("
+    + " OR ".join(f"(band = {band} AND bucket = :b{band})" for band in range(BANDS))
+    + ") AND book_id != :id "
+    "  GROUP BY book_id ORDER BY shared DESC LIMIT :limit"
+    ") c "
+    "JOIN book_minhash m ON m.book_id = c.book_id "
+    "JOIN books b ON b.id = c.book_id "
+    "LEFT JOIN authors a ON a.id = b.author_id"
+)
+
+
+def similar_books(book_id: int, k: int = 5) -> List[Dict[str, Any]]:
+    """
+    Return the books most similar to a book.
+
+    :param book_id: Book to find neighbours for.
+    :param k: Maximum number of results.
+    :return: Dicts with id, title, author and score (estimated Jaccard), best
+        first; empty if the book has no indexable text.
+    :raises SQLAlchemyError: if the index cannot be queried.
+    """
+    with db.engine.connect() as conn:
+        own = conn.execute(
+            text("SELECT signature FROM book_minhash WHERE book_id = :id"),
+            {"id": book_id},
+        ).scalar()
+        if own is None:
+            return []
+        candidates = conn.execute(
+            _CANDIDATES_SQL,
+            {
+                "id": book_id,
+                "limit": MAX_CANDIDATES,
+                **{f"b{band}": bucket for band, bucket in enumerate(band_buckets(own))},
+            },
+        ).all()
+
+    ranked = sorted(
+        (
+            {
+                "id": row.book_id,
+                "title": row.title,
+                "author": row.author,
+                "score": round(estimate_similarity(own, row.signature), 3),
+            }
+            for row in candidates
+        ),
+        key=lambda item: (-item["score"], item["id"]),
+    )
+    return ranked[:k]
+
+
+_INDEXED_BOOK_FIELDS = ("title", "short_description")
+
+
+@event.listens_for(Book, "after_insert")
+def _index_new_book(mapper, connection, target: Book) -> None:
+    """
+    Add a newly inserted book to the similarity index.
+
+    :param mapper: Book mapper (unused).
+    :param connection: Connection used by the current flush.
+    :param target: The Book instance that was inserted.
+    """
+    _index_rows(connection, [target], replace=False)
+
+
+@event.listens_for(Book, "before_delete")
+def _unindex_book(mapper, connection, target: Book) -> None:
+    """
+    Remove a book from the similarity index before it is deleted.
+
+    :param mapper: Book mapper (unused).
+    :param connection: Connection used by the current flush.
+    :param target: The Book instance about to be deleted.
+    """
+    _delete_entries(connection, [target.id])
+
+
+@event.listens_for(Book, "after_update")
+def _reindex_book(mapper, connection, target: Book) -> None:
+    """
+    Re-index an updated book if its title or description changed.
+
+    :param mapper: Book mapper (unused).
+    :param connection: Connection used by the current flush.
+    :param target: The Book instance that was updated.
+    """
+    attrs = db.inspect(target).attrs
+    if any(attrs[field].history.has_changes() for field in _INDEXED_BOOK_FIELDS):
+        _index_rows(connection, [target])
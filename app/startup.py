@@ -0,0 +1,125 @@
+"""
+app / startup.py
+
+Purpose:
+Startup instrumentation for the application factory. With pre-forked,
+multi-worker deployments and frequent restarts every worker pays the cold start,
+so `create_app()` records how long each phase takes and `flask bench-startup`
+measures it in fresh interpreter processes.
+
+Features:
+- `StartupTimer`: records named phases; results are stored in
+  `app.extensions["startup_timings"]` and logged once per app
+- `flask bench-startup`: starts the app N times in new processes, with
+  FAST_START on and off, and prints the median time per phase (imports
+  included)
+
+Required Modules:
+- json, statistics, subprocess, sys, time: For the benchmark runs and timing
+- click: For the CLI command
+
+Exceptions:
+- click.ClickException: Raised by the benchmark if a child process fails
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import click
+
+logger = logging.getLogger(__name__)
+
+# Child process of the benchmark: times the package import, then create_app()
+_BENCH_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app(sys.argv[1])
+timings = {"imports": (imported - started) * 1000}
+timings.update(flask_app.extensions["startup_timings"])
+print(json.dumps(timings))
+"""
+
+
+class StartupTimer:
+    """Wall-clock durations (ms) of consecutive startup phases."""
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a block of the factory.
+
+        :param name: Phase name; repeated names accumulate.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    def report(self) -> str:
+        """
+        :return: One-line summary, e.g. "total 41 ms (config 1 ms, schema 3 ms, ...)".
+        """
+        parts = ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.timings.items())
+        return f"total {sum(self.timings.values()):.0f} ms ({parts})"
+
+
+def _run_child(config_name: str, fast_start: bool) -> Dict[str, float]:
+    """
+    Start the app once in a fresh interpreter.
+
+    :param config_name: Configuration name passed to create_app().
+    :param fast_start: Value of FAST_START for the child.
+    :return: Phase timings in ms.
+    :raises click.ClickException: if the child fails.
+    """
+    env = dict(os.environ, FAST_START="true" if fast_start else "false")
+    result = subprocess.run(
+        [sys.executable, "-c", _BENCH_CHILD, config_name],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        raise click.ClickException(f"Startup failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@click.command("bench-startup")
+@click.option("--runs", default=5, show_default=True, help="Cold starts per mode.")
+@click.option("--config", "config_name", default="production", show_default=True,
+              help="Configuration passed to create_app().")
+def bench_startup_command(runs: int, config_name: str) -> None:
+    """Measure cold-start time per phase with FAST_START on and off."""
+    results: Dict[str, List[Dict[str, float]]] = {}
+    for fast_start in (False, True):
+        label = "fast" if fast_start else "full"
+        # One warm-up start so both modes see the same OS file cache
+        _run_child(config_name, fast_start)
+        results[label] = [_run_child(config_name, fast_start) for _ in range(runs)]
+
+    phases = list(dict.fromkeys(name for runs_ in results.values() for run in runs_ for name in run))
+    click.echo(f"Median of {runs} cold starts (ms), config '{config_name}':")
+    click.echo(f"{'phase':<14}{'full':>10}{'fast':>10}")
+    for name in phases + ["total"]:
+        row = []
+        for label in ("full", "fast"):
+            values = [sum(run.values()) if name == "total" else run.get(name, 0.0) for run in results[label]]
+            row.append(statistics.median(values))
+        click.echo(f"{name:<14}{row[0]:>10.1f}{row[1]:>10.1f}")
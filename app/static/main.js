@@ -7,7 +7,7 @@
  * Main Features:
  * - Dynamic modal loading via fetch()
  * - Toast notifications for user feedback
- * - Book rating and progress tracking
+ * - Book rating and progress tracking (debounced, batched updates)
  * - Form handling with spinners
  * - Add-to-library functionality
  *
@@ -180,6 +180,115 @@ function showToast(msg, duration = 3000) {
   setTimeout(() => toast.classList.remove('show'), duration);
 }
 
+/**
+ * Appends the next page of book cards to the grid.
+ *
+ * The fragment URL comes from the button's data-url; the server sends the
+ * following page URL in the X-Next-Page header and omits it on the last page.
+ *
+ * @param {HTMLButtonElement} btn - The "load more" button.
+ * @return {Promise<void>} Resolves once the cards are appended.
+ */
+async function loadMoreBooks(btn) {
+  if (btn.disabled) return;
+  btn.disabled = true;
+  try {
+    const resp = await fetch(btn.dataset.url);
+    if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+    const html = await resp.text();
+    document.getElementById('books-grid').insertAdjacentHTML('beforeend', html);
+
+    const next = resp.headers.get('X-Next-Page');
+    if (next) {
+      btn.dataset.url = next;
+      btn.disabled = false;
+    } else {
+      btn.closest('.load-more').remove();
+    }
+  } catch (err) {
+    btn.disabled = false;
+    handleError(err, 'Failed to load more books.');
+  }
+}
+
+/**
+ * Binds the "load more" button and triggers it automatically when it scrolls
+ * into view (infinite scroll).
+ *
+ * @return {void} This function does not return a value.
+ */
+function initLoadMore() {
+  const btn = document.querySelector('.js-load-more');
+  if (!btn) return;
+  btn.addEventListener('click', () => loadMoreBooks(btn));
+
+  if ('IntersectionObserver' in window) {
+    const observer = new IntersectionObserver(entries => {
+      if (entries.some(entry => entry.isIntersecting)) loadMoreBooks(btn);
+    }, {rootMargin: '400px'});
+    observer.observe(btn);
+  }
+}
+
+// Pending rating/progress edits keyed by book id, sent together after a pause
+const BATCH_UPDATE_URL = '/books/batch-update';
+const BATCH_UPDATE_DELAY = 800;
+const pendingUpdates = new Map();
+let batchTimer = null;
+
+/**
+ * Queues an edit for a book and (re)starts the debounce timer.
+ * Repeated edits of the same book are merged, so only the latest values are sent.
+ *
+ * @param {string|number} bookId - The book to update.
+ * @param {{rating?: number, progress?: number, is_read?: boolean}} fields - Changed values.
+ * @return {void} This function does not return a value.
+ */
+function queueBookUpdate(bookId, fields) {
+  const id = Number(bookId);
+  pendingUpdates.set(id, {...(pendingUpdates.get(id) || {}), ...fields});
+  clearTimeout(batchTimer);
+  batchTimer = setTimeout(() => flushBookUpdates(), BATCH_UPDATE_DELAY);
+}
+
+/**
+ * Sends all pending book edits to the batch endpoint in one request.
+ *
+ * @param {boolean} [useBeacon=false] - Use navigator.sendBeacon (for page unload).
+ * @return {Promise<void>} Resolves when the request has completed.
+ */
+async function flushBookUpdates(useBeacon = false) {
+  clearTimeout(batchTimer);
+  if (!pendingUpdates.size) return;
+
+  const batch = new Map(pendingUpdates);
+  pendingUpdates.clear();
+  const body = JSON.stringify({
+    updates: [...batch].map(([book_id, fields]) => ({book_id, ...fields}))
+  });
+
+  if (useBeacon && navigator.sendBeacon) {
+    navigator.sendBeacon(BATCH_UPDATE_URL, new Blob([body], {type: 'application/json'}));
+    return;
+  }
+
+  try {
+    const resp = await fetch(BATCH_UPDATE_URL, {
+      method: 'POST',
+      headers: {'Content-Type': 'application/json'},
+      body
+    });
+    if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+    showToast(batch.size === 1 ? 'Changes saved' : `${batch.size} books updated`);
+  } catch (err) {
+    // Put the edits back unless newer ones were queued meanwhile
+    batch.forEach((fields, id) => {
+      pendingUpdates.set(id, {...fields, ...(pendingUpdates.get(id) || {})});
+    });
+    handleError(err, 'Error while saving changes');
+  }
+}
+
 /**
  * Initializes event listeners after DOM is ready.
  */
@@ -195,23 +304,24 @@ document.addEventListener('DOMContentLoaded', () => {
         el.addEventListener('click', closeModal)
     );
 
-    // Open book details on title click
-    document.querySelectorAll('.book-title').forEach(link => {
-        link.addEventListener('click', e => {
+    // Open book/author details (delegated so "load more" cards work too)
+    document.addEventListener('click', e => {
+        const bookLink = e.target.closest('.book-title');
+        if (bookLink) {
             e.preventDefault();
-            const id = link.dataset.bookId;
-            openModal(`/books/${id}?modal=true`);
-        });
-
-        document.querySelectorAll('.author-link, .book-author-line a').forEach(link => {
-            link.addEventListener('click', e => {
-                e.preventDefault();
-                const id = link.dataset.authorId;
-                openModal(`/authors/${id}?modal=true`);
-            });
-        });
+            openModal(`/books/${bookLink.dataset.bookId}?modal=true`);
+            return;
+        }
+        const authorLink = e.target.closest('.author-link, .book-author-line a');
+        if (authorLink) {
+            e.preventDefault();
+            openModal(`/authors/${authorLink.dataset.authorId}?modal=true`);
+        }
     });
 
+    // Load further pages of book cards
+    initLoadMore();
+
     // Open the Add-Author modal
     document.querySelectorAll('.js-open-add-author').forEach(btn => {
       btn.addEventListener('click', e => {
@@ -226,110 +336,109 @@ document.addEventListener('DOMContentLoaded', () => {
       });
     });
 
-    // Rating change
-    document.querySelectorAll('.rating-select').forEach(sel => {
-        sel.addEventListener('change', async e => {
-            const bookId = e.target.id.split("-")[1];
-            const rating = e.target.value;
-            const resp = await fetch(`/books/${bookId}/rate`, {
-                method: 'POST',
-                headers: {'Content-Type': 'application/x-www-form-urlencoded'},
-                body: `rating=${rating}`
-            });
-            showToast(resp.ok ? 'Rating saved' : 'Error while saving rating');
-        });
+    // Rating change (delegated; queued and sent in batches)
+    document.addEventListener('change', e => {
+        const sel = e.target.closest('.rating-select');
+        if (!sel) return;
+        const bookId = sel.dataset.bookId || sel.id.split("-")[1];
+        queueBookUpdate(bookId, {rating: Number(sel.value)});
     });
 
     // Progress slider live update
-    document.querySelectorAll('.progress-slider').forEach(slider => {
-        slider.addEventListener('input', e => {
-            const id = e.target.dataset.bookId;
-            document.querySelector(`#progress-${id} + .progress-value`).textContent = e.target.value + '%';
-        });
-        slider.addEventListener('change', async e => {
-            const id = e.target.dataset.bookId;
-            const val = e.target.value;
-            const isRead = document.querySelector(`.read-toggle[data-book-id='${id}']`).checked;
-            await fetch(`/books/${id}/status`, {
-                method: 'POST',
-                headers: {'Content-Type': 'application/x-www-form-urlencoded'},
-                body: `is_read=${isRead}&progress=${val}`
-            });
-            showToast('Progress updated');
-        });
+    document.addEventListener('input', e => {
+        const slider = e.target.closest('.progress-slider');
+        if (!slider) return;
+        const id = slider.dataset.bookId;
+        const display = document.querySelector(`#progress-${id} + .progress-value`);
+        if (display) display.textContent = slider.value + '%';
+    });
+    document.addEventListener('change', e => {
+        const slider = e.target.closest('.progress-slider');
+        if (!slider) return;
+        const id = slider.dataset.bookId;
+        const toggle = document.querySelector(`.read-toggle[data-book-id='${id}']`);
+        const fields = {progress: Number(slider.value)};
+        if (toggle) fields.is_read = toggle.checked;
+        queueBookUpdate(id, fields);
     });
 
+    // Send pending edits before the page is hidden or closed
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') flushBookUpdates(true);
+    });
+    window.addEventListener('pagehide', () => flushBookUpdates(true));
+
     // Delete book with confirmation
-    document.querySelectorAll('.delete-button').forEach(btn => {
-        btn.addEventListener('click', async () => {
-            const id = btn.dataset.bookId;
-            if (!confirm('Are you sure you want to delete this book?')) return;
-            try {
-                const resp = await fetch(`/books/${id}/delete`, {method: 'POST'});
-                if (resp.ok) {
-                    showToast('Book deleted successfully');
-                    setTimeout(() => location.reload(), 1000);
-                } else {
-                    showToast('Error while deleting the book');
-                }
-            } catch (err) {
-                console.error('Deletion error:', err);
-                showToast('An error occurred while deleting');
+    document.addEventListener('click', async e => {
+        const btn = e.target.closest('.delete-button[data-book-id]');
+        if (!btn) return;
+        const id = btn.dataset.bookId;
+        if (!confirm('Are you sure you want to delete this book?')) return;
+        try {
+            const resp = await fetch(`/books/${id}/delete`, {method: 'POST'});
+            if (resp.ok) {
+                showToast('Book deleted successfully');
+                setTimeout(() => location.reload(), 1000);
+            } else {
+                showToast('Error while deleting the book');
             }
-        });
+        } catch (err) {
+            console.error('Deletion error:', err);
+            showToast('An error occurred while deleting');
+        }
     });
 
     // Edit book modal
-    document.querySelectorAll('.edit-icon').forEach(btn => {
-        btn.addEventListener('click', async e => {
-            const id = btn.dataset.bookId;
-
-            // Warte, bis Modal geladen ist
-            await openModal(`/books/${id}/edit?modal=true`);
-
-            // Jetzt ist der Inhalt im DOM → Selektieren & Listener binden
-            const form = document.getElementById('edit-book-form');
-            if (!form) {
-                console.error("Edit form not found in modal.");
-                return;
-            }
+    document.addEventListener('click', async e => {
+        const btn = e.target.closest('.edit-icon');
+        if (!btn) return;
+        const id = btn.dataset.bookId;
+
+        // Warte, bis Modal geladen ist
+        await openModal(`/books/${id}/edit?modal=true`);
+
+        // Jetzt ist der Inhalt im DOM → Selektieren & Listener binden
+        const form = document.getElementById('edit-book-form');
+        if (!form) {
+            console.error("Edit form not found in modal.");
+            return;
+        }
 
-            const slider = form.querySelector('#progress-slider');
-            const valDisplay = form.querySelector('#progress-value');
+        const slider = form.querySelector('#progress-slider');
+        const valDisplay = form.querySelector('#progress-value');
 
-            if (slider && valDisplay) {
-                valDisplay.textContent = slider.value + '%';
-                slider.addEventListener('input', e => {
-                    valDisplay.textContent = e.target.value + '%';
-                });
-            }
+        if (slider && valDisplay) {
+            valDisplay.textContent = slider.value + '%';
+            slider.addEventListener('input', e => {
+                valDisplay.textContent = e.target.value + '%';
+            });
+        }
 
-            form.addEventListener('submit', async e => {
-                e.preventDefault();
-                const data = new URLSearchParams(new FormData(form));
-                const res = await fetch(`/books/${id}/edit`, {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/x-www-form-urlencoded'},
-                    body: data
-                });
-
-                try {
-                    const result = await res.json();
-                    if (result.success) {
-                        showToast('Changes saved successfully');
-                        setTimeout(() => location.reload(), 500);
-                    } else {
-                        showToast('Error saving changes');
-                    }
-                } catch (err) {
-                    console.error('Invalid JSON response', err);
-                    showToast('Unexpected error');
-                }
+        form.addEventListener('submit', async e => {
+            e.preventDefault();
+            const data = new URLSearchParams(new FormData(form));
+            const res = await fetch(`/books/${id}/edit`, {
+                method: 'POST',
+                headers: {'Content-Type': 'application/x-www-form-urlencoded'},
+                body: data
             });
 
-            // Cancel button
-            form.querySelector('#cancel-edit')?.addEventListener('click', closeModal);
+            try {
+                const result = await res.json();
+                if (result.success) {
+                    showToast('Changes saved successfully');
+                    setTimeout(() => location.reload(), 500);
+                } else {
+                    showToast(result.error || 'Error saving changes');
+                }
+            } catch (err) {
+                console.error('Invalid JSON response', err);
+                showToast('Unexpected error');
+            }
         });
+
+        // Cancel button
+        form.querySelector('#cancel-edit')?.addEventListener('click', closeModal);
     });
 });
 
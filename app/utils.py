@@ -10,6 +10,7 @@ Features:
 - Parses ISO-format date strings into Python date objects
 - Commits SQLAlchemy sessions with rollback and logging on failure
 - Retrieves or creates Author entries safely and efficiently
+- Reads and increments shared counters in the `app_metadata` table
 
 Required Modules:
 - logging: For structured error logging
@@ -28,6 +29,7 @@ Date: 2025-07-11
 import logging
 from datetime import datetime, date
 
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.models import db, Author
@@ -90,3 +92,42 @@ def get_or_create_author(name: str, birth: date | None, death: date | None) -> A
         logger.exception(f"Failed to flush author to session: {e}")
         raise
     return author
+
+
+def read_counter(connection, key: str) -> int:
+    """
+    Read a shared counter from the `app_metadata` table.
+
+    :param connection: SQLAlchemy Connection, Engine-bound connection or Session.
+    :param key: Counter name.
+    :return: Current counter value, or 0 if the counter does not exist yet.
+    :raises SQLAlchemyError: if the query fails.
+    """
+    value = connection.execute(
+        text("SELECT value FROM app_metadata WHERE key = :key"), {"key": key}
+    ).scalar()
+    return value or 0
+
+
+def bump_counter(connection, key: str, floor: int | None = None) -> None:
+    """
+    Increment a shared counter in the `app_metadata` table, creating it if needed.
+
+    Runs on the given connection so the increment commits or rolls back together
+    with the write that caused it.
+
+    :param connection: SQLAlchemy Connection or Session.
+    :param key: Counter name.
+    :param floor: Optional minimum for the new value (e.g. the current time, so
+                  the counter doubles as a modification timestamp).
+    :raises SQLAlchemyError: if the statement fails.
+    """
+    connection.execute(
+        text(
+            "INSERT INTO app_metadata (key, value) VALUES (:key, :initial) "
+            "ON CONFLICT (key) DO UPDATE SET value = CASE "
+            "WHEN app_metadata.value >= :floor THEN app_metadata.value + 1 "
+            "ELSE :floor END"
+        ),
+        {"key": key, "initial": max(floor or 0, 1), "floor": floor or 0},
+    )
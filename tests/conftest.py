@@ -0,0 +1,55 @@
+"""
+tests / conftest.py
+
+Purpose:
+Shared pytest fixtures: a Flask app on the testing configuration (in-memory
+SQLite, local recommendation backend), its test client, and the fake AI
+completions server wired into the app.
+
+Author: Martin Haferanke
+Date: 2026-10-17
+"""
+
+import os
+import tempfile
+
+# Keep test runs out of the project's log file; must be set before app.config
+# is imported, since configuration values are read at import time
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.gettempdir(), "bookalchemy-tests.log"))
+
+import pytest
+
+from app import create_app
+from app.models import db
+from app.services.fake_ai import FakeAIServer
+from app.services.http_client import ai_client
+
+
+@pytest.fixture
+def app():
+    """Application on the testing configuration with an empty library."""
+    app = create_app("testing")
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client for `app`."""
+    return app.test_client()
+
+
+@pytest.fixture
+def fake_ai(app, monkeypatch):
+    """
+    Fake completions endpoint used as the OpenAI backend (no retries, so each
+    call is one request).
+    """
+    server = FakeAIServer().start()
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    app.config.update(AI_API_URL=server.url, AI_MAX_RETRIES=0, RECOMMENDATION_BACKEND="openai")
+    yield server
+    ai_client().close()
+    server.stop()
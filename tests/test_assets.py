@@ -0,0 +1,63 @@
+"""
+tests / test_assets.py
+
+Static asset pipeline: content-fingerprinted bundles, precompressed variants
+and immutable caching headers.
+"""
+
+import gzip
+import os
+
+import pytest
+
+from app.assets import IMMUTABLE_MAX_AGE, asset_url, build_assets, bundle_fingerprint
+
+
+@pytest.fixture
+def static_dir(app, tmp_path):
+    (tmp_path / "main.css").write_text("body {\n  color: #333;  /* text */\n}\n")
+    (tmp_path / "main.js").write_text("// greeting\nconsole.log('hello');\n")
+    app.static_folder = str(tmp_path)
+    app.config["ASSETS_USE_BUNDLES"] = "true"
+    return tmp_path
+
+
+def test_fingerprint_follows_content(app, static_dir):
+    manifest = build_assets(str(static_dir))
+    css = manifest["main.css"]
+    assert css.startswith("dist/main.") and css.endswith(".css")
+    assert (static_dir / css).read_text() == "body{color:#333}"
+
+    with app.test_request_context():
+        assert asset_url("main.css") == f"/static/{css}"
+        first = bundle_fingerprint()
+
+    (static_dir / "main.css").write_text("body { color: #000; }")
+    rebuilt = build_assets(str(static_dir))
+    assert rebuilt["main.css"] != css
+    assert rebuilt["main.js"] == manifest["main.js"]
+    # The previous build is removed
+    assert not os.path.exists(static_dir / css)
+    with app.test_request_context():
+        assert bundle_fingerprint() != first
+
+
+def test_bundle_is_served_precompressed_and_immutable(client, static_dir):
+    path = build_assets(str(static_dir))["main.js"]
+
+    response = client.get(f"/static/{path}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.content_encoding == "gzip"
+    assert gzip.decompress(response.data) == (static_dir / path).read_bytes()
+    assert response.cache_control.max_age == IMMUTABLE_MAX_AGE
+    assert response.cache_control.immutable
+    assert "Accept-Encoding" in response.vary
+
+    plain = client.get(f"/static/{path}", headers={"Accept-Encoding": "identity"})
+    assert plain.content_encoding is None
+    assert plain.data == (static_dir / path).read_bytes()
+
+
+def test_unknown_bundle_is_not_found(client, static_dir):
+    build_assets(str(static_dir))
+    assert client.get("/static/dist/main.0000000000.css").status_code == 404
@@ -0,0 +1,52 @@
+"""
+tests / test_author_directory.py
+
+Cached author directory: served from the app's cache, dropped on author writes
+in this process and reloaded when another process bumps the shared version.
+"""
+
+from datetime import date
+
+from app.author_directory import VERSION_KEY, get_author_directory
+from app.models import db, Author
+from app.utils import bump_counter
+
+
+def add_author(name):
+    db.session.add(Author(name=name, birth_date=date(1900, 1, 1)))
+    db.session.commit()
+
+
+def test_directory_is_cached_per_app(app):
+    add_author("Octavia E. Butler")
+    first = get_author_directory()
+
+    assert [entry.name for entry in first] == ["Octavia E. Butler"]
+    assert get_author_directory() is first
+    assert app.extensions["author_directory"].entries is first
+
+
+def test_author_write_drops_the_cache(app):
+    add_author("Octavia E. Butler")
+    get_author_directory()
+    add_author("Kim Stanley Robinson")
+
+    assert [entry.name for entry in get_author_directory()] == [
+        "Kim Stanley Robinson",
+        "Octavia E. Butler",
+    ]
+
+
+def test_write_in_another_process_is_noticed(app):
+    app.config["AUTHOR_DIRECTORY_CHECK_INTERVAL"] = 0
+    add_author("Octavia E. Butler")
+    get_author_directory()
+
+    # Another process adds an author: only the shared counter tells this one
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO authors (name, birth_date) VALUES ('N. K. Jemisin', '1972-09-19')"
+        )
+        bump_counter(conn, VERSION_KEY)
+
+    assert len(get_author_directory()) == 2
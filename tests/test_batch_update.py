@@ -0,0 +1,49 @@
+"""
+tests / test_batch_update.py
+
+Batched rating/progress updates.
+"""
+
+import pytest
+
+from app.models import db, Author, Book
+
+
+@pytest.fixture
+def book(app):
+    book = Book(
+        title="Solaris",
+        short_description="An ocean.",
+        publication_year=1961,
+        isbn="9780156027601",
+        author=Author(name="Stanisław Lem"),
+    )
+    db.session.add(book)
+    db.session.commit()
+    return book
+
+
+def test_batch_update_applies_updates(client, book):
+    response = client.post(
+        "/books/batch-update",
+        json={"updates": [{"book_id": book.id, "rating": 9}, {"book_id": 999, "rating": 1}]},
+    )
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == [book.id]
+    assert response.get_json()["not_found"] == [999]
+    db.session.expire_all()
+    assert db.session.get(Book, book.id).rating == 9
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"data": "{not json", "content_type": "application/json"},
+        {"data": "updates=1", "content_type": "application/x-www-form-urlencoded"},
+        {"json": ["not", "an", "object"]},
+    ],
+)
+def test_batch_update_rejects_bodies_that_are_not_json_objects(client, kwargs):
+    response = client.post("/books/batch-update", **kwargs)
+    assert response.status_code == 400
+    assert not response.get_json()["success"]
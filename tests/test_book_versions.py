@@ -0,0 +1,56 @@
+"""
+tests / test_book_versions.py
+
+Optimistic versioning of books: a write that races another write to the same
+book is rejected with 409 instead of failing with a server error.
+"""
+
+import pytest
+from sqlalchemy import event, update
+
+from app.models import db, Author, Book
+
+
+@pytest.fixture
+def book(app):
+    book = Book(
+        title="Kindred",
+        short_description="Time travel.",
+        publication_year=1979,
+        isbn="9780807083697",
+        author=Author(name="Octavia E. Butler"),
+    )
+    db.session.add(book)
+    db.session.commit()
+    return book
+
+
+@pytest.fixture
+def concurrent_write(app, book):
+    """Another request updates the book between this request's read and its flush."""
+
+    def before_flush(session, flush_context, instances):
+        session.connection().execute(
+            update(Book).where(Book.id == book.id).values(version=Book.version + 1)
+        )
+
+    event.listen(db.session, "before_flush", before_flush)
+    yield
+    event.remove(db.session, "before_flush", before_flush)
+
+
+def test_rate_returns_conflict_on_concurrent_update(client, book, concurrent_write):
+    response = client.post(f"/books/{book.id}/rate", data={"rating": "7"})
+    assert response.status_code == 409
+    assert not response.get_json()["success"]
+
+
+def test_edit_returns_conflict_on_concurrent_update(client, book, concurrent_write):
+    response = client.post(f"/books/{book.id}/edit", data={"title": "Kindred!", "author_id": book.author_id})
+    assert response.status_code == 409
+
+
+def test_rate_succeeds_without_concurrent_update(client, book):
+    response = client.post(f"/books/{book.id}/rate", data={"rating": "7"})
+    assert response.status_code == 200
+    assert response.get_json()["rating"] == 7
@@ -0,0 +1,67 @@
+"""
+tests / test_compression.py
+
+Response compression: negotiated through Accept-Encoding, always announced in
+Vary, applied to buffered and streamed bodies, skipped for small ones.
+"""
+
+import gzip
+from datetime import date
+
+import pytest
+
+from app.models import db, Author, Book
+
+
+@pytest.fixture
+def library(app):
+    author = Author(name="Ursula K. Le Guin", birth_date=date(1929, 10, 21))
+    db.session.add_all(
+        Book(
+            title=f"Earthsea volume {i}",
+            short_description="Wizards and dragons.",
+            publication_year=1968 + i,
+            isbn=f"978000000000{i}",
+            author=author,
+        )
+        for i in range(6)
+    )
+    db.session.commit()
+
+
+def test_page_is_gzipped_when_accepted(client, library):
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.content_encoding == "gzip"
+    assert gzip.decompress(response.data) == plain.data
+    assert len(response.data) < len(plain.data)
+    # Both variants tell caches that the body depends on Accept-Encoding
+    assert "Accept-Encoding" in response.vary
+    assert "Accept-Encoding" in plain.vary
+    assert plain.content_encoding is None
+    # A strong ETag would claim the encoded bytes equal the plain ones
+    etag, weak = response.get_etag()
+    assert etag and weak
+
+
+def test_streamed_export_is_compressed_chunk_by_chunk(client, library):
+    plain = client.get("/books/export?format=ndjson", headers={"Accept-Encoding": "identity"})
+    response = client.get("/books/export?format=ndjson", headers={"Accept-Encoding": "gzip"})
+
+    assert response.content_encoding == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_small_responses_are_sent_plain(client):
+    response = client.get("/recommend/quota", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.content_encoding is None
+    assert "Accept-Encoding" in response.vary
+
+
+def test_compression_can_be_disabled(app, client, library):
+    app.config["COMPRESS_ENABLED"] = False
+    assert client.get("/", headers={"Accept-Encoding": "gzip"}).content_encoding is None
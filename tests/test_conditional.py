@@ -0,0 +1,40 @@
+"""
+tests / test_conditional.py
+
+Conditional GET of library views keyed on the library change counter.
+"""
+
+from email.utils import formatdate
+
+from app.models import db, Author
+
+
+def test_unchanged_view_is_not_modified(client):
+    first = client.get("/authors/")
+    assert first.status_code == 200
+    assert first.headers.get("ETag")
+
+    again = client.get("/authors/", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_write_changes_the_etag(app, client):
+    etag = client.get("/authors/").headers["ETag"]
+    db.session.add(Author(name="Ursula K. Le Guin"))
+    db.session.commit()
+
+    response = client.get("/authors/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Le Guin" in response.get_data(as_text=True)
+
+
+def test_if_modified_since_alone_never_yields_not_modified(app, client):
+    first = client.get("/authors/")
+    assert "Last-Modified" not in first.headers
+
+    # A write within the same second as the previous fetch
+    db.session.add(Author(name="Octavia E. Butler"))
+    db.session.commit()
+    response = client.get("/authors/", headers={"If-Modified-Since": formatdate(usegmt=True)})
+    assert response.status_code == 200
+    assert "Butler" in response.get_data(as_text=True)
@@ -0,0 +1,34 @@
+"""
+tests / test_covers.py
+
+Cover thumbnail route.
+"""
+
+from app.services.single_flight import single_flight
+
+
+def test_missing_cover_placeholder_is_cached_briefly(app, client, tmp_path):
+    app.config.update(
+        COVER_SOURCE="directory",
+        COVER_SOURCE_DIR=str(tmp_path / "sources"),
+        COVER_CACHE_DIR=str(tmp_path / "covers"),
+    )
+    response = client.get("/covers/M/9780441478125.jpg")
+
+    assert response.status_code == 200
+    assert response.mimetype == "image/svg+xml"
+    assert response.cache_control.max_age == app.config["COVER_PLACEHOLDER_MAX_AGE"]
+    assert response.cache_control.max_age < app.config["COVER_MISSING_TTL"]
+    assert not response.cache_control.immutable
+
+
+def test_unknown_cover_size_is_not_found(client):
+    assert client.get("/covers/XXL/9780441478125.jpg").status_code == 404
+
+
+def test_cover_downloads_do_not_share_recommendation_coalescer(app):
+    single_flight("covers").do("9780441478125", lambda: None)
+
+    assert single_flight("covers") is not single_flight()
+    assert "9780441478125" in single_flight("covers").metrics()
+    assert single_flight().metrics() == {}
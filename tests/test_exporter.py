@@ -0,0 +1,72 @@
+"""
+tests / test_exporter.py
+
+Streaming library export: same filters as the home page, every row exactly once
+across chunk boundaries.
+"""
+
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+
+from app.models import db, Author, Book
+from app.services import exporter
+
+
+@pytest.fixture
+def library(app):
+    le_guin = Author(name="Ursula K. Le Guin", birth_date=date(1929, 10, 21))
+    lem = Author(name="Stanisław Lem", birth_date=date(1921, 9, 12))
+    books = [
+        ("The Dispossessed", le_guin),
+        ("The Left Hand of Darkness", le_guin),
+        ("Tehanu", le_guin),
+        ("Solaris", lem),
+        ("The Cyberiad", lem),
+    ]
+    db.session.add_all(
+        Book(
+            title=title,
+            short_description="A novel.",
+            publication_year=1970,
+            isbn=f"978000000000{i}",
+            author=author,
+        )
+        for i, (title, author) in enumerate(books)
+    )
+    db.session.commit()
+    return le_guin, lem
+
+
+def test_csv_export_streams_every_book_once(client, library, monkeypatch):
+    monkeypatch.setattr(exporter, "CHUNK_ROWS", 2)
+    response = client.get("/books/export")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Disposition"].startswith("attachment;")
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["title"] for row in rows] == [
+        "The Dispossessed", "The Left Hand of Darkness", "Tehanu", "Solaris", "The Cyberiad",
+    ]
+    assert rows[3]["author"] == "Stanisław Lem"
+    assert list(rows[0]) == list(exporter.COLUMNS)
+
+
+def test_ndjson_export_applies_search_and_author_filters(client, library):
+    le_guin, _ = library
+
+    body = client.get("/books/export?format=ndjson&search=the").get_data(as_text=True)
+    titles = [json.loads(line)["title"] for line in body.splitlines()]
+    assert titles == ["The Dispossessed", "The Left Hand of Darkness", "The Cyberiad"]
+
+    url = f"/books/export?format=ndjson&search=the&author_id={le_guin.id}"
+    body = client.get(url).get_data(as_text=True)
+    titles = [json.loads(line)["title"] for line in body.splitlines()]
+    assert titles == ["The Dispossessed", "The Left Hand of Darkness"]
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/books/export?format=xml").status_code == 400
@@ -0,0 +1,81 @@
+"""
+tests / test_http_client.py
+
+Retry policy and circuit breaker of the shared HTTP client against the fake AI
+server.
+"""
+
+import pytest
+import requests
+
+from app.services.ai_services import fetch_ai_recommendation, stream_ai_recommendations
+from app.services.http_client import CLOSED, OPEN, CircuitOpenError, ai_client
+
+
+@pytest.fixture
+def breaker_config(app, fake_ai):
+    """One failure opens the circuit; a trial call is allowed right away."""
+    app.config.update(AI_CIRCUIT_FAILURE_THRESHOLD=1, AI_CIRCUIT_RESET_TIMEOUT=0)
+    return fake_ai
+
+
+def test_streamed_trial_call_closes_half_open_circuit(fake_ai, breaker_config):
+    breaker = ai_client().breaker
+    fake_ai.failures = [503]
+
+    with pytest.raises(requests.RequestException):
+        list(stream_ai_recommendations("prompt"))
+    assert breaker.state == OPEN
+
+    # The trial call succeeds; the caller stops reading at "data: [DONE]"
+    recommendations = list(stream_ai_recommendations("prompt"))
+    assert len(recommendations) == 3
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+    # Later calls go through instead of failing fast
+    assert len(list(stream_ai_recommendations("prompt"))) == 3
+    assert fake_ai.request_count == 3
+
+
+def test_open_circuit_fails_fast(fake_ai, breaker_config, app):
+    app.config["AI_CIRCUIT_RESET_TIMEOUT"] = 60
+    breaker = ai_client().breaker
+    fake_ai.failures = [503]
+
+    with pytest.raises(requests.RequestException):
+        list(stream_ai_recommendations("prompt"))
+    with pytest.raises(CircuitOpenError):
+        list(stream_ai_recommendations("prompt"))
+    assert breaker.state == OPEN
+    assert fake_ai.request_count == 1
+
+
+@pytest.fixture
+def retrying(app, fake_ai):
+    app.config.update(AI_MAX_RETRIES=2, AI_BACKOFF_FACTOR=0, AI_BACKOFF_JITTER=0)
+    return fake_ai
+
+
+def test_unprocessed_requests_are_retried(retrying):
+    retrying.failures = [503, 429]
+
+    assert len(fetch_ai_recommendation("prompt")["recommendations"]) == 3
+    assert retrying.request_count == 3
+
+
+def test_server_error_is_not_retried(retrying):
+    retrying.failures = [500]
+
+    with pytest.raises(requests.HTTPError):
+        fetch_ai_recommendation("prompt")
+    assert retrying.request_count == 1
+
+
+def test_read_timeout_is_not_retried(retrying, app):
+    app.config["AI_READ_TIMEOUT"] = 0.2
+    retrying.delay = 0.5
+
+    with pytest.raises(requests.RequestException):
+        fetch_ai_recommendation("prompt")
+    assert retrying.request_count == 1
@@ -0,0 +1,65 @@
+"""
+tests / test_importer.py
+
+Bulk import: valid rows are imported in batches, every other row is reported
+as rejected with its line number.
+"""
+
+import io
+
+from app.models import Author, Book
+
+HEADER = "title,author,publication_year\n"
+
+
+def upload(client, data: bytes, filename="books.csv", batch_size=2):
+    return client.post(
+        f"/books/import?batch_size={batch_size}",
+        data={"file": (io.BytesIO(data), filename)},
+        content_type="multipart/form-data",
+    )
+
+
+def test_import_reports_rejected_rows(client):
+    data = (HEADER + "Solaris,Stanisław Lem,1961\n,Nobody,2000\nKindred,Octavia E. Butler,year\n").encode()
+    report = upload(client, data).get_json()
+
+    assert report["imported"] == 1
+    assert report["rejected"] == 2
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert Book.query.count() == 1
+    assert Author.query.count() == 1
+
+
+def test_import_rejects_rows_that_are_not_utf8(client):
+    data = (
+        HEADER.encode()
+        + "Solaris,Stanisław Lem,1961\n".encode()
+        + "Der Zauberberg,Thomas Mann,1924\n".encode()
+        + "Les Misérables,Victor Hugo,1862\n".encode("latin-1")
+        + "Kindred,Octavia E. Butler,1979\n".encode()
+    )
+    response = upload(client, data)
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["imported"] == 3
+    assert report["errors"] == [{"line": 4, "error": "not valid UTF-8 text"}]
+
+
+def test_import_rejects_malformed_csv_rows(client):
+    data = (HEADER + "Solaris,Stanisław Lem,1961\n" + "x" * 200_000 + ",A,2000\nKindred,Octavia E. Butler,1979\n").encode()
+    report = upload(client, data).get_json()
+
+    assert report["imported"] == 2
+    assert report["rejected"] == 1
+    assert report["errors"][0]["line"] == 3
+    assert report["errors"][0]["error"].startswith("malformed CSV")
+
+
+def test_import_jsonl(client):
+    data = b'{"title": "Solaris", "author": "Stanislaw Lem", "publication_year": 1961}\n[1]\n{oops\n'
+    report = upload(client, data, filename="books.jsonl").get_json()
+
+    assert report["imported"] == 1
+    assert [error["line"] for error in report["errors"]] == [2, 3]
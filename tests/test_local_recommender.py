@@ -0,0 +1,61 @@
+"""
+tests / test_local_recommender.py
+
+Offline TF-IDF recommendations from the library, and model rebuilds that never
+block a request once a model exists.
+"""
+
+from datetime import date
+
+import pytest
+
+from app.models import db, Author, Book
+from app.services import local_recommender
+
+
+def add_book(author, title, description, rating=None):
+    book = Book(
+        title=title,
+        short_description=description,
+        publication_year=1970,
+        isbn=f"978{abs(hash(title)) % 10**10:010d}",
+        author=author,
+        rating=rating,
+    )
+    db.session.add(book)
+    db.session.commit()
+    return book
+
+
+@pytest.fixture
+def authors(app):
+    le_guin = Author(name="Ursula K. Le Guin", birth_date=date(1929, 10, 21))
+    austen = Author(name="Jane Austen", birth_date=date(1775, 12, 16))
+    db.session.add_all([le_guin, austen])
+    return le_guin, austen
+
+
+def test_recommends_unrated_books_similar_to_favourites(authors):
+    le_guin, austen = authors
+    add_book(le_guin, "The Dispossessed", "An anarchist physicist travels between planets.", rating=10)
+    add_book(le_guin, "The Word for World Is Forest", "Colonists exploit a forest planet.")
+    add_book(austen, "Emma", "A matchmaker meddles in village romances.")
+
+    titles = [rec["title"] for rec in local_recommender.recommend()["recommendations"]]
+    assert titles[0] == "The Word for World Is Forest"
+    assert "The Dispossessed" not in titles
+
+
+def test_outdated_model_is_served_while_rebuilding(app, authors):
+    le_guin, _ = authors
+    add_book(le_guin, "The Dispossessed", "An anarchist physicist travels between planets.")
+    model = local_recommender.get_model()
+
+    book = add_book(le_guin, "Lavinia", "The wife of Aeneas tells her own story.")
+    assert local_recommender.get_model() is model
+
+    cache = app.extensions["local_recommender"]
+    rebuild = cache.rebuild
+    if rebuild is not None:
+        rebuild.join(timeout=5)
+    assert book.id in local_recommender.get_model().vectors
@@ -0,0 +1,66 @@
+"""
+tests / test_logging.py
+
+Queued JSON logging: records are written by the background listener as JSON
+lines that carry the request id, which is also returned to the client.
+"""
+
+import json
+import logging
+
+import pytest
+
+from app import create_app, logging_config
+from app.config import config_by_name
+from app.logging_config import REQUEST_ID_HEADER
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    path = tmp_path / "app.log"
+    monkeypatch.setattr(config_by_name["testing"], "LOG_FILE", str(path))
+    return path
+
+
+def read_entries(path):
+    """Flush the queue and return the JSON entries written so far."""
+    logging_config._stop_pipeline()
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_access_line_carries_the_request_id(log_file):
+    client = create_app("testing").test_client()
+
+    response = client.get("/recommend/quota", headers={REQUEST_ID_HEADER: "req-42"})
+    assert response.headers[REQUEST_ID_HEADER] == "req-42"
+
+    access = [e for e in read_entries(log_file) if e.get("path") == "/recommend/quota"]
+    assert len(access) == 1
+    assert access[0]["request_id"] == "req-42"
+    assert access[0]["status"] == 200
+    assert access[0]["level"] == "INFO"
+    assert "duration_ms" in access[0]
+
+
+def test_unsafe_request_id_is_replaced(log_file):
+    client = create_app("testing").test_client()
+
+    response = client.get("/recommend/quota", headers={REQUEST_ID_HEADER: "bad id {}"})
+    request_id = response.headers[REQUEST_ID_HEADER]
+    assert request_id != "bad id {}"
+
+    access = [e for e in read_entries(log_file) if e.get("path") == "/recommend/quota"]
+    assert access[0]["request_id"] == request_id
+
+
+def test_exception_is_kept_in_its_own_field(log_file):
+    create_app("testing")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("tests").exception("Import failed for %s", "books.csv")
+
+    entry = [e for e in read_entries(log_file) if e["logger"] == "tests"][0]
+    assert entry["message"] == "Import failed for books.csv"
+    assert entry["request_id"] == "-"
+    assert "ValueError: boom" in entry["exception"]
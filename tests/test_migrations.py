@@ -0,0 +1,89 @@
+"""
+tests / test_migrations.py
+
+Schema migrations upgrade an existing database in place.
+"""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app import migrations
+from app.migrations import current_version, head_version, upgrade
+from app.models import db
+from app.similar import backfill_similar_index
+
+
+# Schema of a library created before migrations existed
+BASELINE_SCHEMA = (
+    "CREATE TABLE authors (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+    "birth_date DATE, date_of_death DATE)",
+    "CREATE TABLE books (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+    "short_description VARCHAR NOT NULL, publication_year INTEGER NOT NULL, "
+    "isbn VARCHAR NOT NULL, author_id INTEGER REFERENCES authors (id), rating INTEGER, "
+    "is_read BOOLEAN NOT NULL, progress INTEGER NOT NULL)",
+    "INSERT INTO authors (id, name, birth_date) VALUES (1, 'Stanisław Lem', '1921-09-12')",
+    "INSERT INTO books (title, short_description, publication_year, isbn, author_id, "
+    "is_read, progress) VALUES ('The Invincible', 'A ship lands on Regis III.', 1964, "
+    "'9781941147276', 1, 0, 0)",
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'library.sqlite'}")
+    yield engine
+    engine.dispose()
+
+
+def test_baseline_database_is_upgraded_to_head(engine):
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.exec_driver_sql(statement)
+
+    assert current_version(engine) == 0
+    assert upgrade(engine) == list(range(1, head_version() + 1))
+    assert upgrade(engine) == []
+
+    inspector = inspect(engine)
+    book_columns = {column["name"] for column in inspector.get_columns("books")}
+    assert {"title_key", "version"} <= book_columns
+    with engine.connect() as conn:
+        indexes = set(
+            conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars()
+        )
+        book = conn.execute(text("SELECT title_key, version FROM books")).one()
+    assert {"ix_books_author_id", "ix_books_title_lower", "ix_books_title_key"} <= indexes
+    assert book.title_key == "invincible"
+    assert book.version > 0
+
+
+def test_similar_index_is_filled_after_migration_6(engine, monkeypatch):
+    # A library at schema version 5, with books added before the index existed
+    db.metadata.create_all(engine)
+    with monkeypatch.context() as m:
+        m.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:5])
+        assert upgrade(engine) == [1, 2, 3, 4, 5]
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO authors (name, birth_date) VALUES ('Stanisław Lem', '1921-09-12')"))
+        conn.execute(
+            text(
+                "INSERT INTO books (title, short_description, publication_year, isbn, author_id, "
+                "is_read, progress, version) VALUES (:title, :description, 1961, :isbn, 1, 0, 0, 1)"
+            ),
+            [
+                {"title": "Solaris", "description": "A sentient ocean planet.", "isbn": "9780156027601"},
+                {"title": "The Cyberiad", "description": "Robot constructors build machines.", "isbn": "9780156027595"},
+            ],
+        )
+
+    assert upgrade(engine) == list(range(6, head_version() + 1))
+    assert current_version(engine) == head_version()
+
+    with engine.connect() as conn:
+        # The migration itself only creates the tables
+        assert conn.execute(text("SELECT COUNT(*) FROM book_minhash")).scalar() == 0
+
+    assert backfill_similar_index(engine) == 2
+    assert backfill_similar_index(engine) == 0
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM book_minhash")).scalar() == 2
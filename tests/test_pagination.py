@@ -0,0 +1,70 @@
+"""
+tests / test_pagination.py
+
+Keyset pagination: cursors walk the whole listing exactly once, and cursors
+that were tampered with are rejected with 400 instead of reaching the database.
+"""
+
+import base64
+import json
+from datetime import date
+
+import pytest
+from werkzeug.exceptions import BadRequest
+
+from app.models import db, Author, Book
+from app.pagination import decode_cursor, encode_cursor
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.fixture
+def library(app):
+    author = Author(name="Ursula K. Le Guin", birth_date=date(1929, 10, 21))
+    titles = ["The Dispossessed", "Lavinia", "Tehanu", "Always Coming Home", "The Lathe of Heaven"]
+    db.session.add_all(
+        Book(title=title, short_description="A novel.", publication_year=1970, isbn=f"978000000000{i}", author=author)
+        for i, title in enumerate(titles)
+    )
+    db.session.commit()
+    return titles
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("title", ["lavinia", 7])
+    assert decode_cursor(cursor, "title", 2) == ["lavinia", 7]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        encode_cursor("author", ["lavinia", 7]),
+        encode_cursor("title", [7]),
+        raw_cursor({"s": "title", "k": "ab"}),
+        raw_cursor({"s": "title", "k": [{"a": 1}, 7]}),
+        raw_cursor({"s": "title", "k": [["lavinia"], 7]}),
+        "not-a-cursor!",
+    ],
+)
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(BadRequest):
+        decode_cursor(cursor, "title", 2)
+
+
+def test_pages_cover_the_library_once(client, library):
+    url, seen = "/page?sort=title&limit=2", []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        html = response.get_data(as_text=True)
+        seen += [title for title in library if title in html]
+        url = response.headers.get("X-Next-Page")
+
+    assert sorted(seen, key=str.lower) == sorted(library, key=str.lower)
+
+
+def test_non_scalar_cursor_is_a_bad_request(client, library):
+    cursor = raw_cursor({"s": "title", "k": [{"a": 1}, 1]})
+    assert client.get(f"/page?sort=title&cursor={cursor}").status_code == 400
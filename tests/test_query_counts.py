@@ -0,0 +1,79 @@
+"""
+tests / test_query_counts.py
+
+The library listings must run a fixed number of SQL statements per page, however
+many books and authors the library holds (no N+1 queries for authors or book
+counts).
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event
+
+from app import create_app
+from app.models import db, Author, Book
+
+PAGES = ("/", "/page", "/authors/")
+
+
+@contextmanager
+def count_statements(engine):
+    """Count the statements executed on an engine inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed_library(size: int) -> None:
+    """Add `size` books, each by its own author."""
+    for i in range(size):
+        author = Author(name=f"Author {i:03d}", birth_date=date(1900, 1, 1))
+        db.session.add(author)
+        db.session.add(
+            Book(
+                title=f"Book {i:03d}",
+                short_description="A book.",
+                publication_year=2000,
+                isbn=f"978{i:010d}",
+                author=author,
+            )
+        )
+    db.session.commit()
+
+
+def page_query_counts(size: int) -> dict:
+    """
+    Render each listing once on a fresh app with `size` books.
+
+    Rendering caches and 304 handling are off, so every request does the full work.
+    """
+    app = create_app("testing")
+    app.config.update(CONDITIONAL_GET_ENABLED=False)
+    app.jinja_env.fragment_cache = None
+    counts = {}
+    with app.app_context():
+        seed_library(size)
+        db.session.remove()
+        client = app.test_client()
+        for path in PAGES:
+            # First request warms the in-process author directory cache
+            client.get(path)
+            with count_statements(db.engine) as statements:
+                response = client.get(path)
+            assert response.status_code == 200
+            counts[path] = len(statements)
+        db.session.remove()
+        db.drop_all()
+    return counts
+
+
+def test_query_count_does_not_grow_with_library_size():
+    assert page_query_counts(200) == page_query_counts(5)
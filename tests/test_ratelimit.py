@@ -0,0 +1,51 @@
+"""
+tests / test_ratelimit.py
+
+SQLite rate-limit storage: separate storage instances (one per worker process)
+count in the same file, and windows expire.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from limits import RateLimitItemPerMinute
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from app import ratelimit
+
+
+@pytest.fixture
+def uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'ratelimit.sqlite'}"
+
+
+def test_workers_share_counters(uri):
+    # One storage and limiter per worker process, as Flask-Limiter creates them
+    workers = [FixedWindowRateLimiter(storage_from_string(uri)) for _ in range(3)]
+    limit = RateLimitItemPerMinute(3)
+
+    assert [worker.hit(limit, "client") for worker in workers] == [True, True, True]
+    assert not workers[0].hit(limit, "client")
+    assert workers[1].get_window_stats(limit, "client").remaining == 0
+    # Other clients have their own counters
+    assert workers[2].hit(limit, "other client")
+
+
+def test_counter_restarts_after_window(uri, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(time=lambda: now[0]))
+    storage = storage_from_string(uri)
+
+    assert storage.incr("key", expiry=60) == 1
+    assert storage.incr("key", expiry=60) == 2
+    assert storage.get_expiry("key") == now[0] + 60
+
+    now[0] += 60
+    assert storage.get("key") == 0
+    assert storage.incr("key", expiry=60) == 1
+
+
+def test_in_memory_path_is_rejected():
+    with pytest.raises(ValueError):
+        storage_from_string("sqlite:///:memory:")
@@ -0,0 +1,26 @@
+"""
+tests / test_recommend.py
+
+Adding recommended books to the library.
+"""
+
+from app.models import Book
+
+
+def add(client, title, author):
+    return client.post("/recommend/add", data={"title": title, "author": author}).get_json()
+
+
+def test_add_recommended_book(client):
+    assert add(client, "Solaris", "Stanisław Lem")["success"]
+    assert Book.query.count() == 1
+
+
+def test_add_recommended_book_rejects_differently_spelled_duplicate(client):
+    assert add(client, "Solaris", "Stanisław Lem")["success"]
+
+    for title, author in [("Solaris", "Stanislaw Lem"), ("solaris", "LEM, Stanisław")]:
+        result = add(client, title, author)
+        assert not result["success"]
+        assert "already in your library" in result["error"]
+    assert Book.query.count() == 1
@@ -0,0 +1,55 @@
+"""
+tests / test_recommendation_cache.py
+
+Persistent AI response cache: time-to-live expiry and least-recently-used
+eviction.
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import recommendation_cache
+from app.services.recommendation_cache import cache_key, get_cached, store
+
+RESPONSE = {"recommendations": [{"title": "Solaris", "author": "Stanisław Lem"}]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the cache module."""
+    now = [time.time()]
+    monkeypatch.setattr(recommendation_cache, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_entry_expires_after_ttl(app, clock):
+    app.config["RECOMMENDATION_CACHE_TTL"] = 60
+    key = cache_key("prompt", "model")
+    store(key, RESPONSE)
+
+    clock[0] += 59
+    assert get_cached(key)[0] == RESPONSE
+
+    clock[0] += 2
+    assert get_cached(key) is None
+    # Back within the TTL the entry is still gone: it was deleted, not skipped
+    clock[0] -= 61
+    assert get_cached(key) is None
+
+
+def test_least_recently_used_entry_is_evicted(app, clock):
+    app.config["RECOMMENDATION_CACHE_MAX_ENTRIES"] = 2
+    first, second, third = (cache_key(f"prompt {i}", "model") for i in range(3))
+    store(first, RESPONSE)
+    clock[0] += 1
+    store(second, RESPONSE)
+    clock[0] += 1
+    get_cached(first)
+    clock[0] += 1
+    store(third, RESPONSE)
+
+    assert get_cached(first) is not None
+    assert get_cached(second) is None
+    assert get_cached(third) is not None
@@ -0,0 +1,76 @@
+"""
+tests / test_recommendation_jobs.py
+
+Background recommendation jobs: resuming and status transports.
+"""
+
+import json
+import time
+
+import pytest
+
+from app.services import recommendation_jobs, recommender
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Job ids handed to the worker pool (jobs are not run)."""
+    ids = []
+    monkeypatch.setattr(recommendation_jobs, "_submit", lambda app, job_id: ids.append(job_id))
+    return ids
+
+
+def test_pending_jobs_resume_on_first_request_only(app, client, submitted):
+    job_id = recommendation_jobs.enqueue_job("prompt", [])
+    submitted.clear()
+
+    # Nothing is resumed by create_app() itself (CLI commands, pre-fork parents)
+    assert submitted == []
+    client.get("/recommend/quota")
+    client.get("/recommend/quota")
+    assert submitted == [job_id]
+
+
+def test_job_status_returns_new_cards(app, client, submitted):
+    job_id = recommendation_jobs.enqueue_job("prompt", [])
+    recommendation_jobs._claim(job_id)
+    recs = [{"title": f"Book {i}", "author": "Someone"} for i in range(3)]
+    recommendation_jobs._store_partial(job_id, recs)
+
+    job = client.get(f"/recommend/jobs/{job_id}?after=1").get_json()
+    assert job["status"] == recommendation_jobs.RUNNING
+    assert len(job["cards"]) == 2
+    assert "Book 1" in job["cards"][0]
+
+
+def test_event_stream_ends_when_job_is_deleted(app, client, monkeypatch):
+    running = {"id": "abc", "status": recommendation_jobs.RUNNING, "error": None, "result": None}
+    answers = iter([running, running, None])
+    monkeypatch.setattr(recommendation_jobs, "get_job", lambda job_id: next(answers))
+    app.config["RECOMMENDATION_POLL_INTERVAL"] = 0
+
+    body = client.get("/recommend/jobs/abc/events").get_data(as_text=True)
+    statuses = [
+        json.loads(line[len("data: "):])["status"]
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert statuses == [recommendation_jobs.RUNNING, recommendation_jobs.FAILED]
+
+
+def test_slow_running_job_is_not_resumed(app, submitted, monkeypatch):
+    app.config.update(RECOMMENDATION_JOB_HEARTBEAT=0.05, RECOMMENDATION_JOB_STALE_AFTER=0.3)
+    job_id = recommendation_jobs.enqueue_job("prompt", [])
+    resumed = []
+
+    def slow_recommendation(prompt, refresh=False, on_item=None):
+        # Still waiting for the AI service well past the stale threshold
+        time.sleep(0.6)
+        resumed.append(recommendation_jobs.resume_pending_jobs(app))
+        return [], None
+
+    monkeypatch.setattr(recommender, "run_recommendation", slow_recommendation)
+    recommendation_jobs._run_job(app, job_id)
+
+    assert resumed == [0]
+    assert recommendation_jobs.get_job(job_id)["status"] == recommendation_jobs.DONE
@@ -0,0 +1,120 @@
+"""
+tests / test_recommender.py
+
+Recommendation pipeline against the fake AI server: what is cached and when a
+response counts as failed.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from app.services import recommendation_cache
+from app.services.ai_services import AI_MODEL
+from app.services.recommender import run_recommendation
+from app.services.single_flight import SingleFlight
+
+REFUSAL = json.dumps({"error": "I cannot comply"})
+
+
+@pytest.fixture
+def streaming(app, fake_ai):
+    app.config["AI_STREAMING"] = True
+    return fake_ai
+
+
+def cached(prompt):
+    return recommendation_cache.get_cached(recommendation_cache.cache_key(prompt, AI_MODEL))
+
+
+def test_completed_stream_is_cached(streaming):
+    shown = []
+    recs, cached_at = run_recommendation("prompt", on_item=shown.append)
+    assert len(recs) == 3 and shown == recs
+    assert cached_at is None
+    assert len(cached("prompt")[0]["recommendations"]) == 3
+
+    recs, cached_at = run_recommendation("prompt", on_item=shown.append)
+    assert len(recs) == 3 and cached_at is not None
+    assert streaming.request_count == 1
+
+
+def test_streamed_refusal_fails_and_is_not_cached(streaming):
+    streaming.content = REFUSAL
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            run_recommendation("prompt", on_item=lambda rec: None)
+    assert cached("prompt") is None
+    assert streaming.request_count == 2
+
+
+def test_truncated_stream_fails_and_is_not_cached(streaming):
+    streaming.truncate = True
+    shown = []
+    with pytest.raises(ValueError):
+        run_recommendation("prompt", on_item=shown.append)
+    assert shown  # cards were shown while streaming
+    assert cached("prompt") is None
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_only_the_stream_leader_completes():
+    flights = SingleFlight()
+    release = threading.Event()
+    completed = []
+
+    def upstream():
+        yield 1
+        release.wait(5)
+        yield 2
+
+    def consume(out):
+        out.extend(flights.stream("key", upstream, on_complete=lambda items: completed.append(list(items))))
+
+    leader_items, follower_items = [], []
+    leader = threading.Thread(target=consume, args=(leader_items,))
+    leader.start()
+    wait_until(lambda: flights.metrics().get("key", {}).get("in_flight"))
+    follower = threading.Thread(target=consume, args=(follower_items,))
+    follower.start()
+    wait_until(lambda: flights.metrics()["key"]["saved"] >= 1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert leader_items == follower_items == [1, 2]
+    assert completed == [[1, 2]]
+
+
+@pytest.fixture
+def non_streaming(app, fake_ai):
+    app.config["AI_STREAMING"] = False
+    return fake_ai
+
+
+def test_response_is_cached_until_refresh(non_streaming):
+    recs, cached_at = run_recommendation("prompt")
+    assert len(recs) == 3 and cached_at is None
+
+    recs, cached_at = run_recommendation("prompt")
+    assert len(recs) == 3 and cached_at is not None
+    assert non_streaming.request_count == 1
+
+    run_recommendation("prompt", refresh=True)
+    assert non_streaming.request_count == 2
+
+
+@pytest.mark.parametrize("content", [REFUSAL, json.dumps({"recommendations": []}), json.dumps([1, 2])])
+def test_response_without_recommendations_fails_and_is_not_cached(non_streaming, content):
+    non_streaming.content = content
+    with pytest.raises(ValueError):
+        run_recommendation("prompt")
+    assert cached("prompt") is None
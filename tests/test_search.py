@@ -0,0 +1,70 @@
+"""
+tests / test_search.py
+
+The FTS5 search index follows every book and author write.
+"""
+
+from datetime import date
+
+import pytest
+
+from app.models import db, Author, Book
+from app.search import filter_books
+
+
+def search(terms):
+    q, _ = filter_books(Book.query, terms, None)
+    return sorted(book.title for book in q.all())
+
+
+@pytest.fixture
+def lem(app):
+    author = Author(name="Stanisław Lem", birth_date=date(1921, 9, 12))
+    db.session.add(author)
+    db.session.add(
+        Book(
+            title="Solaris",
+            short_description="Scientists study a sentient ocean.",
+            publication_year=1961,
+            isbn="9780156027601",
+            author=author,
+        )
+    )
+    db.session.commit()
+    return author
+
+
+def test_new_book_is_searchable(lem):
+    assert search("solaris") == ["Solaris"]
+    assert search("ocean") == ["Solaris"]
+    # Prefix match on the author name
+    assert search("stanis") == ["Solaris"]
+
+
+def test_updated_book_is_reindexed(lem):
+    book = Book.query.one()
+    book.title = "Fiasco"
+    db.session.commit()
+
+    assert search("solaris") == []
+    assert search("fiasco") == ["Fiasco"]
+
+
+def test_deleted_book_leaves_the_index(lem):
+    db.session.delete(Book.query.one())
+    db.session.commit()
+
+    assert search("solaris") == []
+
+
+def test_renamed_author_is_reindexed(lem):
+    lem.name = "S. Lem"
+    db.session.commit()
+
+    assert search("stanis") == []
+    assert search("lem") == ["Solaris"]
+
+
+def test_operators_in_input_are_plain_words(lem):
+    assert search('solaris" OR NOT (') == []
+    assert search("***") == []
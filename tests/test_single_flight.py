@@ -0,0 +1,87 @@
+"""
+tests / test_single_flight.py
+
+Request coalescing: concurrent calls with the same key share one execution,
+including its exception, and later calls start a new flight.
+"""
+
+import threading
+import time
+
+from app.services import single_flight
+from app.services.single_flight import SingleFlight
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def run_concurrently(flights, fn, callers=4):
+    """Start `callers` calls for one key while the leader is still running."""
+    release = threading.Event()
+    outcomes = []
+
+    def blocked():
+        release.wait(5)
+        return fn()
+
+    def call():
+        try:
+            outcomes.append(flights.do("key", blocked))
+        except Exception as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: flights.metrics().get("key", {}).get("calls") == callers)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    executions = []
+
+    outcomes = run_concurrently(flights, lambda: executions.append(1) or "result")
+
+    assert executions == [1]
+    assert sorted(outcomes, key=lambda o: o[1]) == [("result", False)] + [("result", True)] * 3
+    stats = flights.metrics()["key"]
+    assert (stats["calls"], stats["executions"], stats["saved"]) == (4, 1, 3)
+    assert not stats["in_flight"]
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+
+    def fail():
+        raise ValueError("upstream failed")
+
+    outcomes = run_concurrently(flights, fail, callers=3)
+
+    assert len(outcomes) == 3
+    assert all(isinstance(o, ValueError) for o in outcomes)
+    assert flights.metrics()["key"]["executions"] == 1
+
+
+def test_finished_flight_is_not_reused():
+    flights = SingleFlight()
+
+    assert flights.do("key", lambda: 1) == (1, False)
+    assert flights.do("key", lambda: 2) == (2, False)
+    assert flights.metrics()["key"]["executions"] == 2
+
+
+def test_metrics_keep_the_most_recent_keys(monkeypatch):
+    monkeypatch.setattr(single_flight, "METRICS_MAX_KEYS", 2)
+    flights = SingleFlight()
+    for key in ("a", "b", "a", "c"):
+        flights.do(key, lambda: None)
+
+    assert list(flights.metrics()) == ["a", "c"]
@@ -0,0 +1,39 @@
+"""
+tests / test_sqlite_pragmas.py
+
+The configured SQLite PRAGMA profile is applied to every new connection and
+validated against the allowlist.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.events import effective_sqlite_pragmas, register_sqlite_pragmas
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'library.sqlite'}")
+    yield engine
+    engine.dispose()
+
+
+def test_profile_is_applied_on_connect(engine):
+    register_sqlite_pragmas(
+        engine, {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 2500}
+    )
+
+    pragmas = effective_sqlite_pragmas(engine)
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1
+    assert pragmas["busy_timeout"] == 2500
+    assert pragmas["foreign_keys"] == 1
+
+
+@pytest.mark.parametrize(
+    "pragmas",
+    [{"writable_schema": "ON"}, {"journal_mode": "WAL; DROP TABLE books"}],
+)
+def test_unsafe_profile_is_rejected(engine, pragmas):
+    with pytest.raises(ValueError):
+        register_sqlite_pragmas(engine, pragmas)
@@ -0,0 +1,62 @@
+"""
+tests / test_startup.py
+
+Fast start: once the database schema is at the newest version, later startups
+skip create_all() and the migration run.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+
+import app as app_module
+from app import create_app
+from app.config import config_by_name
+from app.migrations import _current_databases, is_current, upgrade
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """File database for the testing config; forgotten by is_current() afterwards."""
+    url = f"sqlite:///{tmp_path / 'library.sqlite'}"
+    monkeypatch.setattr(config_by_name["testing"], "SQLALCHEMY_DATABASE_URI", url)
+    yield url
+    _current_databases.discard(url)
+
+
+@pytest.fixture
+def upgrades(monkeypatch):
+    """Count calls of upgrade() made by the app factory."""
+    calls = []
+
+    def counting_upgrade(engine):
+        calls.append(engine.url)
+        return upgrade(engine)
+
+    monkeypatch.setattr(app_module, "upgrade", counting_upgrade)
+    return calls
+
+
+def test_is_current_only_at_head(database):
+    engine = create_engine(database)
+    try:
+        assert not is_current(engine)
+        create_app("testing")
+        assert is_current(engine)
+    finally:
+        engine.dispose()
+
+
+def test_current_database_skips_schema_setup(database, upgrades):
+    create_app("testing")
+    assert len(upgrades) == 1
+
+    flask_app = create_app("testing")
+    assert len(upgrades) == 1
+    assert "schema" in flask_app.extensions["startup_timings"]
+
+
+def test_schema_setup_runs_without_fast_start(database, upgrades, monkeypatch):
+    monkeypatch.setattr(config_by_name["testing"], "FAST_START", False)
+    create_app("testing")
+    create_app("testing")
+    assert len(upgrades) == 2